@@ -0,0 +1,71 @@
+"""
+Startup check for the planilhas-gov-br CLI.
+
+Times `planilhas-gov-br --help` and `planilhas-gov-br status` in fresh
+interpreters (best of --repeat runs) and fails when either exceeds the budget
+or when `status` imports pandas. tests/test_cli_startup.py enforces a generous
+version of this in the test suite; this script reports the times, e.g. when
+tuning the imports.
+
+Usage:
+    python benchmarks/bench_cli_startup.py [--budget 0.3] [--repeat 5] [--root .]
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+# Run in the child after `status`: report whether pandas was imported
+STATUS_PROBE = (
+    "import sys\n"
+    "from planilhas_gov_br import cli\n"
+    "cli.main(['--root', sys.argv[1], 'status', '--json'])\n"
+    "sys.stderr.write('pandas imported\\n' if 'pandas' in sys.modules else '')\n"
+)
+
+
+def best_time(argv, repeat):
+    """Best wall time of `repeat` runs of argv; raises on a non-zero exit."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(argv, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the CLI startup time against a budget")
+    parser.add_argument('--budget', type=float, default=0.3, help="Seconds allowed per command (default: 0.3)")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per command; the best one counts (default: 5)")
+    parser.add_argument('--root', default='.', help="Project root passed to status (default: .)")
+    args = parser.parse_args()
+
+    baseline = best_time([sys.executable, '-c', 'pass'], args.repeat)
+    commands = {
+        '--help': [sys.executable, '-m', 'planilhas_gov_br', '--help'],
+        'status': [sys.executable, '-m', 'planilhas_gov_br', '--root', args.root, 'status'],
+    }
+
+    failed = False
+    print(f"  {'interpreter':<10} {baseline:7.3f}s")
+    for name, argv in commands.items():
+        seconds = best_time(argv, args.repeat)
+        ok = seconds <= args.budget
+        failed |= not ok
+        print(f"  {name:<10} {seconds:7.3f}s  ({seconds - baseline:+.3f}s over the interpreter)"
+              f"{'' if ok else f'  OVER BUDGET ({args.budget:.3f}s)'}")
+
+    probe = subprocess.run([sys.executable, '-c', STATUS_PROBE, args.root],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if probe.returncode != 0 or 'pandas imported' in probe.stderr:
+        print("  status imported pandas" if probe.returncode == 0 else probe.stderr)
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
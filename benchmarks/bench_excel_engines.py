@@ -0,0 +1,117 @@
+"""
+Excel engine benchmark: parse time of each reader backend per workbook.
+
+Every installed engine able to read a workbook's format (see
+planilhas_gov_br.readers) parses its first sheet; the best of --repeat runs
+is reported, and each engine's frame is checked against the first engine's so
+a faster engine that reads different values shows up. Runs on the project's
+data/raw workbooks, or on a synthetic corpus (benchmarks/synthetic.py) when
+--synthetic is given or data/raw is empty.
+
+Usage:
+    python benchmarks/bench_excel_engines.py [--corpus data/raw] [--repeat 3]
+    python benchmarks/bench_excel_engines.py --synthetic --rows 50000 --files 3 --formats xlsx xls
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+
+import synthetic  # noqa: E402
+from planilhas_gov_br import readers  # noqa: E402
+
+DEFAULT_CORPUS = BENCH_DIR.parent / 'data' / 'raw'
+
+
+def parse(path, engine):
+    """First sheet of the workbook, without a header, as processing's header sniffing sees it."""
+    with pd.ExcelFile(path, engine=engine) as xls:
+        return xls.parse(0, header=None)
+
+
+def same_values(df, reference):
+    if df.shape != reference.shape:
+        return False
+    # Compare as text: engines may return 5 vs 5.0 for the same cell
+    return df.astype(str).equals(reference.astype(str))
+
+
+def bench_file(path, repeat):
+    """
+    Returns:
+        dict: engine -> {'seconds': best time, 'rows': rows, 'same': matches the first engine}
+              (engines that failed get 'error')
+    """
+    results = {}
+    reference = None
+    for engine in readers.EXTENSION_ENGINES.get(path.suffix.lower(), ()):
+        if not readers.is_available(engine):
+            continue
+        try:
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                df = parse(path, engine)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+        except Exception as e:
+            results[engine] = {'error': str(e)}
+            continue
+        if reference is None:
+            reference = df
+        results[engine] = {'seconds': best, 'rows': len(df), 'same': same_values(df, reference)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--corpus', type=Path, default=DEFAULT_CORPUS, help="Directory of workbooks (default: data/raw)")
+    parser.add_argument('--synthetic', action='store_true', help="Benchmark a generated corpus instead")
+    parser.add_argument('--rows', type=int, default=50000, help="Synthetic rows per workbook")
+    parser.add_argument('--files', type=int, default=2, help="Synthetic workbooks per format")
+    parser.add_argument('--formats', nargs='+', choices=['xlsx', 'xls'], default=['xlsx', 'xls'])
+    parser.add_argument('--repeat', type=int, default=3, help="Parses per engine; the best is kept")
+    args = parser.parse_args()
+
+    print(f"pandas {pd.__version__}; engines installed: {', '.join(readers.available_engines()) or 'none'}")
+    with tempfile.TemporaryDirectory(prefix='planilhas-engines-') as tmp:
+        paths = sorted(p for p in args.corpus.glob('*') if p.suffix.lower() in readers.EXTENSION_ENGINES) \
+            if args.corpus.is_dir() and not args.synthetic else []
+        if not paths:
+            print(f"Synthetic corpus: {args.files} workbook(s) of {args.rows} rows per format")
+            for fmt in args.formats:
+                try:
+                    paths += synthetic.generate_corpus(Path(tmp) / fmt, args.rows, args.files, fmt)
+                except ImportError as e:
+                    print(f"Skipping {fmt}: {e}")
+
+        totals = {}
+        for path in paths:
+            results = bench_file(path, args.repeat)
+            cells = []
+            for engine, result in results.items():
+                if 'error' in result:
+                    cells.append(f"{engine} failed ({result['error'][:40]})")
+                    continue
+                fmt_totals = totals.setdefault(path.suffix.lower(), {})
+                fmt_totals[engine] = fmt_totals.get(engine, 0.0) + result['seconds']
+                cells.append(f"{engine} {result['seconds']:.3f}s" + ('' if result['same'] else ' (DIFFERENT VALUES)'))
+            rows = next((r['rows'] for r in results.values() if 'rows' in r), 0)
+            print(f"{path.name[:40]:<40} {rows:>8} rows  " + '  '.join(cells))
+
+    for suffix, engines in totals.items():
+        fastest = min(engines, key=engines.get)
+        ratios = ', '.join(f"{engine} {seconds / engines[fastest]:.1f}x" for engine, seconds in engines.items()
+                           if engine != fastest)
+        print(f"{suffix}: fastest {fastest} ({engines[fastest]:.3f}s total)" + (f"; {ratios} slower" if ratios else ''))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Memory benchmark: peak RSS of the in-memory consolidation.
+
+Builds synthetic normalized workbooks (benchmarks/synthetic.py rows through
+normalize_data_values) and caches them per dtype mode: 'object' keeps the
+Python-object columns, 'compact' applies planilhas_gov_br.schema.compact_frame
+as processing does before caching. A fresh subprocess per mode loads the
+cached frames, concatenates them, builds the frame with database column names
+and the dashboard summaries, and reports its peak RSS.
+
+Usage:
+    python benchmarks/bench_memory.py [--rows 1000000] [--files 10]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+
+import synthetic  # noqa: E402
+from planilhas_gov_br import extract, instrumentation, summary  # noqa: E402
+from planilhas_gov_br.schema import align_categories, compact_frame, normalize_column_names  # noqa: E402
+
+MODES = ('object', 'compact')
+
+
+def write_corpus(directory, rows, files, seed=0):
+    """
+    Pickle `files` normalized frames of rows/files rows each, per mode.
+
+    Returns:
+        dict: mode -> pickle paths
+    """
+    rng = np.random.default_rng(seed)
+    paths = {mode: [] for mode in MODES}
+    for i in range(files):
+        df = extract.normalize_data_values(synthetic.make_rows(rows // files, rng, 2015 + i % 10))
+        for mode in MODES:
+            path = Path(directory) / f"{mode}_{i:03d}.pkl"
+            (compact_frame(df.copy()) if mode == 'compact' else df).to_pickle(path)
+            paths[mode].append(path)
+    return paths
+
+
+def consolidate(paths, mode):
+    """Child process: consolidate the pickled frames and return the measurements."""
+    baseline = instrumentation.peak_rss_bytes()
+    frames = [pd.read_pickle(path) for path in paths]
+    if mode == 'compact':
+        align_categories(frames)
+    combined = pd.concat(frames, ignore_index=True, sort=False, join='outer')
+    del frames
+    db_df = normalize_column_names(combined.copy())
+    summary.compute_summaries(db_df)
+    return {
+        'mode': mode,
+        'rows': len(combined),
+        'frame_bytes': int(combined.memory_usage(deep=True).sum()),
+        'baseline_rss_bytes': baseline,
+        'peak_rss_bytes': instrumentation.peak_rss_bytes(),
+        'dtypes': {str(col): str(dtype) for col, dtype in combined.dtypes.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--files', type=int, default=10)
+    parser.add_argument('--child', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('paths', nargs='*', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(consolidate(args.paths, args.child)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_corpus(tmp, args.rows, args.files)
+        print(f"{args.rows} rows in {args.files} files")
+        results = {}
+        for mode in MODES:
+            output = subprocess.run([sys.executable, __file__, '--child', mode, *map(str, paths[mode])],
+                                    check=True, capture_output=True, text=True).stdout
+            result = results[mode] = json.loads(output)
+            print(f"{mode:<8} frame {instrumentation.format_size(result['frame_bytes']):>11}  "
+                  f"peak RSS {instrumentation.format_size(result['peak_rss_bytes']):>11}")
+
+    compact, baseline = results['compact'], results['object']
+    # The peak includes the imports (pandas, pyarrow), so its ratio grows with the corpus
+    print(f"peak RSS after the imports alone: {instrumentation.format_size(compact['baseline_rss_bytes'])}")
+    print(f"frame: {baseline['frame_bytes'] / compact['frame_bytes']:.1f}x smaller, "
+          f"peak RSS: {baseline['peak_rss_bytes'] / compact['peak_rss_bytes']:.1f}x lower")
+
+
+if __name__ == '__main__':
+    main()
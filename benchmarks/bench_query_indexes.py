@@ -0,0 +1,219 @@
+"""
+Dashboard query benchmark: EXPLAIN (ANALYZE, BUFFERS) before and after the
+index migration.
+
+Builds autorizacoes_uniao in a scratch schema of a local Postgres with the
+original migrations (001, 003, 004), seeds it with synthetic rows, and runs
+the dashboard's query shapes (explorer filters and sort, substring search,
+aggregates). The index migration (006) is then applied and the same queries
+are measured again. Execution times are the median of --repeat warm runs.
+
+Never point this at the production database: the scratch schema is dropped
+and recreated.
+
+Usage:
+    python benchmarks/bench_query_indexes.py --dsn postgresql://postgres@localhost/bench --rows 500000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+
+import synthetic  # noqa: E402
+
+MIGRATIONS_DIR = BENCH_DIR.parent / 'migrations'
+RESULTS_DIR = BENCH_DIR / 'results'
+
+# Table as it was before the index pack (RLS policies in 002 need Supabase roles)
+BASE_MIGRATIONS = ['001_create_government_data_table.sql',
+                   '003_rename_table_to_autorizacoes_uniao.sql',
+                   '004_add_row_fingerprint.sql']
+INDEX_MIGRATION = '006_add_dashboard_query_indexes.sql'
+
+# A few hundred órgãos, as in the published data
+ORGAOS = [f"{orgao} - Superintendência {i}" for orgao in synthetic.ORGAOS for i in range(1, 11)]
+
+TIPOS = ['Concurso Público', 'Provimento Adicional', 'Provimento Originário',
+         'Provimento Excepcional', 'Contratação Temporária']
+
+SEED_SQL = """
+INSERT INTO autorizacoes_uniao (orgao_entidade, cargos, escolaridade, vagas, ato_oficial,
+                                tipo_autorizacao, dou_publicacao_ano, row_fingerprint)
+SELECT v.orgaos[1 + floor(random() * array_length(v.orgaos, 1))::int],
+       v.cargos[1 + floor(random() * array_length(v.cargos, 1))::int],
+       CASE WHEN random() < 0.6 THEN 'Nível Superior' ELSE 'Nível Intermediário' END,
+       1 + floor(power(random(), 3) * 200)::int,
+       'Portaria nº ' || g || ', de ' || (2001 + g % 25),
+       v.tipos[1 + floor(random() * array_length(v.tipos, 1))::int],
+       2001 + floor(random() * 25),
+       md5(g::text)
+FROM generate_series(1, %(rows)s) AS g,
+     (SELECT %(orgaos)s::text[] AS orgaos, %(cargos)s::text[] AS cargos, %(tipos)s::text[] AS tipos) AS v
+"""
+
+COLUMNS = "orgao_entidade, cargos, escolaridade, vagas, tipo_autorizacao, dou_publicacao_ano"
+
+# Query shapes issued by the dashboard (explorer page and charts)
+QUERIES = {
+    'explorer_year_range': (
+        f"SELECT {COLUMNS} FROM autorizacoes_uniao WHERE dou_publicacao_ano BETWEEN %(ano_de)s AND %(ano_ate)s "
+        "ORDER BY dou_publicacao_ano DESC LIMIT 50"),
+    'explorer_year_orgao': (
+        f"SELECT {COLUMNS} FROM autorizacoes_uniao WHERE dou_publicacao_ano BETWEEN %(ano_de)s AND %(ano_ate)s "
+        "AND orgao_entidade = %(orgao)s ORDER BY dou_publicacao_ano DESC LIMIT 50"),
+    'explorer_tipo_year': (
+        f"SELECT {COLUMNS} FROM autorizacoes_uniao WHERE tipo_autorizacao = %(tipo)s "
+        "AND dou_publicacao_ano BETWEEN %(ano_de)s AND %(ano_ate)s ORDER BY dou_publicacao_ano DESC LIMIT 50"),
+    'search_orgao': (
+        f"SELECT {COLUMNS} FROM autorizacoes_uniao WHERE orgao_entidade ILIKE %(busca_orgao)s "
+        "ORDER BY dou_publicacao_ano DESC LIMIT 50"),
+    'search_cargo': (
+        f"SELECT {COLUMNS} FROM autorizacoes_uniao WHERE cargos ILIKE %(busca_cargo)s "
+        "AND dou_publicacao_ano = %(ano_ate)s LIMIT 50"),
+    'agg_vagas_por_ano': (
+        "SELECT dou_publicacao_ano, SUM(vagas), COUNT(*) FROM autorizacoes_uniao "
+        "GROUP BY dou_publicacao_ano ORDER BY dou_publicacao_ano"),
+    'agg_vagas_ano_range': (
+        "SELECT dou_publicacao_ano, SUM(vagas) FROM autorizacoes_uniao "
+        "WHERE dou_publicacao_ano BETWEEN %(ano_de)s AND %(ano_ate)s GROUP BY dou_publicacao_ano"),
+    'agg_top_orgaos': (
+        "SELECT orgao_entidade, SUM(vagas) AS total_vagas, COUNT(*) FROM autorizacoes_uniao "
+        "GROUP BY orgao_entidade ORDER BY total_vagas DESC LIMIT 10"),
+    'agg_distribuicao_tipo': (
+        "SELECT tipo_autorizacao, COUNT(*), SUM(vagas) FROM autorizacoes_uniao GROUP BY tipo_autorizacao"),
+}
+
+PARAMS = {
+    'ano_de': 2018,
+    'ano_ate': 2022,
+    'orgao': ORGAOS[7],
+    'tipo': 'Provimento Adicional',
+    'busca_orgao': '%superintendência 3%',
+    'busca_cargo': '%fiscal%',
+}
+
+
+def plan_nodes(plan):
+    """Yield a plan node and all its children."""
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+def explain(cur, sql, repeat):
+    """
+    Run EXPLAIN (ANALYZE, BUFFERS) `repeat` times after one warm-up run.
+
+    Returns:
+        dict: median execution/planning time, buffers and the access paths of the last run
+    """
+    runs = []
+    for _ in range(repeat + 1):
+        cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", PARAMS)
+        runs.append(cur.fetchone()[0][0])
+    runs = runs[1:]
+    last = runs[-1]['Plan']
+    scans = sorted({f"{node['Node Type']}({node['Index Name']})" if 'Index Name' in node else node['Node Type']
+                    for node in plan_nodes(last) if 'Scan' in node['Node Type']})
+    return {
+        'execution_ms': statistics.median(run['Execution Time'] for run in runs),
+        'planning_ms': statistics.median(run['Planning Time'] for run in runs),
+        'shared_hit_blocks': last.get('Shared Hit Blocks', 0),
+        'shared_read_blocks': last.get('Shared Read Blocks', 0),
+        'rows': last.get('Actual Rows'),
+        'scans': scans,
+    }
+
+
+def run_queries(cur, repeat):
+    results = {}
+    for name, sql in QUERIES.items():
+        results[name] = explain(cur, sql, repeat)
+        print(f"  {name:<24} {results[name]['execution_ms']:9.2f} ms  {', '.join(results[name]['scans'])}")
+    return results
+
+
+def apply_migration(cur, name):
+    with open(MIGRATIONS_DIR / name, 'r', encoding='utf-8') as f:
+        cur.execute(f.read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN the dashboard queries before and after the index migration")
+    parser.add_argument('--dsn', default=os.environ.get('BENCH_POSTGRES_URL'),
+                        help="Local Postgres connection string (default: $BENCH_POSTGRES_URL)")
+    parser.add_argument('--rows', type=int, default=200000, help="Synthetic rows to seed (default: 200000)")
+    parser.add_argument('--repeat', type=int, default=5, help="Measured runs per query (default: 5)")
+    parser.add_argument('--schema', default='planilhas_bench', help="Scratch schema (dropped and recreated)")
+    parser.add_argument('--keep', action='store_true', help="Keep the scratch schema after the run")
+    parser.add_argument('--output', type=Path, help="Results file (default: benchmarks/results/indexes-<timestamp>.json)")
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("Pass --dsn or set BENCH_POSTGRES_URL (a local database, not production)")
+
+    import psycopg2
+
+    conn = psycopg2.connect(args.dsn)
+    # VACUUM cannot run inside a transaction block
+    conn.autocommit = True
+    cur = conn.cursor()
+    schema = '"' + args.schema.replace('"', '""') + '"'
+    try:
+        cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        cur.execute(f"CREATE SCHEMA {schema}")
+        cur.execute(f"SET search_path TO {schema}, public, extensions")
+        cur.execute("SHOW server_version")
+        server_version = cur.fetchone()[0]
+
+        for name in BASE_MIGRATIONS:
+            apply_migration(cur, name)
+        print(f"Seeding {args.rows} rows...")
+        cur.execute("SELECT setseed(0.42)")
+        cur.execute(SEED_SQL, {'rows': args.rows, 'orgaos': ORGAOS, 'cargos': synthetic.CARGOS, 'tipos': TIPOS})
+        cur.execute("VACUUM ANALYZE autorizacoes_uniao")
+
+        print("Before (migration 001 indexes):")
+        before = run_queries(cur, args.repeat)
+
+        apply_migration(cur, INDEX_MIGRATION)
+        # Sets the visibility map so the covering indexes can be read without the heap
+        cur.execute("VACUUM ANALYZE autorizacoes_uniao")
+
+        print(f"After ({INDEX_MIGRATION}):")
+        after = run_queries(cur, args.repeat)
+    finally:
+        if not args.keep:
+            cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        conn.close()
+
+    print("\nSpeedup (before / after):")
+    for name in QUERIES:
+        ratio = before[name]['execution_ms'] / max(after[name]['execution_ms'], 1e-6)
+        print(f"  {name:<24} {before[name]['execution_ms']:9.2f} -> {after[name]['execution_ms']:9.2f} ms  "
+              f"{ratio:6.1f}x")
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'server_version': server_version,
+        'parameters': {'rows': args.rows, 'repeat': args.repeat},
+        'query_params': PARAMS,
+        'queries': QUERIES,
+        'before': before,
+        'after': after,
+    }
+    output = args.output or RESULTS_DIR / f"indexes-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nResults saved: {output}")
+
+
+if __name__ == '__main__':
+    main()
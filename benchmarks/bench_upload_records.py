@@ -0,0 +1,98 @@
+"""
+Micro-benchmark: building JSON request bodies for the upload batches.
+
+Compares the previous per-value sanitization (to_dict + pd.isna/math.isnan on
+every value) with the column-wise planilhas_gov_br.records.JSONRecords, and the
+stdlib json encoder with orjson when installed.
+
+Usage:
+    python benchmarks/bench_upload_records.py [--rows 100000] [--batch-size 1000]
+"""
+
+import argparse
+import json
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from planilhas_gov_br import records
+
+
+def make_frame(rows, seed=0):
+    """Synthetic frame shaped like the cleaned autorizacoes_uniao data."""
+    rng = np.random.default_rng(seed)
+    orgaos = [f"Ministério {i}" for i in range(300)]
+    df = pd.DataFrame({
+        'orgao_entidade': rng.choice(orgaos, rows),
+        'cargos': rng.choice(['Analista', 'Técnico', 'Auditor', None], rows),
+        'escolaridade': rng.choice(['Nível Superior', 'Nível Intermediário', None], rows),
+        'vagas': pd.array(rng.integers(1, 500, rows), dtype='Int64'),
+        'ato_oficial': [f"Portaria nº {i}" for i in range(rows)],
+        'tipo_autorizacao': rng.choice(['Concurso Público', 'Provimento Adicional'], rows),
+        'dou_publicacao_ano': rng.choice([2019.0, 2020.0, np.nan, np.inf], rows),
+        'observacoes': rng.choice([None, 'Retificado'], rows),
+    })
+    df.loc[df.index % 7 == 0, 'vagas'] = pd.NA
+    return df
+
+
+def per_value_batches(df, batch_size):
+    """Previous approach: to_dict per batch, then check every value."""
+    for i in range(0, len(df), batch_size):
+        batch = df.iloc[i:i + batch_size].to_dict(orient='records')
+        for record in batch:
+            for key, value in list(record.items()):
+                if pd.isna(value):
+                    record[key] = None
+                elif isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+                    record[key] = None
+        yield batch
+
+
+def column_wise_batches(df, batch_size):
+    """Column-wise conversion with JSONRecords."""
+    json_records = records.JSONRecords(df)
+    for i in range(0, len(df), batch_size):
+        yield json_records[i:i + batch_size]
+
+
+def no_encode(batch):
+    return b''
+
+
+def stdlib_dumps(batch):
+    return json.dumps(batch).encode('utf-8')
+
+
+def run(name, make_batches, encode, df, batch_size):
+    start = time.perf_counter()
+    size = 0
+    for batch in make_batches(df, batch_size):
+        size += len(encode(batch))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<32} {elapsed:8.3f}s  {elapsed / len(df) * 1e6:8.2f} µs/row  ({size / 1e6:.1f} MB)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    print(f"{args.rows} rows, batches of {args.batch_size}, orjson={'yes' if records.orjson else 'no'}")
+
+    build_baseline = run('per-value (build only)', per_value_batches, no_encode, df, args.batch_size)
+    build_vectorized = run('column-wise (build only)', column_wise_batches, no_encode, df, args.batch_size)
+    baseline = run('per-value + json', per_value_batches, stdlib_dumps, df, args.batch_size)
+    vectorized = run('column-wise + json', column_wise_batches, stdlib_dumps, df, args.batch_size)
+    fast = run('column-wise + records.dumps', column_wise_batches, records.dumps, df, args.batch_size)
+    print(f"speedup: {build_baseline / build_vectorized:.1f}x (build), "
+          f"{baseline / vectorized:.1f}x (build + json), {baseline / fast:.1f}x (build + records.dumps)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+ETL benchmark suite.
+
+For each scenario (row count, number of files, .xls/.xlsx, preamble rows above
+the header) a synthetic corpus is generated and every pipeline stage is timed:
+read, header detection, normalization, consolidation, export (CSV, NDJSON,
+Parquet) and upload against a local HTTP stub. Results are written as JSON so
+runs can be compared over time.
+
+Usage:
+    python benchmarks/run_benchmarks.py --rows 1000 10000 100000 --files 3 --formats xlsx xls
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/bench-20251002-120000.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pandas as pd
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+
+import synthetic  # noqa: E402
+from planilhas_gov_br import columnar, extract, ndjson, records  # noqa: E402
+from planilhas_gov_br.schema import normalize_column_names  # noqa: E402
+from planilhas_gov_br.uploader import BatchUploader  # noqa: E402
+
+RESULTS_DIR = BENCH_DIR / 'results'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Accepts PostgREST-style POSTs and answers 201 with no body."""
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        self.send_response(201)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def stub_server():
+    """Run the upload stub on a free local port; yields its base URL."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class Timings:
+    """Collects (scenario, stage) timings."""
+
+    def __init__(self):
+        self.results = []
+
+    @contextmanager
+    def stage(self, scenario, stage, rows=0):
+        """Time the block; it may update the yielded record's 'rows'."""
+        record = {'scenario': scenario, 'stage': stage, 'rows': rows}
+        start = time.perf_counter()
+        yield record
+        record['seconds'] = time.perf_counter() - start
+        self.results.append(record)
+        print(f"  {stage:<22} {record['seconds']:9.3f}s  ({record['rows']} rows)")
+
+
+def run_scenario(timings, scenario, paths, work_dir, upload_workers):
+    """Time every pipeline stage over the workbooks in `paths`."""
+    frames = []
+    with timings.stage(scenario, 'read') as record:
+        for path in paths:
+            df, _, _ = extract.read_excel_data(path)
+            frames.append(df)
+            record['rows'] += len(df)
+    total_rows = record['rows']
+
+    with timings.stage(scenario, 'header_detection', rows=len(paths)):
+        for path in paths:
+            with pd.ExcelFile(path) as xls:
+                head = xls.parse(0, header=None, nrows=extract.HEADER_SNIFF_ROWS)
+            extract.find_data_start_row(head)
+
+    with timings.stage(scenario, 'normalization', rows=total_rows):
+        frames = [extract.normalize_data_values(extract.normalize_column_headers(df)) for df in frames]
+
+    with timings.stage(scenario, 'consolidation', rows=total_rows):
+        combined = pd.concat(frames, ignore_index=True, sort=False, join='outer')
+
+    with timings.stage(scenario, 'export_csv', rows=total_rows):
+        combined.to_csv(work_dir / 'consolidated_data.csv', index=False, encoding='utf-8')
+
+    with timings.stage(scenario, 'export_ndjson', rows=total_rows):
+        ndjson.write_ndjson(combined, work_dir / 'consolidated_data.ndjson')
+
+    db_df = normalize_column_names(combined.copy())
+    if columnar.is_available():
+        with timings.stage(scenario, 'export_parquet', rows=total_rows):
+            columnar.write_parquet(db_df, work_dir / 'consolidated_data.parquet')
+
+    with stub_server() as url:
+        def insert(batch):
+            request = urllib.request.Request(f"{url}/autorizacoes_uniao", data=records.dumps(batch),
+                                             headers={'Content-Type': 'application/json'}, method='POST')
+            with urllib.request.urlopen(request) as response:
+                response.read()
+
+        with timings.stage(scenario, 'upload', rows=total_rows):
+            BatchUploader(insert, max_workers=upload_workers).upload(records.JSONRecords(db_df))
+
+
+def compare(current, previous_path):
+    """Print the ratio of each stage's time to a previous results file."""
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = {(r['scenario'], r['stage']): r['seconds'] for r in json.load(f)['results']}
+    print(f"\nCompared with {previous_path} (ratio < 1 is faster):")
+    for result in current:
+        key = (result['scenario'], result['stage'])
+        if key in previous and previous[key] > 0:
+            print(f"  {key[0]:<28} {key[1]:<22} {result['seconds'] / previous[key]:6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ETL stages on synthetic DOU spreadsheets")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000],
+                        help="Data rows per workbook, one scenario each (1k to 1M)")
+    parser.add_argument('--files', type=int, nargs='+', default=[3], help="Workbooks per scenario")
+    parser.add_argument('--formats', nargs='+', choices=['xlsx', 'xls'], default=['xlsx'])
+    parser.add_argument('--preambles', type=int, nargs='+', default=[4], help="Rows above the header")
+    parser.add_argument('--upload-workers', type=int, default=4)
+    parser.add_argument('--output', type=Path, help="Results file (default: benchmarks/results/bench-<timestamp>.json)")
+    parser.add_argument('--compare', type=Path, help="Previous results file to compare with")
+    args = parser.parse_args()
+
+    timings = Timings()
+    with tempfile.TemporaryDirectory(prefix='planilhas-bench-') as tmp:
+        tmp = Path(tmp)
+        for fmt in args.formats:
+            for rows in args.rows:
+                for files in args.files:
+                    for preamble in args.preambles:
+                        scenario = f"{fmt}-{rows}r-{files}f-p{preamble}"
+                        print(f"Scenario {scenario}")
+                        corpus_dir = tmp / scenario / 'raw'
+                        paths = synthetic.generate_corpus(corpus_dir, rows, files, fmt, preamble)
+                        work_dir = tmp / scenario / 'processed'
+                        work_dir.mkdir(parents=True, exist_ok=True)
+                        run_scenario(timings, scenario, paths, work_dir, args.upload_workers)
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'parameters': {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        'results': timings.results,
+    }
+
+    output = args.output or RESULTS_DIR / f"bench-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved: {output}")
+
+    if args.compare:
+        compare(timings.results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Synthetic DOU spreadsheet generator for benchmarks.
+
+Generates workbooks shaped like the published authorization spreadsheets: a
+preamble of title/notes rows above the header, header spellings drawn from
+planilhas_gov_br.extract.HEADER_MAPPING, and repetitive categorical columns
+(órgão, cargo, escolaridade, tipo de autorização) next to free text.
+
+Usage:
+    python benchmarks/synthetic.py OUTPUT_DIR --rows 10000 --files 5 --format xlsx --preamble 4
+"""
+
+import argparse
+import random
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from planilhas_gov_br.extract import HEADER_MAPPING
+
+# .xls (BIFF8) sheets hold at most 65,536 rows
+XLS_MAX_ROWS = 65536
+
+ORGAOS = [f"{prefix} {name}" for prefix in ('Ministério da', 'Ministério do', 'Secretaria de', 'Instituto')
+          for name in ('Saúde', 'Educação', 'Fazenda', 'Economia', 'Justiça', 'Cultura', 'Defesa',
+                       'Previdência', 'Agricultura', 'Ciência', 'Tecnologia', 'Trabalho', 'Turismo',
+                       'Planejamento', 'Meio Ambiente', 'Comunicações', 'Transportes', 'Minas e Energia')]
+
+CARGOS = ['Analista', 'Técnico', 'Auditor Fiscal', 'Especialista', 'Agente Administrativo',
+          'Pesquisador', 'Professor', 'Médico', 'Engenheiro', 'Procurador', 'Perito', 'Economista']
+
+ESCOLARIDADE_VARIANTS = ['NS', 'NI', 'Nível Superior', 'nivel intermediario', ' NS ', 'NÍVEL SUPERIOR', None]
+
+TIPO_VARIANTS = ['Concurso Público', 'concurso publico', 'Provimento Adicional', 'PROVIMENTO ORIGINÁRIO',
+                 'Provimento Excepcional', 'Contratação Temporária', 'contratacao temporaria', None]
+
+# Canonical columns generated, in sheet order
+COLUMNS = ['Orgao_Entidade', 'Vinculo_Orgao_Entidade', 'Cargos', 'Escolaridade', 'Vagas',
+           'Ato_Oficial', 'Tipo_Autorizacao', 'DOU']
+
+
+def header_variants():
+    """Spellings of each canonical column, taken from HEADER_MAPPING."""
+    variants = defaultdict(list)
+    for raw, canonical in HEADER_MAPPING.items():
+        variants[canonical].append(raw.title() if raw.islower() else raw)
+    return variants
+
+
+def make_rows(rows, rng, year):
+    """Data rows as a DataFrame with canonical column names."""
+    orgaos = rng.choice(ORGAOS, rows)
+    return pd.DataFrame({
+        'Orgao_Entidade': [f"  {o}" if i % 11 == 0 else o for i, o in enumerate(orgaos)],
+        'Vinculo_Orgao_Entidade': rng.choice(ORGAOS[:8] + [None], rows),
+        'Cargos': rng.choice(CARGOS, rows),
+        'Escolaridade': rng.choice(np.array(ESCOLARIDADE_VARIANTS, dtype=object), rows),
+        'Vagas': rng.choice(np.array([1, 2, 5, 10, 20, 50, 100, '15', None], dtype=object), rows),
+        'Ato_Oficial': [f"Portaria nº {n}, de {year}" for n in rng.integers(1, 2000, rows)],
+        'Tipo_Autorizacao': rng.choice(np.array(TIPO_VARIANTS, dtype=object), rows),
+        'DOU': [f"https://www.in.gov.br/web/dou/-/portaria-{n}" for n in rng.integers(10 ** 6, 10 ** 7, rows)],
+    })
+
+
+def make_sheet(rows, preamble, seed=0, year=2024):
+    """
+    Full sheet content (no pandas header): `preamble` title/notes rows, one
+    header row with randomly chosen spellings, then `rows` data rows.
+    """
+    rng = np.random.default_rng(seed)
+    pick = random.Random(seed)
+    variants = header_variants()
+
+    data = make_rows(rows, rng, year)
+    header = [pick.choice(variants[col]) for col in COLUMNS]
+
+    preamble_rows = []
+    for i in range(preamble):
+        note = ["Autorizações de provimento - Governo Federal" if i == 0 else
+                (f"Atualizado em 31/12/{year}" if i == 1 else None)]
+        preamble_rows.append(note + [None] * (len(COLUMNS) - 1))
+
+    body = pd.DataFrame(preamble_rows + [header], columns=COLUMNS)
+    return pd.concat([body, data], ignore_index=True)
+
+
+def _write_xls(sheet, path):
+    """Write a sheet as .xls with xlwt (pandas 2 no longer writes .xls)."""
+    import xlwt
+
+    workbook = xlwt.Workbook(encoding='utf-8')
+    worksheet = workbook.add_sheet('Planilha1')
+    for r, row in enumerate(sheet.itertuples(index=False)):
+        for c, value in enumerate(row):
+            if value is not None and not (isinstance(value, float) and np.isnan(value)):
+                worksheet.write(r, c, value.item() if isinstance(value, np.generic) else value)
+    workbook.save(str(path))
+
+
+def write_workbook(path, rows, preamble, seed=0, year=2024):
+    """
+    Write one synthetic workbook. The format follows the suffix; .xls needs
+    xlwt and is capped at XLS_MAX_ROWS.
+    """
+    path = Path(path)
+    if path.suffix == '.xls':
+        rows = min(rows, XLS_MAX_ROWS - preamble - 1)
+        _write_xls(make_sheet(rows, preamble, seed=seed, year=year), path)
+    else:
+        make_sheet(rows, preamble, seed=seed, year=year).to_excel(path, header=False, index=False)
+    return path
+
+
+def generate_corpus(output_dir, rows, files, fmt='xlsx', preamble=4, seed=0):
+    """
+    Generate `files` workbooks of `rows` data rows in `output_dir`, with
+    years, seeds and header spellings varying per file.
+
+    Returns:
+        list: Paths of the generated workbooks
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(files):
+        year = 2001 + (seed + i) % 25
+        path = output_dir / f"synthetic_{rows}_{i:03d}.{fmt}"
+        paths.append(write_workbook(path, rows, preamble, seed=seed + i, year=year))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic DOU spreadsheets")
+    parser.add_argument('output_dir')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--files', type=int, default=5)
+    parser.add_argument('--format', choices=['xlsx', 'xls'], default='xlsx')
+    parser.add_argument('--preamble', type=int, default=4, help="Rows above the header")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for path in generate_corpus(args.output_dir, args.rows, args.files, args.format, args.preamble, args.seed):
+        print(f"Generated {path}")
+
+
+if __name__ == '__main__':
+    main()
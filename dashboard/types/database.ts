@@ -20,6 +20,7 @@ export type Database = {
           link_publicacao_dou: string | null
           area_atuacao_governamental: string | null
           observacoes: string | null
+          row_fingerprint: string | null
           created_at?: string
           updated_at?: string
         }
@@ -41,6 +42,7 @@ export type Database = {
           link_publicacao_dou?: string | null
           area_atuacao_governamental?: string | null
           observacoes?: string | null
+          row_fingerprint?: string | null
           created_at?: string
           updated_at?: string
         }
@@ -62,10 +64,94 @@ export type Database = {
           link_publicacao_dou?: string | null
           area_atuacao_governamental?: string | null
           observacoes?: string | null
+          row_fingerprint?: string | null
           created_at?: string
           updated_at?: string
         }
       }
+      dashboard_kpis: {
+        Row: {
+          id: number
+          total_vagas: number
+          vagas_ano_atual: number
+          ano_atual: number
+          total_orgaos: number
+          total_registros: number
+          updated_at?: string
+        }
+        Insert: {
+          id: number
+          total_vagas: number
+          vagas_ano_atual: number
+          ano_atual: number
+          total_orgaos: number
+          total_registros: number
+          updated_at?: string
+        }
+        Update: {
+          id?: number
+          total_vagas?: number
+          vagas_ano_atual?: number
+          ano_atual?: number
+          total_orgaos?: number
+          total_registros?: number
+          updated_at?: string
+        }
+      }
+      dashboard_vagas_por_ano: {
+        Row: {
+          ano: number
+          total_vagas: number
+          total_registros: number
+        }
+        Insert: {
+          ano: number
+          total_vagas: number
+          total_registros: number
+        }
+        Update: {
+          ano?: number
+          total_vagas?: number
+          total_registros?: number
+        }
+      }
+      dashboard_vagas_por_orgao: {
+        Row: {
+          orgao_entidade: string
+          rank: number
+          total_vagas: number
+          total_autorizacoes: number
+        }
+        Insert: {
+          orgao_entidade: string
+          rank: number
+          total_vagas: number
+          total_autorizacoes: number
+        }
+        Update: {
+          orgao_entidade?: string
+          rank?: number
+          total_vagas?: number
+          total_autorizacoes?: number
+        }
+      }
+      dashboard_distribuicao_tipo: {
+        Row: {
+          tipo_autorizacao: string
+          quantidade: number
+          total_vagas: number
+        }
+        Insert: {
+          tipo_autorizacao: string
+          quantidade: number
+          total_vagas: number
+        }
+        Update: {
+          tipo_autorizacao?: string
+          quantidade?: number
+          total_vagas?: number
+        }
+      }
     }
   }
 }
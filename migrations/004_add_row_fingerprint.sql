@@ -0,0 +1,15 @@
+-- Migration: Add row fingerprint to autorizacoes_uniao for delta sync
+-- Created: 2025-10-02
+-- Description: Stores a hash of the normalized business columns of each row
+--              (computed by the ETL) under a unique index, so uploads can skip
+--              rows already present and re-runs are idempotent
+
+ALTER TABLE autorizacoes_uniao ADD COLUMN IF NOT EXISTS row_fingerprint TEXT;
+
+-- Unique index used as the ON CONFLICT target of upserts
+-- Rows loaded before this migration keep a NULL fingerprint until the next sync replaces them
+CREATE UNIQUE INDEX IF NOT EXISTS idx_autorizacoes_uniao_row_fingerprint
+  ON autorizacoes_uniao(row_fingerprint);
+
+COMMENT ON COLUMN autorizacoes_uniao.row_fingerprint IS
+  'Hash das colunas de negócio normalizadas (gerado pelo ETL); chave da sincronização incremental';
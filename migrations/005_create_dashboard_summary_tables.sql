@@ -0,0 +1,62 @@
+-- Migration: Create pre-aggregated summary tables for the dashboard
+-- Created: 2025-10-02
+-- Description: Small tables with the dashboard aggregates (KPIs, vagas per year,
+--              vagas per órgão and tipo de autorização distribution), computed by
+--              the ETL during consolidation so the dashboard reads a few rows
+--              instead of scanning autorizacoes_uniao on every request
+
+-- KPI cards (single row, id = 1)
+CREATE TABLE IF NOT EXISTS dashboard_kpis (
+  id SMALLINT PRIMARY KEY CHECK (id = 1),
+  total_vagas BIGINT NOT NULL,
+  vagas_ano_atual BIGINT NOT NULL,
+  ano_atual INTEGER NOT NULL,
+  total_orgaos INTEGER NOT NULL,
+  total_registros INTEGER NOT NULL,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Timeline chart
+CREATE TABLE IF NOT EXISTS dashboard_vagas_por_ano (
+  ano INTEGER PRIMARY KEY,
+  total_vagas BIGINT NOT NULL,
+  total_registros INTEGER NOT NULL
+);
+
+-- Top órgãos chart (all órgãos, ranked; read with ORDER BY rank LIMIT n)
+CREATE TABLE IF NOT EXISTS dashboard_vagas_por_orgao (
+  orgao_entidade TEXT PRIMARY KEY,
+  rank INTEGER NOT NULL,
+  total_vagas BIGINT NOT NULL,
+  total_autorizacoes INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_dashboard_vagas_por_orgao_rank ON dashboard_vagas_por_orgao(rank);
+
+-- Tipo de autorização chart
+CREATE TABLE IF NOT EXISTS dashboard_distribuicao_tipo (
+  tipo_autorizacao TEXT PRIMARY KEY,
+  quantidade INTEGER NOT NULL,
+  total_vagas BIGINT NOT NULL
+);
+
+-- Same security model as autorizacoes_uniao: public read, service_role writes
+ALTER TABLE dashboard_kpis ENABLE ROW LEVEL SECURITY;
+ALTER TABLE dashboard_vagas_por_ano ENABLE ROW LEVEL SECURITY;
+ALTER TABLE dashboard_vagas_por_orgao ENABLE ROW LEVEL SECURITY;
+ALTER TABLE dashboard_distribuicao_tipo ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Enable read access for all users" ON dashboard_kpis FOR SELECT USING (true);
+CREATE POLICY "Enable read access for all users" ON dashboard_vagas_por_ano FOR SELECT USING (true);
+CREATE POLICY "Enable read access for all users" ON dashboard_vagas_por_orgao FOR SELECT USING (true);
+CREATE POLICY "Enable read access for all users" ON dashboard_distribuicao_tipo FOR SELECT USING (true);
+
+CREATE POLICY "Enable write for service role only" ON dashboard_kpis FOR ALL TO service_role USING (true) WITH CHECK (true);
+CREATE POLICY "Enable write for service role only" ON dashboard_vagas_por_ano FOR ALL TO service_role USING (true) WITH CHECK (true);
+CREATE POLICY "Enable write for service role only" ON dashboard_vagas_por_orgao FOR ALL TO service_role USING (true) WITH CHECK (true);
+CREATE POLICY "Enable write for service role only" ON dashboard_distribuicao_tipo FOR ALL TO service_role USING (true) WITH CHECK (true);
+
+COMMENT ON TABLE dashboard_kpis IS 'Indicadores do dashboard pré-calculados pelo ETL';
+COMMENT ON TABLE dashboard_vagas_por_ano IS 'Vagas e registros por ano de publicação, pré-calculados pelo ETL';
+COMMENT ON TABLE dashboard_vagas_por_orgao IS 'Vagas e autorizações por órgão com ranking, pré-calculados pelo ETL';
+COMMENT ON TABLE dashboard_distribuicao_tipo IS 'Distribuição por tipo de autorização, pré-calculada pelo ETL';
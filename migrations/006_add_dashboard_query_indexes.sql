@@ -0,0 +1,40 @@
+-- Migration: Indexes for the dashboard explorer and aggregate queries
+-- Created: 2025-10-03
+-- Description: Replaces the single-column B-trees of migration 001 with indexes
+--              matching how the dashboard reads autorizacoes_uniao: year range
+--              plus órgão filters sorted by year, tipo de autorização by year,
+--              substring search (ILIKE '%...%') on órgão and cargo, and the
+--              vagas aggregates per year, órgão and tipo.
+--              benchmarks/bench_query_indexes.py measures the query shapes
+--              with EXPLAIN (ANALYZE, BUFFERS) before and after this migration.
+
+-- Trigram operator classes for substring search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Explorer: WHERE dou_publicacao_ano BETWEEN ... [AND orgao_entidade = ...] ORDER BY dou_publicacao_ano
+-- INCLUDE (vagas) lets the vagas-per-year aggregate run as an index-only scan
+CREATE INDEX IF NOT EXISTS idx_autorizacoes_uniao_ano_orgao
+  ON autorizacoes_uniao(dou_publicacao_ano, orgao_entidade) INCLUDE (vagas);
+
+-- WHERE tipo_autorizacao = ... AND dou_publicacao_ano BETWEEN ...; covers the tipo distribution
+CREATE INDEX IF NOT EXISTS idx_autorizacoes_uniao_tipo_ano
+  ON autorizacoes_uniao(tipo_autorizacao, dou_publicacao_ano) INCLUDE (vagas);
+
+-- WHERE orgao_entidade = ...; covers the vagas-per-órgão ranking
+CREATE INDEX IF NOT EXISTS idx_autorizacoes_uniao_orgao_vagas
+  ON autorizacoes_uniao(orgao_entidade) INCLUDE (vagas);
+
+-- Substring search: orgao_entidade ILIKE '%saúde%', cargos ILIKE '%auditor%'
+CREATE INDEX IF NOT EXISTS idx_autorizacoes_uniao_orgao_trgm
+  ON autorizacoes_uniao USING GIN (orgao_entidade gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_autorizacoes_uniao_cargo_trgm
+  ON autorizacoes_uniao USING GIN (cargos gin_trgm_ops);
+
+-- Superseded by the indexes above (same leading column); idx_autorizacoes_uniao_cargo
+-- stays for equality lookups on cargos
+DROP INDEX IF EXISTS idx_autorizacoes_uniao_ano;
+DROP INDEX IF EXISTS idx_autorizacoes_uniao_tipo_autorizacao;
+DROP INDEX IF EXISTS idx_autorizacoes_uniao_orgao;
+
+-- Fresh statistics so the planner picks the new indexes right away
+ANALYZE autorizacoes_uniao;
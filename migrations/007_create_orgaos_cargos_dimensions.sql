@@ -0,0 +1,43 @@
+-- Migration: Create orgaos and cargos dimension tables
+-- Created: 2025-10-03
+-- Description: Canonical órgãos and cargos resolved by the ETL (spelling,
+--              accent, acronym and abbreviation variants of a name share one
+--              ID, see src/planilhas_gov_br/entities.py), referenced by integer
+--              foreign keys from autorizacoes_uniao. The IDs are stable across
+--              runs (data/processed/entity_registry.json); the loaders upsert
+--              the dimension rows before the fact rows.
+
+CREATE TABLE IF NOT EXISTS orgaos (
+  id INTEGER PRIMARY KEY,
+  nome TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS cargos (
+  id INTEGER PRIMARY KEY,
+  nome TEXT NOT NULL
+);
+
+-- Raw orgao_entidade and cargos are kept alongside for auditing and the row fingerprint
+ALTER TABLE autorizacoes_uniao ADD COLUMN IF NOT EXISTS orgao_id INTEGER REFERENCES orgaos(id);
+ALTER TABLE autorizacoes_uniao ADD COLUMN IF NOT EXISTS cargo_id INTEGER REFERENCES cargos(id);
+
+-- Integer group-bys and joins; INCLUDE (vagas) covers the vagas-per-órgão aggregate
+CREATE INDEX IF NOT EXISTS idx_autorizacoes_uniao_orgao_id
+  ON autorizacoes_uniao(orgao_id) INCLUDE (vagas);
+CREATE INDEX IF NOT EXISTS idx_autorizacoes_uniao_cargo_id
+  ON autorizacoes_uniao(cargo_id);
+
+-- Same security model as autorizacoes_uniao: public read, service_role writes
+ALTER TABLE orgaos ENABLE ROW LEVEL SECURITY;
+ALTER TABLE cargos ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Enable read access for all users" ON orgaos FOR SELECT USING (true);
+CREATE POLICY "Enable read access for all users" ON cargos FOR SELECT USING (true);
+
+CREATE POLICY "Enable write for service role only" ON orgaos FOR ALL TO service_role USING (true) WITH CHECK (true);
+CREATE POLICY "Enable write for service role only" ON cargos FOR ALL TO service_role USING (true) WITH CHECK (true);
+
+COMMENT ON TABLE orgaos IS 'Órgãos canônicos resolvidos pelo ETL (variantes de grafia agrupadas)';
+COMMENT ON TABLE cargos IS 'Cargos canônicos resolvidos pelo ETL (variantes de grafia agrupadas)';
+COMMENT ON COLUMN autorizacoes_uniao.orgao_id IS 'Órgão canônico (orgaos.id)';
+COMMENT ON COLUMN autorizacoes_uniao.cargo_id IS 'Cargo canônico (cargos.id)';
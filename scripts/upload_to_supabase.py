@@ -1,3 +1,4 @@
+import argparse
 import os
 import pandas as pd
 from pathlib import Path
@@ -5,6 +6,9 @@ from supabase import create_client, Client
 from dotenv import load_dotenv
 import logging
 
+from planilhas_gov_br import ndjson, records
+from planilhas_gov_br.journal import UploadJournal, journal_path, range_digest
+
 # Load environment variables
 load_dotenv()
 
@@ -12,7 +16,45 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def upload_consolidated_data_to_supabase():
+def file_snapshot(table, data_file):
+    """Journal key of an upload of `data_file` into `table`: the file a processing run wrote"""
+    stat = data_file.stat()
+    return f"{table}:{data_file.name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def read_consolidated_data(processed_dir):
+    """
+    Read the consolidated CSV. government_data mirrors it: spreadsheet header
+    names and every column. consolidated_data.parquet only holds the
+    autorizacoes_uniao columns under database names, so it is not read here,
+    whether or not pyarrow is installed.
+
+    Returns:
+        tuple: (data file, dataframe)
+    """
+    csv_file = Path(processed_dir) / 'consolidated_data.csv'
+    return csv_file, pd.read_csv(csv_file)
+
+
+def upload_batches(supabase, table, batches, journal):
+    """
+    Insert the record batches in order, skipping the ones the journal recorded
+    as committed with the same content, and journal each inserted batch
+    """
+    start = 0
+    for batch in batches:
+        stop = start + len(batch)
+        digest = range_digest(records.dumps(row) for row in batch)
+        if journal.is_committed(start, stop, digest):
+            logger.info(f"Skipping {table} rows {start} to {stop} (already committed)")
+        else:
+            supabase.table(table).insert(batch).execute()
+            logger.info(f"Uploaded {table} rows {start} to {stop} — {journal.commit(start, stop, digest)}")
+        start = stop
+    return start
+
+
+def upload_consolidated_data_to_supabase(resume=False):
     # Initialize Supabase client using environment variables
     url = os.environ.get("SUPABASE_URL")
     key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
@@ -20,48 +62,63 @@ def upload_consolidated_data_to_supabase():
 
     # Get project root and data files
     project_root = Path(__file__).parent.parent
-    csv_file = project_root / 'data' / 'processed' / 'consolidated_data.csv'
     json_file = project_root / 'data' / 'processed' / 'consolidated_data.json'
+    processed_dir = project_root / 'data' / 'processed'
 
     # Read the consolidated data
-    df = pd.read_csv(csv_file)
+    data_file, df = read_consolidated_data(processed_dir)
     
     # Clean and normalize data before upload (following best practices)
-    # Replace NaN values with None (which becomes NULL in the database)
-    df = df.where(pd.notnull(df), None)
+    # JSON-ready records: NaN values become None (which becomes NULL in the database)
+    rows = records.JSONRecords(df)
     
     # Upload data in batches to handle large datasets
     batch_size = 1000
-    total_uploaded = 0
+
+    # Inserts are not idempotent: the journals record every committed batch so
+    # --resume continues an interrupted run instead of inserting rows twice
+    journal = UploadJournal.open(journal_path(processed_dir, 'government_data'),
+                                 file_snapshot('government_data', data_file), total=len(df), resume=resume)
+    json_journal = None
     
     try:
-        for i in range(0, len(df), batch_size):
-            batch = df.iloc[i:i + batch_size].to_dict(orient='records')
-            
-            # Insert the batch into your Supabase table
-            # Note: Replace 'your_table_name' with your actual table name
-            response = supabase.table('government_data').insert(batch).execute()
-            
-            total_uploaded += len(batch)
-            logger.info(f"Uploaded batch starting at row {i}, total uploaded: {total_uploaded}")
+        total_uploaded = upload_batches(
+            supabase, 'government_data',
+            (rows[i:i + batch_size] for i in range(0, len(rows), batch_size)), journal)
         
         logger.info(f"Successfully uploaded all {total_uploaded} records to Supabase")
 
         # Also upload to a separate table for JSON format if needed
-        df_json = pd.read_json(json_file)
-        df_json = df_json.where(pd.notnull(df_json), None)
-        
-        for i in range(0, len(df_json), batch_size):
-            batch = df_json.iloc[i:i + batch_size].to_dict(orient='records')
-            response = supabase.table('government_data_json').insert(batch).execute()
-            
-            logger.info(f"Uploaded JSON batch starting at row {i}")
+        ndjson_file = ndjson.find_ndjson(json_file.parent)
+        if ndjson_file is not None and (not json_file.exists() or ndjson_file.stat().st_mtime >= json_file.stat().st_mtime):
+            # Latest export is streamed NDJSON: read it chunk by chunk
+            json_source = ndjson_file
+            json_batches = ndjson.iter_ndjson(ndjson_file, chunksize=batch_size)
+        else:
+            json_source = json_file
+            df_json = pd.read_json(json_file)
+            json_batches = (df_json.iloc[i:i + batch_size] for i in range(0, len(df_json), batch_size))
+
+        # Same rows as the consolidated data, so its length gives the ETA
+        json_journal = UploadJournal.open(journal_path(processed_dir, 'government_data_json'),
+                                          file_snapshot('government_data_json', json_source),
+                                          total=len(df), resume=resume)
+        upload_batches(supabase, 'government_data_json',
+                       (records.JSONRecords(batch_df)[:] for batch_df in json_batches), json_journal)
         
         logger.info("Successfully uploaded JSON data to Supabase")
         
     except Exception as e:
         logger.error(f"Error uploading data to Supabase: {str(e)}")
+        logger.error("Rerun with --resume to continue from the first uncommitted batch")
         raise
+    finally:
+        journal.close()
+        if json_journal is not None:
+            json_journal.close()
 
 if __name__ == "__main__":
-    upload_consolidated_data_to_supabase()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Upload the consolidated data to the government_data tables")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip the batches committed by an interrupted run of the same files")
+    upload_consolidated_data_to_supabase(resume=parser.parse_args().resume)
\ No newline at end of file
@@ -0,0 +1,5 @@
+import sys
+
+from planilhas_gov_br.cli import main
+
+sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Canonicalization of categorical values (tipo de autorização, escolaridade).
+
+Rules are declared as tables and compiled into a single regex, so each raw
+value is scanned once. Results are memoized per raw value and the memo can be
+persisted to JSON, letting both the processing and the upload scripts reuse it.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+
+# Bump whenever the rule tables below change so persisted memos are discarded
+RULES_VERSION = "1"
+
+MEMO_FILENAME = 'canonical_memo.json'
+
+# Rules listed by priority: the first rule with a term found in the uppercased
+# value wins. Terms are plain substrings.
+TIPO_AUTORIZACAO_RULES = [
+    ('Concurso Público', ['PUBLICO', 'PÚBLICO']),
+    ('Provimento Originário', ['ORIGINARIO', 'ORIGINÁRIO']),
+    ('Provimento Adicional', ['ADICIONAL']),
+    ('Provimento Excepcional', ['EXCEPCIONAL']),
+    ('Contratação Temporária', ['CONTRATACAO', 'CONTRATAÇÃO', 'TEMPORARIA', 'TEMPORÁRIA']),
+    # A bare "provimento" without qualifier is treated as originário
+    ('Provimento Originário', ['PROVIMENTO']),
+]
+
+# Exact (uppercased) aliases for escolaridade
+ESCOLARIDADE_ALIASES = {
+    'Nível Intermediário': ['NI', 'NIVEL INTERMEDIARIO', 'NÍVEL INTERMEDIÁRIO', 'NIVEL INTERMEDIÁRIO'],
+    'Nível Superior': ['NS', 'NIVEL SUPERIOR', 'NÍVEL SUPERIOR'],
+}
+
+
+class RuleMatcher:
+    """
+    Compile a prioritized (canonical, terms) table into one alternation regex.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        alternatives = []
+        for priority, (_, terms) in enumerate(rules):
+            # Longest terms first so a longer term is not shadowed by its prefix
+            group = '|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+            alternatives.append(f'(?P<r{priority}>{group})')
+        self.pattern = re.compile('|'.join(alternatives))
+
+    def match(self, value):
+        """Return the canonical value of the highest-priority matching rule, or None."""
+        best = None
+        for match in self.pattern.finditer(value.upper()):
+            priority = int(match.lastgroup[1:])
+            if best is None or priority < best:
+                best = priority
+                if best == 0:
+                    break
+        return None if best is None else self.rules[best][0]
+
+
+TIPO_AUTORIZACAO_MATCHER = RuleMatcher(TIPO_AUTORIZACAO_RULES)
+
+ESCOLARIDADE_LOOKUP = {
+    alias: canonical
+    for canonical, aliases in ESCOLARIDADE_ALIASES.items()
+    for alias in aliases
+}
+
+
+def resolve_tipo_autorizacao(value):
+    """Apply the tipo de autorização rules to a string value (no memo)."""
+    value = value.strip()
+    canonical = TIPO_AUTORIZACAO_MATCHER.match(value)
+    return canonical if canonical is not None else value.title()
+
+
+def resolve_escolaridade(value):
+    """Apply the escolaridade aliases to a string value (no memo)."""
+    value = value.strip().upper()
+    return ESCOLARIDADE_LOOKUP.get(value, value.title())
+
+
+RESOLVERS = {
+    'tipo_autorizacao': resolve_tipo_autorizacao,
+    'escolaridade': resolve_escolaridade,
+}
+
+
+class CanonicalMemo:
+    """
+    Memo of raw value -> canonical value, per kind ('tipo_autorizacao',
+    'escolaridade'). Entries added since load are tracked so worker processes
+    can hand them back to the parent.
+    """
+
+    def __init__(self, entries=None):
+        self.entries = {kind: {} for kind in RESOLVERS}
+        self.new_entries = {kind: {} for kind in RESOLVERS}
+        if entries:
+            self.merge(entries, track=False)
+
+    def canonicalize(self, kind, value):
+        """Return the canonical form of a string value, computing it once."""
+        known = self.entries[kind]
+        canonical = known.get(value)
+        if canonical is None:
+            canonical = RESOLVERS[kind](value)
+            known[value] = canonical
+            self.new_entries[kind][value] = canonical
+        return canonical
+
+    def merge(self, entries, track=True):
+        """Add entries (as returned by pop_new_entries) to the memo."""
+        for kind, mapping in entries.items():
+            if kind not in self.entries:
+                continue
+            self.entries[kind].update(mapping)
+            if track:
+                self.new_entries[kind].update(mapping)
+
+    def pop_new_entries(self):
+        """Return and reset the entries added since the last call."""
+        new_entries = self.new_entries
+        self.new_entries = {kind: {} for kind in RESOLVERS}
+        return new_entries
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a memo from JSON. A missing, unreadable or outdated file (other
+        RULES_VERSION) yields an empty memo.
+        """
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        if data.get('rules_version') != RULES_VERSION:
+            return cls()
+        return cls(data.get('entries'))
+
+    def save(self, path):
+        """Write the memo to JSON atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'rules_version': RULES_VERSION, 'entries': self.entries}, f,
+                      indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, path)
+
+
+# Process-wide memo used by the helpers below
+memo = CanonicalMemo()
+
+
+def load_memo(path):
+    """Replace the process-wide memo with the one persisted at `path`."""
+    global memo
+    memo = CanonicalMemo.load(path)
+    return memo
+
+
+def canonical_tipo_autorizacao(value):
+    """Canonical tipo de autorização for a string value, via the memo."""
+    return memo.canonicalize('tipo_autorizacao', value)
+
+
+def canonical_escolaridade(value):
+    """Canonical escolaridade for a string value, via the memo."""
+    return memo.canonicalize('escolaridade', value)
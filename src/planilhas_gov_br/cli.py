@@ -0,0 +1,289 @@
+"""
+`planilhas-gov-br` command line.
+
+    planilhas-gov-br process [--workers N] [--full] [--streaming] ...
+    planilhas-gov-br upload [--method rest|copy] [--sync] ...
+    planilhas-gov-br migrate [FILE]
+    planilhas-gov-br status [--json] [--check]
+    planilhas-gov-br serve [--host HOST] [--port PORT]
+    planilhas-gov-br bench [run_benchmarks.py options]
+
+Only the standard library is imported at startup; pandas, supabase and the
+pipeline modules are imported inside the commands that need them, so `--help`
+and `status` stay fast for cron wrappers and health checks.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Same as pgload.LOAD_MODES, which is not imported here to keep pandas out of startup
+LOAD_MODES = ('replace', 'append', 'sync')
+
+# Same as readers.ENGINES
+EXCEL_ENGINES = ('calamine', 'openpyxl', 'xlrd')
+
+ENV_VARS = ('SUPABASE_URL', 'SUPABASE_SERVICE_ROLE_KEY', 'POSTGRES_URL_NON_POOLING')
+
+
+def _load_env():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+def _size(text):
+    from planilhas_gov_br.instrumentation import parse_size
+
+    try:
+        return parse_size(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def cmd_process(args):
+    from planilhas_gov_br.processing import process_spreadsheets
+
+    process_spreadsheets(args.root, workers=args.workers, full=args.full, json_format=args.json_format,
+                         gzip_json=args.gzip, metrics_file=args.metrics_file, streaming=args.streaming,
+                         dedupe_rows=not args.keep_duplicates, memory_budget=args.memory_budget,
+                         excel_engine=args.excel_engine)
+    return 0
+
+
+def cmd_upload(args):
+    _load_env()
+    from planilhas_gov_br import upload
+
+    if args.method == 'copy':
+        upload.bulk_load_government_data(args.root, mode='sync' if args.sync else args.copy_mode,
+                                         metrics_file=args.metrics_file, memory_budget=args.memory_budget)
+    else:
+        upload.upload_government_data_to_supabase(args.root, workers=args.workers, batch_size=args.batch_size,
+                                                  sync=args.sync, metrics_file=args.metrics_file,
+                                                  memory_budget=args.memory_budget, resume=args.resume)
+    return 0
+
+
+def cmd_serve(args):
+    from planilhas_gov_br.service import serve
+
+    serve(Path(args.root) / 'data' / 'processed', host=args.host, port=args.port, cache_size=args.cache_size,
+          reload_interval=args.reload_interval)
+    return 0
+
+
+def cmd_migrate(args):
+    _load_env()
+    from planilhas_gov_br.migrate import apply_migration
+
+    return 0 if apply_migration(Path(args.root) / 'migrations', args.file) else 1
+
+
+def collect_status(root):
+    """
+    Pending work and last-run information for a project root, without
+    importing pandas.
+
+    Returns:
+        dict: JSON-ready status
+    """
+    from planilhas_gov_br import instrumentation
+    from planilhas_gov_br.manifest import MANIFEST_FILENAME, is_unchanged, load_manifest
+
+    root = Path(root)
+    raw_dir = root / 'data' / 'raw'
+    processed_dir = root / 'data' / 'processed'
+    excel_files = sorted(list(raw_dir.glob('*.xls')) + list(raw_dir.glob('*.xlsx')))
+
+    manifest = load_manifest(processed_dir / MANIFEST_FILENAME)
+    entries = manifest['files']
+    files = []
+    for excel_file in excel_files:
+        entry = entries.get(excel_file.name)
+        if entry is None:
+            state = 'new'
+        elif not is_unchanged(excel_file, entry, processed_dir / 'cache')[0]:
+            state = 'modified'
+        else:
+            state = entry.get('status', 'unknown')
+        files.append({'file': excel_file.name, 'state': state, 'rows': entry.get('rows') if entry else None})
+
+    outputs = {}
+    for name in ('consolidated_data.csv', 'consolidated_data.json', 'consolidated_data.ndjson',
+                 'consolidated_data.ndjson.gz', 'consolidated_data.parquet', 'dashboard_summaries.json',
+                 'dedupe_report.json', 'consolidated_provenance.csv'):
+        path = processed_dir / name
+        if path.exists():
+            stat = path.stat()
+            outputs[name] = {'bytes': stat.st_size,
+                             'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(timespec='seconds')}
+
+    last_runs = {}
+    for name in (instrumentation.REPORT_FILENAME, 'upload_run_report.json'):
+        path = processed_dir / name
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    report = json.load(f)
+            except (OSError, ValueError):
+                continue
+            last_runs[report.get('pipeline', name)] = {
+                'finished_at': report.get('finished_at'),
+                'duration_seconds': report.get('duration_seconds'),
+                'files_failed': report.get('files_failed'),
+                'failed_rows': report.get('failed_rows'),
+            }
+
+    counts = {}
+    for f in files:
+        counts[f['state']] = counts.get(f['state'], 0) + 1
+
+    return {
+        'root': str(root.resolve()),
+        'files': files,
+        'counts': counts,
+        'pending': counts.get('new', 0) + counts.get('modified', 0),
+        'outputs': outputs,
+        'last_runs': last_runs,
+        'env': {var: bool(os.environ.get(var)) for var in ENV_VARS},
+    }
+
+
+def cmd_status(args):
+    _load_env()
+    status = collect_status(args.root)
+
+    if args.json:
+        print(json.dumps(status, indent=2, ensure_ascii=False))
+    else:
+        print(f"Project: {status['root']}")
+        print(f"Workbooks: {len(status['files'])} "
+              f"({', '.join(f'{n} {state}' for state, n in sorted(status['counts'].items())) or 'none'})")
+        for f in status['files']:
+            if f['state'] != 'ok':
+                print(f"  {f['state']:<9} {f['file']}")
+        for name, info in status['outputs'].items():
+            print(f"Output: {name} ({info['bytes']} bytes, {info['modified']})")
+        for pipeline, run in status['last_runs'].items():
+            print(f"Last {pipeline} run: {run['finished_at']} ({run['duration_seconds'] or 0:.1f}s)")
+        print("Environment: " + ', '.join(f"{var} {'set' if ok else 'missing'}" for var, ok in status['env'].items()))
+
+    failed = status['counts'].get('error', 0)
+    if args.check and (status['pending'] or failed):
+        return 1
+    return 0
+
+
+def cmd_bench(args):
+    import runpy
+
+    script = Path(args.root) / 'benchmarks' / 'run_benchmarks.py'
+    if not script.exists():
+        print(f"Benchmark runner not found: {script}", file=sys.stderr)
+        return 1
+    sys.argv = [str(script)] + args.bench_args
+    runpy.run_path(str(script), run_name='__main__')
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='planilhas-gov-br',
+                                     description="ETL for the DOU public competition spreadsheets")
+    parser.add_argument('--root', default='.',
+                        help="Project root holding data/, migrations/ and benchmarks/ (default: .)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    process = subparsers.add_parser('process', help="Convert data/raw spreadsheets to the consolidated outputs")
+    process.add_argument('--workers', type=int, default=1,
+                         help="Number of worker processes for per-file processing (default: 1)")
+    process.add_argument('--full', action='store_true',
+                         help="Ignore the manifest and reprocess every file")
+    process.add_argument('--json-format', choices=['json', 'ndjson'], default='json',
+                         help="Consolidated JSON as an indented document or streamed NDJSON (default: json)")
+    process.add_argument('--gzip', action='store_true',
+                         help="Gzip the NDJSON output")
+    process.add_argument('--streaming', action='store_true',
+                         help="Consolidate one file at a time so peak memory is about one workbook")
+    process.add_argument('--keep-duplicates', action='store_true',
+                         help="Keep rows repeated across overlapping workbooks (default: remove them and "
+                              "write their provenance)")
+    process.add_argument('--metrics-file',
+                         help="Also write the run metrics as a Prometheus textfile (e.g. for node_exporter)")
+    process.add_argument('--memory-budget', type=_size,
+                         help="Peak RSS budget, e.g. 512M or 2G: consolidate in streaming mode when the in-memory "
+                              "consolidation would not fit, and fail once the peak goes over it")
+    process.add_argument('--excel-engine', choices=('auto',) + EXCEL_ENGINES, default='auto',
+                         help="Excel engine tried first for each workbook; the other engines for its format are "
+                              "fallbacks (default: auto, calamine when installed)")
+    process.set_defaults(func=cmd_process)
+
+    upload = subparsers.add_parser('upload', help="Load the consolidated data into the autorizacoes_uniao table")
+    upload.add_argument('--workers', type=int, default=4,
+                        help="Batches kept in flight at once (default: 4)")
+    upload.add_argument('--batch-size', type=int, default=1000,
+                        help="Initial batch size; adapted to the observed latency (default: 1000)")
+    upload.add_argument('--sync', action='store_true',
+                        help="Delta sync: only insert rows missing remotely and delete rows no longer present "
+                             "(with --method copy, same as --copy-mode sync)")
+    upload.add_argument('--resume', action='store_true',
+                        help="Continue an interrupted REST upload of the same data, skipping the batches its "
+                             "journal (data/processed/upload_journal) recorded as committed; COPY loads are a "
+                             "single transaction and always start over")
+    upload.add_argument('--method', choices=['rest', 'copy'], default='rest',
+                        help="Insert through the Supabase REST API or bulk load with COPY "
+                             "over POSTGRES_URL_NON_POOLING (default: rest)")
+    upload.add_argument('--copy-mode', choices=LOAD_MODES, default='replace',
+                        help="With --method copy: replace the table contents, append, or sync by fingerprint "
+                             "(default: replace)")
+    upload.add_argument('--metrics-file',
+                        help="Also write the run metrics as a Prometheus textfile (e.g. for node_exporter)")
+    upload.add_argument('--memory-budget', type=_size,
+                        help="Peak RSS budget, e.g. 512M or 2G: fail before uploading once the peak goes over it")
+    upload.set_defaults(func=cmd_upload)
+
+    migrate = subparsers.add_parser('migrate', help="Apply the SQL migrations")
+    migrate.add_argument('file', nargs='?', help="Single migration file to apply (default: all, in order)")
+    migrate.set_defaults(func=cmd_migrate)
+
+    status = subparsers.add_parser('status', help="Show pending workbooks, outputs and the last runs")
+    status.add_argument('--json', action='store_true', help="Print the status as JSON")
+    status.add_argument('--check', action='store_true',
+                        help="Exit with status 1 when workbooks are pending or failed (for health checks)")
+    status.set_defaults(func=cmd_status)
+
+    serve = subparsers.add_parser('serve', help="Serve the dashboard queries over HTTP from the consolidated data")
+    serve.add_argument('--host', default='127.0.0.1', help="Address to listen on (default: 127.0.0.1)")
+    serve.add_argument('--port', type=int, default=8765, help="Port to listen on (default: 8765)")
+    serve.add_argument('--cache-size', type=int, default=1024,
+                       help="Responses kept in the LRU cache (default: 1024)")
+    serve.add_argument('--reload-interval', type=float, default=5.0,
+                       help="Seconds between checks for a new consolidated snapshot (default: 5)")
+    serve.set_defaults(func=cmd_serve)
+
+    bench = subparsers.add_parser('bench', help="Run benchmarks/run_benchmarks.py (options are passed through)")
+    bench.add_argument('bench_args', nargs=argparse.REMAINDER)
+    bench.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def main(argv=None):
+    # Standard library only, like the parser
+    from planilhas_gov_br.instrumentation import MemoryBudgetExceeded
+
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    try:
+        return args.func(args)
+    except MemoryBudgetExceeded as e:
+        logging.error(str(e))
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Typed columnar (Parquet) intermediate between processing and upload.
+
+pyarrow is an optional dependency (`pip install planilhas_gov_br[parquet]`);
+callers should check `is_available()` and fall back to CSV without it.
+"""
+
+import pandas as pd
+
+from planilhas_gov_br.schema import AUTORIZACOES_UNIAO_COLUMNS, coerce_to_schema
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None
+    pq = None
+
+PARQUET_FILENAME = 'consolidated_data.parquet'
+
+
+def is_available():
+    """Return True when pyarrow is installed."""
+    return pa is not None
+
+
+def arrow_schema():
+    """Arrow schema matching the autorizacoes_uniao table."""
+    types = {'string': pa.string(), 'int': pa.int64(), 'float': pa.float64()}
+    return pa.schema([pa.field(col, types[kind]) for col, kind in AUTORIZACOES_UNIAO_COLUMNS])
+
+
+def to_arrow(df):
+    """
+    Arrow table of a frame with database column names, coerced to the table
+    schema. The schema carries the pandas metadata, so pd.read_parquet restores
+    the nullable integer and string dtypes.
+    """
+    return pa.Table.from_pandas(coerce_to_schema(df), schema=arrow_schema(), preserve_index=False)
+
+
+def write_parquet(df, path):
+    """
+    Coerce a frame with database column names to the table schema and write it
+    as Parquet.
+
+    Returns:
+        int: Number of rows written
+    """
+    table = to_arrow(df)
+    pq.write_table(table, path, compression='zstd')
+    return table.num_rows
+
+
+class ParquetAppender:
+    """
+    Append frames with database column names to one Parquet file, one row
+    group per write, so the whole dataset never has to be in memory.
+
+    Usage:
+        with ParquetAppender(path) as writer:
+            writer.write(df)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows_written = 0
+        self._writer = None
+
+    def __enter__(self):
+        # Same schema and pandas metadata as write_parquet (from an empty frame)
+        schema = to_arrow(pd.DataFrame(columns=[col for col, _ in AUTORIZACOES_UNIAO_COLUMNS])).schema
+        self._writer = pq.ParquetWriter(self.path, schema, compression='zstd')
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, df):
+        table = to_arrow(df)
+        self._writer.write_table(table)
+        self.rows_written += table.num_rows
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def read_parquet(path, arrow_strings=False):
+    """
+    Read the Parquet intermediate memory-mapped. Integers come back as nullable
+    Int64 and text as object columns holding str or None, or as pyarrow-backed
+    strings (no Python object per value) with `arrow_strings`.
+    """
+    table = pq.read_table(path, memory_map=True, schema=arrow_schema())
+    types = {pa.int64(): pd.Int64Dtype()}
+    if arrow_strings:
+        types[pa.string()] = pd.StringDtype('pyarrow')
+    return table.to_pandas(types_mapper=types.get)
@@ -0,0 +1,171 @@
+"""
+Deduplication of rows repeated across overlapping spreadsheets.
+
+The same ato oficial and cargo appear in the yearly workbooks and again in the
+cumulative ones. Rows are keyed on normalized business columns (DEDUPE_KEY_COLUMNS:
+text casefolded, accents, punctuation and repeated spaces removed) and looked
+up in a hash index of the rows kept so far, so the whole corpus is deduplicated
+in one pass over its rows.
+
+The n-th occurrence of a key within a file is matched with the n-th occurrence
+in earlier files: rows repeated inside one workbook are kept, the copies of
+those rows in other workbooks are removed. The source files of every kept row
+are recorded as provenance.
+"""
+
+import csv
+import hashlib
+import os
+import re
+import unicodedata
+
+import numpy as np
+
+from planilhas_gov_br.extract import map_unique_strings
+from planilhas_gov_br.schema import coerce_to_schema, normalize_column_names
+
+REPORT_FILENAME = 'dedupe_report.json'
+
+PROVENANCE_FILENAME = 'consolidated_provenance.csv'
+
+# autorizacoes_uniao columns identifying an authorization
+DEDUPE_KEY_COLUMNS = ['orgao_entidade', 'cargos', 'ato_oficial', 'vagas', 'dou_publicacao_ano']
+
+# Separator of the source files in the provenance CSV
+SOURCES_SEPARATOR = ';'
+
+_PUNCTUATION = re.compile(r'[^\w]+')
+
+
+def fold_text(value):
+    """Casefold a string and drop accents, punctuation and repeated whitespace."""
+    decomposed = unicodedata.normalize('NFKD', value)
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(_PUNCTUATION.sub(' ', stripped.casefold()).split())
+
+
+def key_frame(df, key_columns=DEDUPE_KEY_COLUMNS):
+    """Key columns of a frame with spreadsheet or database column names, typed as in the table."""
+    db_df = normalize_column_names(df.copy())
+    return coerce_to_schema(db_df)[list(key_columns)]
+
+
+def _joined(keys):
+    """One string per row; '\\x00' marks nulls so they differ from empty strings."""
+    parts = [keys[col].astype('string').fillna('\x00') for col in keys.columns]
+    return parts[0].str.cat(parts[1:], sep='\x1f')
+
+
+def _digests(keys):
+    return [hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest() for key in keys]
+
+
+def row_keys(df, key_columns=DEDUPE_KEY_COLUMNS):
+    """
+    Exact and normalized key digests of each row, and whether the row has any
+    key value at all (rows without one are never treated as duplicates).
+
+    The normalized key includes the occurrence number of the key within `df`.
+
+    Returns:
+        tuple: (exact digests, normalized digests, identifiable mask)
+    """
+    keys = key_frame(df, key_columns)
+    identifiable = keys.notna().any(axis=1).to_numpy()
+
+    folded = keys.copy()
+    for col in folded.columns:
+        if folded[col].dtype == 'string':
+            folded[col] = map_unique_strings(folded[col].astype(object), fold_text).astype('string')
+    normalized = _joined(folded)
+    occurrence = normalized.groupby(normalized, sort=False).cumcount().astype(str)
+    normalized = normalized.str.cat(occurrence, sep='\x1e')
+
+    return _digests(_joined(keys)), _digests(normalized), identifiable
+
+
+class DuplicateIndex:
+    """
+    Hash index of the normalized keys of the rows kept so far.
+
+    Frames are passed through filter() in consolidation order; `sources` holds
+    the source files of each kept row, by position in the deduplicated output.
+    """
+
+    def __init__(self, key_columns=DEDUPE_KEY_COLUMNS):
+        self.key_columns = list(key_columns)
+        self.sources = []
+        self.files = {}
+        self._index = {}
+
+    def filter(self, df, source):
+        """
+        Drop the rows of `df` already kept from an earlier frame.
+
+        Args:
+            df: Frame with spreadsheet or database column names
+            source (str): Name of the file the frame came from
+
+        Returns:
+            DataFrame: The rows of df seen for the first time
+        """
+        stats = self.files.setdefault(source, {
+            'rows': 0, 'kept': 0, 'removed_exact': 0, 'removed_normalized': 0, 'duplicate_of': {}})
+        stats['rows'] += len(df)
+        if df.empty:
+            return df
+
+        exact, normalized, identifiable = row_keys(df, self.key_columns)
+        keep = np.ones(len(df), dtype=bool)
+        index = self._index
+        sources = self.sources
+        duplicate_of = stats['duplicate_of']
+
+        for i in range(len(df)):
+            if identifiable[i]:
+                hit = index.get(normalized[i])
+                if hit is not None:
+                    position, kept_exact = hit
+                    keep[i] = False
+                    stats['removed_exact' if kept_exact == exact[i] else 'removed_normalized'] += 1
+                    row_sources = sources[position]
+                    duplicate_of[row_sources[0]] = duplicate_of.get(row_sources[0], 0) + 1
+                    if source not in row_sources:
+                        row_sources.append(source)
+                    continue
+                index[normalized[i]] = (len(sources), exact[i])
+            sources.append([source])
+
+        stats['kept'] += int(keep.sum())
+        return df if keep.all() else df[keep]
+
+    @property
+    def removed(self):
+        return sum(f['removed_exact'] + f['removed_normalized'] for f in self.files.values())
+
+    def report(self):
+        """
+        Summary of the removed rows.
+
+        Returns:
+            dict: JSON-ready report with totals and per-file counts
+        """
+        return {
+            'key_columns': self.key_columns,
+            'rows_in': sum(f['rows'] for f in self.files.values()),
+            'rows_out': len(self.sources),
+            'removed': self.removed,
+            'removed_exact': sum(f['removed_exact'] for f in self.files.values()),
+            'removed_normalized': sum(f['removed_normalized'] for f in self.files.values()),
+            'rows_with_several_sources': sum(len(s) > 1 for s in self.sources),
+            'files': self.files,
+        }
+
+    def save_provenance(self, path):
+        """Write the source files of each consolidated row as CSV (row, sources), atomically."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['row', 'sources'])
+            writer.writerows((row, SOURCES_SEPARATOR.join(sources)) for row, sources in enumerate(self.sources))
+        os.replace(tmp_path, path)
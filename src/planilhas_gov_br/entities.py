@@ -0,0 +1,248 @@
+"""
+Entity resolution for órgãos and cargos.
+
+normalize_data_values only trims and title-cases names, so "Ministerio Da
+Saude", "Ministério Da Saúde" and "Ministério Da Saúde - Ms" stay distinct. Each
+name is reduced to a key (accents, case, punctuation, stopwords and a trailing
+acronym removed); names with the same key are the same entity. Keys that differ
+in a single token ("Previdencia"/"Previdenca", "Min."/"Ministerio") are matched through a
+blocking index: every key is filed under each of its token tuples with one
+token left out, so only keys sharing all other tokens are ever compared.
+
+Each entity gets a stable integer ID, persisted with its aliases in
+entity_registry.json; the IDs are loaded as the orgaos and cargos dimension
+tables referenced by autorizacoes_uniao.orgao_id and cargo_id (migration 007).
+"""
+
+import json
+import os
+import re
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+
+import pandas as pd
+
+REGISTRY_FILENAME = 'entity_registry.json'
+
+# Dimension table -> (name column of autorizacoes_uniao, foreign key column)
+DIMENSIONS = {
+    'orgaos': ('orgao_entidade', 'orgao_id'),
+    'cargos': ('cargos', 'cargo_id'),
+}
+
+STOPWORDS = frozenset(['a', 'as', 'o', 'os', 'da', 'das', 'de', 'do', 'dos', 'e', 'em', 'na', 'no'])
+
+# Single-token difference tolerated between two keys: one edit in tokens of at
+# least TYPO_MIN_LENGTH characters, or an abbreviation written with a dot
+# ("Min.") that is a prefix of the other token. Undotted prefixes are not
+# abbreviations: "Para" and "Parana" are different states.
+TYPO_MIN_LENGTH = 5
+
+# Words, keeping the dot of abbreviations
+_TOKEN = re.compile(r'\w+\.?')
+# "Nome - SIGLA" or "Nome (SIGLA)" at the end of a name
+_TRAILING_ACRONYM = re.compile(r'^(?P<name>.+?)\s*(?:[-–—/]\s*(?P<a1>\w{2,8})|\(\s*(?P<a2>\w{2,8})\s*\))\s*$')
+
+
+def fold(value):
+    """Casefold a string and drop accents."""
+    decomposed = unicodedata.normalize('NFKD', value)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+def _is_subsequence(short, text):
+    letters = iter(text)
+    return all(ch in letters for ch in short)
+
+
+def entity_key(name):
+    """
+    Comparison key of a name: folded tokens without punctuation, stopwords or
+    a trailing acronym ("- MS", "(INSS)") whose letters appear in order in the
+    name. Abbreviations keep their dot.
+
+    Returns:
+        str: Space-separated tokens (empty for names without any word)
+    """
+    folded = fold(name).strip()
+    match = _TRAILING_ACRONYM.match(folded)
+    if match:
+        acronym = match.group('a1') or match.group('a2')
+        stem = match.group('name')
+        compact = stem.replace(' ', '')
+        if acronym[0] == compact[:1] and _is_subsequence(acronym, compact):
+            folded = stem
+    tokens = [token for token in _TOKEN.findall(folded) if token.rstrip('.') not in STOPWORDS]
+    return ' '.join(tokens)
+
+
+def _within_one_edit(a, b):
+    """True when a and b differ by at most one insertion, deletion or substitution."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+def tokens_match(a, b):
+    """Whether two differing tokens are variants of each other (typo or abbreviation)."""
+    if a.endswith('.') != b.endswith('.'):
+        short, long = (a, b) if a.endswith('.') else (b, a)
+        return long.startswith(short[:-1])
+    return min(len(a), len(b)) >= TYPO_MIN_LENGTH and '.' not in a + b and _within_one_edit(a, b)
+
+
+def _display_rank(alias):
+    # Prefer accented spellings, then names without a trailing acronym (shorter)
+    return (-sum(not ch.isascii() for ch in alias), len(alias), alias)
+
+
+class EntityResolver:
+    """
+    Names of one dimension -> stable integer IDs.
+
+    `entities` maps an ID to {'nome', 'aliases'}: the raw names resolved to it
+    and the display name chosen among them.
+    """
+
+    def __init__(self, entities=None):
+        self.entities = {}
+        self.aliases = {}
+        self.keys = {}
+        self.blocks = defaultdict(set)
+        self.next_id = 1
+        for entity_id, entity in (entities or {}).items():
+            entity_id = int(entity_id)
+            self.entities[entity_id] = {'nome': entity['nome'], 'aliases': []}
+            self.next_id = max(self.next_id, entity_id + 1)
+            for alias in entity['aliases']:
+                self._add_alias(alias, entity_id, entity_key(alias))
+
+    def _index_key(self, key, entity_id):
+        if key in self.keys:
+            return
+        self.keys[key] = entity_id
+        tokens = key.split()
+        if len(tokens) > 1:
+            for i in range(len(tokens)):
+                self.blocks[(i, ' '.join(tokens[:i] + tokens[i + 1:]))].add(key)
+
+    def _add_alias(self, alias, entity_id, key):
+        self.aliases[alias] = entity_id
+        entity = self.entities[entity_id]
+        entity['aliases'].append(alias)
+        entity['nome'] = min(entity['aliases'], key=_display_rank)
+        if key:
+            self._index_key(key, entity_id)
+
+    def _match(self, key):
+        """ID of a known key, or of a key one token away in the blocking index, or None."""
+        entity_id = self.keys.get(key)
+        if entity_id is not None:
+            return entity_id
+        tokens = key.split()
+        if len(tokens) < 2:
+            return None
+        matches = []
+        for i in range(len(tokens)):
+            for candidate in self.blocks.get((i, ' '.join(tokens[:i] + tokens[i + 1:])), ()):
+                if tokens_match(tokens[i], candidate.split()[i]):
+                    matches.append(self.keys[candidate])
+        return min(matches, default=None)
+
+    def resolve(self, name):
+        """ID of a name, registering a new entity (or alias) when needed."""
+        entity_id = self.aliases.get(name)
+        if entity_id is not None:
+            return entity_id
+        key = entity_key(name)
+        entity_id = self._match(key) if key else None
+        if entity_id is None:
+            entity_id = self.next_id
+            self.next_id += 1
+            self.entities[entity_id] = {'nome': name, 'aliases': []}
+        self._add_alias(name, entity_id, key)
+        return entity_id
+
+    def resolve_series(self, series):
+        """IDs of a Series of names (resolved once per distinct value) as nullable Int64."""
+        codes, uniques = pd.factorize(series)
+        ids = pd.array([self.resolve(str(name)) for name in uniques] + [pd.NA], dtype='Int64')
+        # Code -1 (null name) takes the trailing NA
+        return pd.Series(ids[codes], index=series.index)
+
+    def names(self):
+        """ID -> display name."""
+        return {entity_id: entity['nome'] for entity_id, entity in self.entities.items()}
+
+    def rows(self):
+        """Rows of the dimension table, by ID."""
+        return [{'id': entity_id, 'nome': self.entities[entity_id]['nome']} for entity_id in sorted(self.entities)]
+
+
+class EntityRegistry:
+    """EntityResolver per dimension table (see DIMENSIONS), persisted as JSON."""
+
+    def __init__(self, dimensions=None):
+        dimensions = dimensions or {}
+        self.resolvers = {table: EntityResolver(dimensions.get(table)) for table in DIMENSIONS}
+
+    def assign_ids(self, df):
+        """
+        Add the foreign key columns (orgao_id, cargo_id) to a frame with
+        database column names. Frames without a name column get null IDs.
+        """
+        for table, (name_column, id_column) in DIMENSIONS.items():
+            if name_column in df.columns:
+                df[id_column] = self.resolvers[table].resolve_series(df[name_column])
+            else:
+                df[id_column] = pd.array([pd.NA] * len(df), dtype='Int64')
+        return df
+
+    def names(self, table):
+        return self.resolvers[table].names()
+
+    def dimension_rows(self):
+        """Rows of every dimension table, for loading before the fact rows."""
+        return {table: resolver.rows() for table, resolver in self.resolvers.items()}
+
+    @classmethod
+    def load(cls, path):
+        """Load a registry from JSON; a missing or unreadable file yields an empty registry."""
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls(json.load(f))
+        except (OSError, ValueError):
+            return cls()
+
+    def save(self, path):
+        """Write the registry to JSON atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        data = {table: {str(entity_id): entity for entity_id, entity in sorted(resolver.entities.items())}
+                for table, resolver in self.resolvers.items()}
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+# Process-wide registry used by process_spreadsheets and the pipeline
+registry = EntityRegistry()
+
+
+def load_registry(path):
+    """Replace the process-wide registry with the one persisted at `path`."""
+    global registry
+    registry = EntityRegistry.load(path)
+    return registry
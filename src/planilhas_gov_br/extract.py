@@ -0,0 +1,327 @@
+"""
+Extraction and normalization of DOU spreadsheets.
+
+Reads the first sheet of a workbook from its detected (or registered) header
+row, maps the header spellings to the Dicionário de Dados names and normalizes
+the values. Used by scripts/process_spreadsheets.py and by the in-process
+pipeline (planilhas_gov_br.pipeline).
+"""
+
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from planilhas_gov_br import canonical, instrumentation, layouts, readers
+
+logger = logging.getLogger(__name__)
+
+# Number of top rows parsed to locate the header row before the full parse
+HEADER_SNIFF_ROWS = 50
+
+# Standardize headers based on the Dicionário de Dados provided in the task
+HEADER_MAPPING = {
+    # Portuguese variations that might appear in the files
+    'orgao/entidade': 'Orgao_Entidade',
+    'órgão/entidade': 'Orgao_Entidade',
+    'orgao': 'Orgao_Entidade',
+    'órgão': 'Orgao_Entidade',
+    'entidade': 'Orgao_Entidade',
+    'entidade/orgao': 'Orgao_Entidade',
+    'entidade/orgão': 'Orgao_Entidade',
+
+    'vinculo_orgao_entidade': 'Vinculo_Orgao_Entidade',
+    'vínculo órgão/entidade': 'Vinculo_Orgao_Entidade',
+    'vínculo orgão/entidade': 'Vinculo_Orgao_Entidade',
+    'vinculo': 'Vinculo_Orgao_Entidade',
+    'vínculo': 'Vinculo_Orgao_Entidade',
+    'setor': 'Setor',
+    'vínculo': 'Vinculo_Orgao_Entidade',
+
+    'cargos': 'Cargos',
+    'cargo': 'Cargos',
+    'cargos.': 'Cargos',
+    'cargo.': 'Cargos',
+
+    'escolaridade': 'Escolaridade',
+    'esc.': 'Escolaridade',
+
+    'vagas': 'Vagas',
+
+    'ato oficial': 'Ato_Oficial',
+    'ato_oficial': 'Ato_Oficial',
+    'publicacao': 'Ato_Oficial',
+    'publicação': 'Ato_Oficial',
+    'norma juridica': 'Ato_Oficial',
+    'norma jurídica': 'Ato_Oficial',
+
+    'tipo de autorizacao': 'Tipo_Autorizacao',
+    'tipo_de_autorizacao': 'Tipo_Autorizacao',
+    'tipo autorizacao': 'Tipo_Autorizacao',
+    'tipo autorização': 'Tipo_Autorizacao',
+    'tipo de autorização': 'Tipo_Autorizacao',
+
+    'd.o.u': 'DOU',
+    'link dou': 'DOU',
+    'link do dou': 'DOU',
+    'publicação     diário oficial da união - dou': 'DOU',
+    'publicação diário oficial da união - dou': 'DOU',
+    'link da publicação no d.o.u.': 'DOU',
+    'data provimento': 'Data_Provimento',
+}
+
+
+def normalize_column_headers(df):
+    """
+    Normalize column headers to match the Dicionário de Dados when possible.
+    """
+    header_mapping = HEADER_MAPPING
+
+    # Create a normalized column mapping
+    normalized_columns = {}
+    for col in df.columns:
+        col_lower = str(col).lower().strip().replace(' ', '_').replace('.', '').replace('\n', '')
+        if col_lower in header_mapping:
+            normalized_columns[col] = header_mapping[col_lower]
+        elif col_lower in [key.replace(' ', '_') for key in header_mapping.keys()]:
+            # Handle cases where spaces were not replaced with underscores
+            for original_key, mapped_value in header_mapping.items():
+                if original_key.replace(' ', '_').lower() == col_lower:
+                    normalized_columns[col] = mapped_value
+                    break
+        else:
+            # Keep the original column name if no mapping is found
+            # But clean it to ensure it's a valid identifier
+            cleaned_col = str(col).strip().replace(' ', '_').replace('.', '_').replace('-', '_').replace('\n', '_')
+            normalized_columns[col] = cleaned_col
+
+    df = df.rename(columns=normalized_columns)
+    return df
+
+
+def map_unique_strings(series, func):
+    """
+    Apply `func` once per distinct string value of an object Series and map
+    the results back by factorized codes. Non-string values are kept as is,
+    which matches the per-cell lambdas this replaces.
+    """
+    codes, uniques = pd.factorize(series)
+    uniques = np.asarray(uniques, dtype=object)
+    is_str = np.fromiter((isinstance(value, str) for value in uniques), dtype=bool, count=len(uniques))
+
+    if not is_str.any():
+        # Nothing to normalize; keep apply's dtype inference for non-string columns
+        return series.apply(lambda x: x)
+
+    mapped = uniques.copy()
+    mapped[is_str] = [func(value) for value in uniques[is_str]]
+
+    # Only positions holding a string take the mapped value
+    take = codes >= 0
+    take[take] = is_str[codes[take]]
+
+    values = series.to_numpy(dtype=object, copy=True)
+    values[take] = mapped[codes[take]]
+    return pd.Series(values, index=series.index, name=series.name, dtype=object)
+
+
+def normalize_data_values(df):
+    """
+    Apply data normalization following best practices of data analysis:
+    1. Clean string columns (remove extra whitespace)
+    2. Standardize text case
+    3. Handle missing values consistently
+    4. Ensure data types are appropriate
+
+    String columns are normalized per distinct value (see map_unique_strings).
+    """
+    for col in df.columns:
+        # Handle string columns
+        if df[col].dtype == 'object':
+            # For specific columns that should have consistent formatting
+            if col in ['Orgao_Entidade', 'Cargos', 'Vinculo_Orgao_Entidade']:
+                # Remove extra whitespace and apply title case to proper names
+                df[col] = map_unique_strings(df[col], lambda x: x.strip().title())
+            elif col == 'Escolaridade':
+                # Standardize escolaridade values
+                df[col] = map_unique_strings(df[col], lambda x: normalize_escolaridade(x.strip()))
+            elif col == 'Tipo_Autorizacao':
+                # Standardize autorizacao types
+                df[col] = map_unique_strings(df[col], lambda x: normalize_tipo_autorizacao(x.strip()))
+            else:
+                # Remove extra whitespace from string columns
+                df[col] = map_unique_strings(df[col], str.strip)
+
+        # Handle numeric columns
+        if col == 'Vagas':
+            # Ensure Vagas column is numeric, convert invalid values to NaN
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    return df
+
+
+def normalize_escolaridade(value):
+    """Normalize escolaridade values (see planilhas_gov_br.canonical)"""
+    if pd.isna(value):
+        return value
+
+    if isinstance(value, str):
+        return canonical.canonical_escolaridade(value)
+    return value
+
+
+def normalize_tipo_autorizacao(value):
+    """Normalize tipo autorizacao values (see planilhas_gov_br.canonical)"""
+    if pd.isna(value):
+        return value
+
+    if isinstance(value, str):
+        return canonical.canonical_tipo_autorizacao(value)
+    return value
+
+
+def find_data_start_row(df, default=0):
+    """
+    Attempts to find the row where the actual data begins (with column headers).
+    Looks for key column names that match the Dicionário de Dados.
+    Returns `default` when no header row is found.
+    """
+    key_headers = [
+        'orgao/entidade', 'órgão/entidade', 'orgao', 'órgão', 'entidade',
+        'cargos', 'cargo', 'escolaridade', 'esc.', 'vagas',
+        'ato oficial', 'ato_oficial', 'tipo de autorizacao', 'tipo_de_autorizacao'
+    ]
+
+    for idx, row in df.iterrows():
+        row_str = ' '.join(str(val).lower() for val in row.values if pd.notna(val))
+        if any(key in row_str for key in key_headers):
+            return idx
+
+    # If we can't find it, use the default (0 unless the caller asks otherwise)
+    return default
+
+
+def read_excel_data(excel_file, sniff_rows=HEADER_SNIFF_ROWS, engine=None):
+    """
+    Read the first sheet of an Excel file using its detected header row.
+
+    The workbook is opened once. Layouts in the layout registry are recognized
+    from the rows down to their header and skip detection; otherwise only the
+    first `sniff_rows` rows are parsed to detect the header, falling back to
+    scanning the whole sheet when no header is found in them. The sheet is then
+    parsed a single time from the header row.
+
+    The workbook is parsed with the first engine of readers.engines_for(excel_file,
+    engine); when it fails, the next one is tried. The engine used is recorded
+    as the 'engine' label of the header_detection span.
+
+    Returns:
+        tuple: (dataframe, data_start_row, layout_key) where layout_key is the
+               layout fingerprint (None if no header was found), or
+               (None, None, None) for an empty sheet
+
+    Raises:
+        readers.WorkbookReadError: when no engine can parse the file
+    """
+    candidates = readers.engines_for(excel_file, engine)
+    errors = []
+    for candidate in candidates:
+        try:
+            return _read_first_sheet(excel_file, sniff_rows, candidate, failed=[name for name, _ in errors])
+        except Exception as e:
+            if len(candidates) == 1:
+                raise
+            errors.append((candidate, e))
+            logger.warning(f"Engine {candidate} could not read {Path(excel_file).name}: {e}")
+    raise readers.WorkbookReadError('; '.join(f"{name}: {error}" for name, error in errors))
+
+
+def _read_first_sheet(excel_file, sniff_rows, engine, failed):
+    """read_excel_data with one engine; `failed` lists the engines tried before it."""
+    recorder = instrumentation.recorder
+    registry = layouts.registry
+    with pd.ExcelFile(excel_file, engine=engine) as xls:
+        labels = {'engine': xls.engine}
+        if failed:
+            labels['fallback_from'] = ','.join(failed)
+        with recorder.span('header_detection', file=Path(excel_file).name, **labels) as span:
+            head_df = None
+            layout_key, layout = None, None
+            top_rows = registry.max_header_row
+            if top_rows is not None:
+                # Known templates only need the rows down to their header
+                head_df = xls.parse(0, header=None, nrows=top_rows + 1)
+                layout_key, layout = registry.lookup(head_df)
+
+            if layout is not None:
+                data_start_row = layout['header_row']
+                span.labels['layout'] = 'known'
+            else:
+                if head_df is None or top_rows + 1 < sniff_rows:
+                    head_df = xls.parse(0, header=None, nrows=sniff_rows)
+                data_start_row = find_data_start_row(head_df, default=None)
+
+                if data_start_row is None and len(head_df) >= sniff_rows:
+                    # Header may be further down; scan the whole sheet like before
+                    head_df = xls.parse(0, header=None)
+                    data_start_row = find_data_start_row(head_df, default=None)
+
+                if data_start_row is not None:
+                    layout_key = layouts.layout_fingerprint(head_df, data_start_row)
+                span.labels['layout'] = 'new'
+
+        # Check if the dataframe has meaningful content
+        if head_df.empty or head_df.shape[0] == 0 or head_df.shape[1] == 0:
+            return None, None, None
+
+        if data_start_row is None:
+            data_start_row = 0
+
+        df = xls.parse(0, header=data_start_row)
+
+    return df, data_start_row, layout_key
+
+
+def map_column_headers(df, layout_key, header_row, source=None):
+    """
+    Normalize the column headers, reusing the mapping of a registered layout.
+
+    Unknown layouts go through normalize_column_headers and are added to the
+    layout registry (if a header row was found). A known layout whose parsed
+    columns differ (e.g. extra columns further down the sheet) is mapped again
+    without touching its entry.
+    """
+    registry = layouts.registry
+    entry = registry.entries.get(layout_key)
+    columns = [str(col) for col in df.columns]
+    if entry is not None and entry['columns'] == columns:
+        df.columns = entry['mapping']
+        return df
+
+    mapped = normalize_column_headers(df)
+    if layout_key is not None and entry is None:
+        registry.add(layout_key, header_row, columns, list(mapped.columns), first_seen=source)
+    return mapped
+
+
+def dedupe_columns(df, label):
+    """Rename repeated column names to name_1, name_2, ... (first occurrence kept)."""
+    if not df.columns.duplicated().any():
+        return df
+    print(f"DataFrame {label} has duplicate columns: {df.columns[df.columns.duplicated()]}")
+    # Handle duplicate columns within the dataframe by adding a suffix
+    cols = pd.Series(df.columns)
+    for dup in cols[cols.duplicated()].unique():
+        # Find all positions of the duplicated column name
+        dup_locs = cols[cols == dup].index.tolist()
+        # Rename all but the first occurrence
+        for j, loc in enumerate(dup_locs[1:], 1):
+            new_name = f"{dup}_{j}"
+            # Ensure the new name is unique within this dataframe
+            while new_name in cols.values:
+                j += 1
+                new_name = f"{dup}_{j}"
+            cols.iloc[loc] = new_name
+    df.columns = cols
+    return df
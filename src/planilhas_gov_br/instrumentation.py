@@ -0,0 +1,350 @@
+"""
+Per-stage instrumentation and run reports for the ETL.
+
+Stages are wrapped in spans that record wall time, CPU time, rows in and out,
+the RSS at the end of the stage and how much the stage raised the process' peak
+RSS (ru_maxrss is a lifetime high-water mark, so it only attributes memory to
+the stage that set a new peak):
+
+    with instrumentation.recorder.span('normalize', file=name, rows_in=len(df)) as span:
+        df = normalize_data_values(df)
+        span.rows_out = len(df)
+
+At the end of a run the recorder writes a JSON report (per-stage totals, the
+slowest files and every span) and optionally a Prometheus textfile for the
+node_exporter textfile collector.
+
+A run can be given a memory budget (`recorder.reset(memory_budget=...)`);
+check_memory_budget() then fails the run once the peak RSS goes over it.
+"""
+
+import functools
+import json
+import os
+import platform
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPORT_FILENAME = 'run_report.json'
+
+METRIC_PREFIX = 'planilhas'
+
+_SIZE = re.compile(r'^\s*(?P<number>\d+(?:\.\d+)?)\s*(?P<unit>[kmgt]?)i?b?\s*$', re.IGNORECASE)
+_SIZE_UNITS = {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3, 't': 1024 ** 4}
+
+
+class MemoryBudgetExceeded(RuntimeError):
+    """The peak RSS of the run went over its memory budget."""
+
+
+def parse_size(text):
+    """
+    Parse a size such as '512M', '1.5G', '2GiB' or '1048576' (bytes).
+
+    Returns:
+        int: Size in bytes
+    """
+    match = _SIZE.match(str(text))
+    if match is None:
+        raise ValueError(f"Invalid size {text!r}; expected e.g. 512M or 2G")
+    return int(float(match.group('number')) * _SIZE_UNITS[match.group('unit').lower()])
+
+
+def format_size(size):
+    """Human-readable size in bytes, e.g. '1.5 GiB'."""
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process in bytes, or None if unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def current_rss_bytes():
+    """Current resident set size of this process in bytes, or None if unavailable (Linux only)."""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class Span:
+    """Measurements of one stage execution."""
+
+    # rss: RSS at the end of the span; max_rss: process high-water mark at the end
+    # of the span; max_rss_growth: how much the span raised that high-water mark
+    __slots__ = ('name', 'labels', 'rows_in', 'rows_out', 'wall', 'cpu', 'rss', 'max_rss', 'max_rss_growth',
+                 'error', 'pid')
+
+    def __init__(self, name, labels=None, rows_in=None):
+        self.name = name
+        self.labels = labels or {}
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.rss = None
+        self.max_rss = None
+        self.max_rss_growth = None
+        self.error = None
+        self.pid = os.getpid()
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class RunRecorder:
+    """
+    Collect spans for one pipeline run. Spans recorded in pool workers are
+    handed back with pop_spans() and merged with extend().
+    """
+
+    def __init__(self):
+        self.spans = []
+        self.started = time.time()
+        self.memory_budget = None
+        self._lock = threading.Lock()
+
+    def reset(self, memory_budget=None):
+        """Start a new run, optionally with a peak RSS budget in bytes."""
+        with self._lock:
+            self.spans = []
+            self.started = time.time()
+            self.memory_budget = memory_budget
+
+    def run_peak_rss_bytes(self):
+        """
+        Peak RSS of this process plus the peak of every other process (pool
+        worker) whose spans were merged with extend(). The sum is an upper bound:
+        the workers do not necessarily peak at the same time.
+        """
+        own_pid = os.getpid()
+        worker_peaks = {}
+        with self._lock:
+            for span in self.spans:
+                if span['pid'] != own_pid and span['max_rss'] is not None:
+                    worker_peaks[span['pid']] = max(worker_peaks.get(span['pid'], 0), span['max_rss'])
+        own_peak = peak_rss_bytes()
+        if own_peak is None and not worker_peaks:
+            return None
+        return (own_peak or 0) + sum(worker_peaks.values())
+
+    def check_memory_budget(self, stage):
+        """
+        Raise MemoryBudgetExceeded when the peak RSS of the run (this process
+        and its pool workers, see run_peak_rss_bytes) is over the run's memory
+        budget. Called between stages, so a run fails at the first stage
+        boundary past the budget.
+        """
+        if self.memory_budget is None:
+            return
+        peak = self.run_peak_rss_bytes()
+        if peak is not None and peak > self.memory_budget:
+            raise MemoryBudgetExceeded(f"Peak RSS {format_size(peak)} went over the memory budget of "
+                                       f"{format_size(self.memory_budget)} ({stage})")
+
+    @contextmanager
+    def span(self, name, rows_in=None, **labels):
+        """Time the block as stage `name`; the yielded Span's rows_out can be set inside it."""
+        span = Span(name, {k: str(v) for k, v in labels.items()}, rows_in)
+        wall_start = time.perf_counter()
+        # Thread CPU time when spans run on a thread pool (e.g. upload batches)
+        cpu_clock = time.process_time if threading.current_thread() is threading.main_thread() else time.thread_time
+        cpu_start = cpu_clock()
+        max_rss_start = peak_rss_bytes()
+        try:
+            yield span
+        except BaseException as exc:
+            span.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            span.wall = time.perf_counter() - wall_start
+            span.cpu = cpu_clock() - cpu_start
+            span.rss = current_rss_bytes()
+            span.max_rss = peak_rss_bytes()
+            if span.max_rss is not None:
+                span.max_rss_growth = span.max_rss - max_rss_start
+            with self._lock:
+                self.spans.append(span.to_dict())
+
+    def traced(self, name):
+        """Decorator recording each call of the function as a span."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def pop_spans(self):
+        """Return and clear the spans recorded so far (used by pool workers)."""
+        with self._lock:
+            spans, self.spans = self.spans, []
+        return spans
+
+    def extend(self, spans):
+        """Merge spans recorded in another process."""
+        with self._lock:
+            self.spans.extend(spans)
+
+    def report(self, pipeline, **extra):
+        """
+        Build the run report.
+
+        Args:
+            pipeline (str): Run name, e.g. 'process' or 'upload'
+            **extra: Additional top-level fields (counts, options)
+
+        Returns:
+            dict: JSON-ready report
+        """
+        with self._lock:
+            spans = list(self.spans)
+
+        stages = {}
+        files = {}
+        for span in spans:
+            stage = stages.setdefault(span['name'], {
+                'count': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+                'rows_in': 0, 'rows_out': 0, 'errors': 0,
+                'rss_bytes': None, 'max_rss_bytes': None, 'max_rss_growth_bytes': None})
+            stage['count'] += 1
+            stage['wall_seconds'] += span['wall']
+            stage['cpu_seconds'] += span['cpu']
+            stage['rows_in'] += span['rows_in'] or 0
+            stage['rows_out'] += span['rows_out'] or 0
+            stage['errors'] += span['error'] is not None
+            for field, key in (('rss', 'rss_bytes'), ('max_rss', 'max_rss_bytes'),
+                               ('max_rss_growth', 'max_rss_growth_bytes')):
+                if span[field] is not None:
+                    stage[key] = max(stage[key] or 0, span[field])
+
+            name = span['labels'].get('file')
+            if name is not None:
+                per_file = files.setdefault(name, {'file': name, 'wall_seconds': 0.0, 'rows': None, 'stages': {}})
+                per_file['stages'][span['name']] = per_file['stages'].get(span['name'], 0.0) + span['wall']
+                if span['name'] == 'read' and span['rows_out'] is not None:
+                    per_file['rows'] = span['rows_out']
+                if span['name'] == 'header_detection' and 'engine' in span['labels']:
+                    # A fallback engine's span comes after the failed ones'
+                    per_file['engine'] = span['labels']['engine']
+                    if 'fallback_from' in span['labels']:
+                        per_file['fallback_from'] = span['labels']['fallback_from'].split(',')
+
+        for per_file in files.values():
+            # 'header_detection' runs inside 'read'; count it once
+            per_file['wall_seconds'] = sum(wall for stage, wall in per_file['stages'].items()
+                                           if stage != 'header_detection')
+
+        engines = {}
+        for per_file in files.values():
+            if 'engine' in per_file:
+                engines[per_file['engine']] = engines.get(per_file['engine'], 0) + 1
+
+        peaks = [span['max_rss'] for span in spans if span['max_rss'] is not None]
+        own_peak = peak_rss_bytes()
+        return dict({
+            'pipeline': pipeline,
+            'started_at': datetime.fromtimestamp(self.started, timezone.utc).isoformat(),
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+            'duration_seconds': time.time() - self.started,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'peak_rss_bytes': max(peaks + ([own_peak] if own_peak is not None else []), default=None),
+            # What the memory budget is checked against: this process plus its pool workers
+            'run_peak_rss_bytes': self.run_peak_rss_bytes(),
+            'memory_budget_bytes': self.memory_budget,
+            'stages': stages,
+            'excel_engines': engines,
+            'slowest_files': sorted(files.values(), key=lambda f: f['wall_seconds'], reverse=True),
+            'spans': spans,
+        }, **extra)
+
+
+def save_report(report, path):
+    """Write a run report as JSON (atomically)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text(report):
+    """Render the per-stage totals of a report in the Prometheus text format."""
+    pipeline = report['pipeline']
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+        for labels, value in samples:
+            label_text = ','.join(f'{k}="{_escape_label(v)}"' for k, v in dict(pipeline=pipeline, **labels).items())
+            lines.append(f"{METRIC_PREFIX}_{name}{{{label_text}}} {value}")
+
+    stages = report['stages']
+    metric('stage_wall_seconds', 'gauge', 'Wall time spent in the stage during the last run.',
+           [({'stage': s}, v['wall_seconds']) for s, v in stages.items()])
+    metric('stage_cpu_seconds', 'gauge', 'CPU time spent in the stage during the last run.',
+           [({'stage': s}, v['cpu_seconds']) for s, v in stages.items()])
+    metric('stage_rows_in', 'gauge', 'Rows entering the stage during the last run.',
+           [({'stage': s}, v['rows_in']) for s, v in stages.items()])
+    metric('stage_rows_out', 'gauge', 'Rows produced by the stage during the last run.',
+           [({'stage': s}, v['rows_out']) for s, v in stages.items()])
+    metric('stage_spans', 'gauge', 'Executions of the stage during the last run.',
+           [({'stage': s}, v['count']) for s, v in stages.items()])
+    metric('stage_errors', 'gauge', 'Failed executions of the stage during the last run.',
+           [({'stage': s}, v['errors']) for s, v in stages.items()])
+    growth = [({'stage': s}, v['max_rss_growth_bytes']) for s, v in stages.items()
+              if v.get('max_rss_growth_bytes') is not None]
+    if growth:
+        metric('stage_max_rss_growth_bytes', 'gauge',
+               'Largest rise of the process peak RSS caused by one execution of the stage during the last run.',
+               growth)
+    if report.get('excel_engines'):
+        metric('excel_engine_files', 'gauge', 'Workbooks read by each Excel engine during the last run.',
+               [({'engine': e}, n) for e, n in report['excel_engines'].items()])
+    metric('run_duration_seconds', 'gauge', 'Duration of the last run.', [({}, report['duration_seconds'])])
+    if report['peak_rss_bytes'] is not None:
+        metric('run_peak_rss_bytes', 'gauge', 'Peak resident set size of the last run.',
+               [({}, report['peak_rss_bytes'])])
+    if report.get('memory_budget_bytes') is not None:
+        metric('run_memory_budget_bytes', 'gauge', 'Memory budget (peak RSS) of the last run.',
+               [({}, report['memory_budget_bytes'])])
+    metric('run_last_success_timestamp_seconds', 'gauge', 'Unix time the last run finished.',
+           [({}, datetime.fromisoformat(report['finished_at']).timestamp())])
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus_textfile(report, path):
+    """Write the report metrics for the node_exporter textfile collector (atomically)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(prometheus_text(report))
+    os.replace(tmp_path, path)
+
+
+# Recorder for the current process
+recorder = RunRecorder()
@@ -0,0 +1,209 @@
+"""
+Durable journal of the batches committed by an upload, for resuming.
+
+Every committed batch is appended as one JSON line, with its row range and a
+content hash, and fsynced before the upload moves on. The first line names the
+snapshot the rows belong to (a hash of the row fingerprints in upload order),
+so a journal is only resumed for the same data:
+
+    journal = UploadJournal.open(path, snapshot_key(table, fingerprints), total=len(fingerprints),
+                                 resume=True, digest=lambda start, stop: range_digest(fingerprints[start:stop]))
+    uploader.upload(records, ranges=journal.pending_ranges())
+
+Entries whose hash no longer matches the rows at their range are dropped on
+resume and uploaded again. The journal also tracks the throughput of the run
+and the ETA of the remaining rows.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_DIRNAME = 'upload_journal'
+
+JOURNAL_VERSION = 1
+
+
+def journal_path(processed_dir, table):
+    """Journal file of the uploads of `table` from a data/processed directory."""
+    return Path(processed_dir) / JOURNAL_DIRNAME / f"{table}.jsonl"
+
+
+def range_digest(values):
+    """Hash of a batch's content, e.g. the row fingerprints or the encoded body of its rows."""
+    digest = hashlib.blake2b(digest_size=16)
+    for value in values:
+        digest.update(value if isinstance(value, bytes) else str(value).encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+def snapshot_key(table, fingerprints):
+    """Key of the rows an upload sends to `table`, in order."""
+    return f"{table}:{range_digest(fingerprints)}"
+
+
+def _format_duration(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}h{minutes:02d}m{seconds:02d}s" if hours else f"{minutes}m{seconds:02d}s"
+
+
+class UploadJournal:
+    """
+    Committed row ranges of one upload snapshot, appended to a JSON lines file.
+    commit() is thread-safe, so it can be called from BatchUploader's on_batch.
+    """
+
+    def __init__(self, path, snapshot, total=None, entries=None):
+        self.path = Path(path)
+        self.snapshot = snapshot
+        self.total = total
+        self.entries = {(entry['start'], entry['stop']): entry['digest'] for entry in entries or []}
+        self.resumed_rows = self.committed_rows
+        self.started = time.monotonic()
+        self._file = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _read(path):
+        """(header, entries) of a journal file, or (None, []) when it is missing or unreadable."""
+        header, entries = None, []
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A line torn by a crash mid-write: everything before it was fsynced
+                        break
+                    if header is None:
+                        header = record
+                    else:
+                        entries.append(record)
+        except OSError:
+            pass
+        return header, entries
+
+    @classmethod
+    def open(cls, path, snapshot, total=None, resume=False, digest=None):
+        """
+        Start the journal of an upload, rewriting the file.
+
+        Args:
+            path: Journal file (see journal_path)
+            snapshot (str): Key of the rows being uploaded (see snapshot_key)
+            total (int): Rows in the snapshot, when known upfront (for the ETA)
+            resume (bool): Keep the entries of a previous run of the same snapshot
+            digest: Optional callable(start, stop) -> hash of the rows at that range;
+                    resumed entries that do not match it are dropped
+
+        Returns:
+            UploadJournal
+        """
+        path = Path(path)
+        entries = []
+        if resume:
+            header, previous = cls._read(path)
+            if header is None:
+                logger.info(f"No upload journal at {path}; starting from row 0")
+            elif header.get('snapshot') != snapshot:
+                logger.warning(f"Upload journal {path} belongs to another snapshot; starting from row 0")
+            else:
+                entries = [entry for entry in previous
+                           if digest is None or digest(entry['start'], entry['stop']) == entry['digest']]
+                if len(entries) < len(previous):
+                    logger.warning(f"{len(previous) - len(entries)} journaled batch(es) no longer match "
+                                   f"their rows and will be uploaded again")
+
+        journal = cls(path, snapshot, total, entries)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'version': JOURNAL_VERSION, 'snapshot': snapshot, 'total': total,
+                                'started_at': datetime.now(timezone.utc).isoformat()}) + '\n')
+            for entry in entries:
+                f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        journal._file = open(path, 'a', encoding='utf-8')
+
+        if entries:
+            logger.info(f"Resuming upload: {journal.committed_rows} row(s) already committed in "
+                        f"{len(entries)} batch(es)")
+        return journal
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def committed_rows(self):
+        return sum(stop - start for start, stop in self.entries)
+
+    def is_committed(self, start, stop, digest):
+        """Whether rows start:stop were committed with this content."""
+        return self.entries.get((start, stop)) == digest
+
+    def pending_ranges(self, total=None):
+        """(start, stop) ranges of the rows not committed yet, in row order."""
+        total = self.total if total is None else total
+        pending = []
+        position = 0
+        for start, stop in sorted(self.entries):
+            if start > position:
+                pending.append((position, start))
+            position = max(position, stop)
+        if position < total:
+            pending.append((position, total))
+        return pending
+
+    def commit(self, start, stop, digest):
+        """Durably record rows start:stop as committed. Returns the progress line for the log."""
+        entry = {'start': start, 'stop': stop, 'digest': digest, 'at': time.time()}
+        with self._lock:
+            self._file.write(json.dumps(entry) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.entries[(start, stop)] = digest
+        return self.progress_message()
+
+    def progress(self):
+        """
+        Rows committed (including resumed ones), throughput of this run and ETA.
+
+        Returns:
+            dict: committed, total, rows_per_second, eta_seconds (None when unknown)
+        """
+        committed = self.committed_rows
+        elapsed = time.monotonic() - self.started
+        rate = (committed - self.resumed_rows) / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if self.total is not None and rate > 0:
+            eta = max(0, self.total - committed) / rate
+        return {'committed': committed, 'total': self.total, 'rows_per_second': rate, 'eta_seconds': eta}
+
+    def progress_message(self):
+        progress = self.progress()
+        if progress['total']:
+            done = f"{progress['committed']}/{progress['total']} rows ({progress['committed'] / progress['total']:.1%})"
+        else:
+            done = f"{progress['committed']} rows"
+        eta = f", ETA {_format_duration(progress['eta_seconds'])}" if progress['eta_seconds'] is not None else ''
+        return f"{done}, {progress['rows_per_second']:.0f} rows/s{eta}"
@@ -0,0 +1,152 @@
+"""
+Registry of known spreadsheet layouts.
+
+Most DOU workbooks come from a handful of templates. A layout is identified by
+a fingerprint of the top of the first sheet: the non-null pattern of the rows
+above the header (titles and dates vary between files, their position does
+not) and the raw header strings. The registry stores, per fingerprint, the
+header row and the column mapping resolved the first time the layout was seen,
+so later files with the same layout skip header detection and header mapping.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+REGISTRY_FILENAME = 'layout_registry.json'
+
+
+def layout_fingerprint(top, header_row):
+    """
+    Fingerprint of a sheet whose header is at `header_row`.
+
+    Args:
+        top: Top rows of the sheet parsed with header=None (at least header_row + 1 rows)
+        header_row (int): Position of the header row
+
+    Returns:
+        str: 32-character hex digest
+    """
+    rows = top.iloc[:header_row + 1]
+    notna = rows.notna().to_numpy()
+    # The parsed width depends on how many rows were read; trim trailing empty columns
+    used = notna.any(axis=0).nonzero()[0]
+    width = used[-1] + 1 if len(used) else 0
+    notna = notna[:, :width]
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{width}:{header_row}\x1e".encode('utf-8'))
+    for row in notna[:header_row]:
+        digest.update(bytes(row.astype('uint8')) + b'\x1e')
+    header = rows.iloc[header_row, :width]
+    digest.update('\x1f'.join('\x00' if pd.isna(value) else str(value) for value in header).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class LayoutRegistry:
+    """
+    Layout fingerprint -> {'header_row', 'columns', 'mapping', 'first_seen'}.
+
+    `columns` are the column names pandas produces when parsing the sheet at
+    `header_row` and `mapping` the normalized names for them. Entries added since
+    load are tracked so worker processes can hand them back to the parent.
+    Entries are only valid for the `version` of the extraction logic they were
+    resolved with.
+    """
+
+    def __init__(self, entries=None, version=None):
+        self.version = version
+        self.entries = {}
+        self.new_entries = {}
+        self._header_rows = set()
+        if entries:
+            self.merge(entries, track=False)
+
+    @property
+    def max_header_row(self):
+        """Deepest known header row, or None for an empty registry."""
+        return max(self._header_rows, default=None)
+
+    def lookup(self, top):
+        """
+        Find the layout of a sheet from its top rows.
+
+        Returns:
+            tuple: (fingerprint, entry), or (None, None) for an unknown layout
+        """
+        for header_row in sorted(self._header_rows):
+            if header_row >= len(top):
+                break
+            key = layout_fingerprint(top, header_row)
+            entry = self.entries.get(key)
+            if entry is not None and entry['header_row'] == header_row:
+                return key, entry
+        return None, None
+
+    def add(self, key, header_row, columns, mapping, first_seen=None):
+        """Register the resolved header row and column mapping of a layout."""
+        entry = {
+            'header_row': int(header_row),
+            'columns': [str(col) for col in columns],
+            'mapping': list(mapping),
+            'first_seen': first_seen,
+        }
+        self.merge({key: entry})
+        return entry
+
+    def merge(self, entries, track=True):
+        """Add entries (as returned by pop_new_entries) to the registry."""
+        for key, entry in entries.items():
+            if key in self.entries:
+                continue
+            self.entries[key] = entry
+            self._header_rows.add(entry['header_row'])
+            if track:
+                self.new_entries[key] = entry
+
+    def pop_new_entries(self):
+        """Return and reset the entries added since the last call."""
+        new_entries, self.new_entries = self.new_entries, {}
+        return new_entries
+
+    @classmethod
+    def load(cls, path, version):
+        """
+        Load a registry from JSON. A missing, unreadable or outdated file (other
+        version) yields an empty registry.
+        """
+        path = Path(path)
+        if not path.exists():
+            return cls(version=version)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(version=version)
+        if data.get('version') != version:
+            return cls(version=version)
+        return cls(data.get('layouts'), version=version)
+
+    def save(self, path):
+        """Write the registry to JSON atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'layouts': self.entries}, f,
+                      indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, path)
+
+
+# Process-wide registry used by process_spreadsheets
+registry = LayoutRegistry()
+
+
+def load_registry(path, version):
+    """Replace the process-wide registry with the one persisted at `path`."""
+    global registry
+    registry = LayoutRegistry.load(path, version)
+    return registry
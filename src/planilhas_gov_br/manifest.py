@@ -0,0 +1,71 @@
+"""
+Processing manifest: which source workbooks changed since the last run.
+
+Kept free of pandas so `planilhas-gov-br status` can answer quickly.
+"""
+
+import hashlib
+import json
+import os
+
+# Bump whenever extraction/normalization changes so cached outputs are rebuilt
+PIPELINE_VERSION = "4"
+
+MANIFEST_FILENAME = 'manifest.json'
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(manifest_path):
+    """
+    Load the processing manifest, or an empty one if it is missing, unreadable
+    or was written by a different pipeline version.
+    """
+    empty = {'pipeline_version': PIPELINE_VERSION, 'files': {}}
+    if not manifest_path.exists():
+        return empty
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read manifest {manifest_path}: {str(e)}. Reprocessing all files.")
+        return empty
+    if manifest.get('pipeline_version') != PIPELINE_VERSION:
+        print(f"Pipeline version changed ({manifest.get('pipeline_version')} -> {PIPELINE_VERSION}). Reprocessing all files.")
+        return empty
+    manifest.setdefault('files', {})
+    return manifest
+
+
+def save_manifest(manifest, manifest_path):
+    """Write the manifest atomically next to the processed outputs."""
+    tmp_path = manifest_path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+
+def is_unchanged(excel_file, entry, cache_dir):
+    """
+    Check a source file against its manifest entry.
+
+    Size and mtime are compared first; the content hash is only computed when
+    they differ (e.g. a file that was copied or touched). Returns a tuple
+    (unchanged, stat, sha256) where sha256 is None if it was not computed.
+    """
+    stat = excel_file.stat()
+    if entry is None:
+        return False, stat, None
+    if entry.get('status') == 'ok' and not (cache_dir / entry.get('cache', '')).is_file():
+        return False, stat, None
+    if entry.get('size') == stat.st_size and entry.get('mtime') == stat.st_mtime:
+        return True, stat, None
+    sha256 = file_sha256(excel_file)
+    return entry.get('sha256') == sha256, stat, sha256
@@ -0,0 +1,111 @@
+"""
+Streaming newline-delimited JSON (NDJSON) export and chunked reading.
+
+Records are written one JSON object per line, chunk by chunk, so memory stays
+flat and consumers can start reading before the export finishes. Paths ending
+in `.gz` are gzip-compressed. JSONArrayWriter does the same for the indented
+JSON array document.
+"""
+
+import gzip
+from pathlib import Path
+
+import pandas as pd
+
+NDJSON_FILENAME = 'consolidated_data.ndjson'
+
+DEFAULT_CHUNKSIZE = 10000
+
+
+def _open_text(path, mode):
+    path = Path(path)
+    if path.suffix == '.gz':
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class NDJSONWriter:
+    """
+    Append DataFrames to an NDJSON file as they are produced.
+
+    Usage:
+        with NDJSONWriter(path) as writer:
+            writer.write(df)
+    """
+
+    def __init__(self, path, chunksize=DEFAULT_CHUNKSIZE):
+        self.path = Path(path)
+        self.chunksize = chunksize
+        self.rows_written = 0
+        self._file = None
+
+    def __enter__(self):
+        self._file = _open_text(self.path, 'w')
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, df):
+        """Write the rows of `df`, at most `chunksize` records at a time."""
+        for start in range(0, len(df), self.chunksize):
+            chunk = df.iloc[start:start + self.chunksize]
+            # pandas >= 2.0 terminates every record, including the last, with a newline
+            self._file.write(chunk.to_json(orient='records', lines=True, date_format='iso', force_ascii=False))
+            # Make complete lines visible to concurrent readers
+            self._file.flush()
+            self.rows_written += len(chunk)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class JSONArrayWriter(NDJSONWriter):
+    """
+    Append DataFrames to an indented JSON array, producing the same document
+    as `df.to_json(orient='records', indent=2)` on the concatenated frames,
+    except that no records give a compact `[]` (to_json writes '[\\n\\n]').
+    """
+
+    def write(self, df):
+        for start in range(0, len(df), self.chunksize):
+            chunk = df.iloc[start:start + self.chunksize]
+            text = chunk.to_json(orient='records', date_format='iso', indent=2, force_ascii=False)
+            # Drop the enclosing '[\n' and '\n]' and join chunks with a comma
+            self._file.write(',\n' if self.rows_written else '[\n')
+            self._file.write(text[2:-2])
+            self.rows_written += len(chunk)
+
+    def close(self):
+        if self._file is not None:
+            self._file.write('\n]' if self.rows_written else '[]')
+        super().close()
+
+
+def write_ndjson(df, path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Write a DataFrame as NDJSON in chunks.
+
+    Returns:
+        int: Number of records written
+    """
+    with NDJSONWriter(path, chunksize=chunksize) as writer:
+        writer.write(df)
+    return writer.rows_written
+
+
+def iter_ndjson(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield DataFrames of up to `chunksize` records from an NDJSON file."""
+    with pd.read_json(path, lines=True, chunksize=chunksize, compression='infer') as reader:
+        yield from reader
+
+
+def find_ndjson(directory):
+    """Return the consolidated NDJSON file in `directory` (plain or gzip), or None."""
+    for name in (NDJSON_FILENAME, NDJSON_FILENAME + '.gz'):
+        path = Path(directory) / name
+        if path.exists():
+            return path
+    return None
@@ -0,0 +1,187 @@
+"""
+Bulk loading into Postgres with COPY over a direct connection.
+
+Rows are streamed with `COPY ... FROM STDIN` into a temporary staging table and
+then moved into the target table in the same transaction, so readers see
+either the previous contents or the fully loaded data, never a partial load.
+With row fingerprints (see schema.row_fingerprints) the move can be a delta:
+only new rows are inserted and rows no longer present are deleted.
+"""
+
+import io
+import logging
+
+import pandas as pd
+
+from planilhas_gov_br.entities import DIMENSIONS
+from planilhas_gov_br.schema import AUTORIZACOES_UNIAO_COLUMNS, FINGERPRINT_COLUMN, coerce_to_schema
+
+logger = logging.getLogger(__name__)
+
+# Marker for NULL in the COPY stream (distinguishes NULL from empty strings)
+COPY_NULL = '\\N'
+
+COPY_CHUNK_ROWS = 50000
+
+LOAD_MODES = ('replace', 'append', 'sync')
+
+
+def _quote_ident(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def iter_copy_chunks(df, columns, chunk_rows=COPY_CHUNK_ROWS):
+    """Yield CSV text chunks of `df[columns]` ready for COPY ... (FORMAT csv)."""
+    for start in range(0, len(df), chunk_rows):
+        buffer = io.StringIO()
+        df.iloc[start:start + chunk_rows][columns].to_csv(
+            buffer, header=False, index=False, na_rep=COPY_NULL, lineterminator='\n')
+        yield buffer.getvalue()
+
+
+def copy_load(df, conn_string, table='autorizacoes_uniao', mode='replace', chunk_rows=COPY_CHUNK_ROWS):
+    """
+    Load a frame with database column names into `table` using COPY.
+
+    Args:
+        df: Frame with autorizacoes_uniao column names
+        conn_string (str): Postgres connection string (direct, not pooled)
+        table (str): Target table
+        mode (str): 'replace' swaps the table contents for the new rows,
+                    'append' adds them to the existing rows, 'sync' inserts
+                    new fingerprints and deletes rows whose fingerprint is
+                    gone ('sync' needs the row_fingerprint column)
+        chunk_rows (int): Rows per COPY chunk sent to the server
+
+    Returns:
+        int: Number of rows loaded
+    """
+    import psycopg2
+
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load mode {mode!r}; expected one of {LOAD_MODES}")
+
+    columns = [col for col, _ in AUTORIZACOES_UNIAO_COLUMNS]
+    coerced = coerce_to_schema(df)
+    has_fingerprint = FINGERPRINT_COLUMN in df.columns
+    if has_fingerprint:
+        columns.append(FINGERPRINT_COLUMN)
+        coerced[FINGERPRINT_COLUMN] = df[FINGERPRINT_COLUMN]
+    elif mode == 'sync':
+        raise ValueError(f"mode 'sync' needs the {FINGERPRINT_COLUMN} column")
+    # Dimension foreign keys (orgao_id, cargo_id), when the entities were resolved
+    for _, id_column in DIMENSIONS.values():
+        if id_column in df.columns:
+            columns.append(id_column)
+            coerced[id_column] = pd.to_numeric(df[id_column], errors='coerce').astype('Int64')
+    df = coerced
+
+    column_list = ', '.join(_quote_ident(col) for col in columns)
+    target = _quote_ident(table)
+    staging = _quote_ident(f'{table}_staging')
+    fingerprint = _quote_ident(FINGERPRINT_COLUMN)
+
+    conn = psycopg2.connect(conn_string)
+    try:
+        # One transaction: the staging load and the swap commit together
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(f"CREATE TEMP TABLE {staging} "
+                            f"(LIKE {target} INCLUDING DEFAULTS) ON COMMIT DROP")
+
+                copy_sql = (f"COPY {staging} ({column_list}) FROM STDIN "
+                            f"WITH (FORMAT csv, NULL '{COPY_NULL}')")
+                loaded = 0
+                for chunk in iter_copy_chunks(df, columns, chunk_rows):
+                    cur.copy_expert(copy_sql, io.StringIO(chunk))
+                    loaded = min(len(df), loaded + chunk_rows)
+                    logger.info(f"Staged {loaded}/{len(df)} rows")
+
+                # Block concurrent writers but keep readers on the old snapshot
+                cur.execute(f"LOCK TABLE {target} IN SHARE ROW EXCLUSIVE MODE")
+                if mode == 'replace':
+                    cur.execute(f"DELETE FROM {target}")
+                # Rows whose fingerprint is already loaded are skipped, so re-runs are idempotent
+                on_conflict = f" ON CONFLICT ({fingerprint}) DO NOTHING" if has_fingerprint and mode != 'replace' else ""
+                cur.execute(f"INSERT INTO {target} ({column_list}) "
+                            f"SELECT {column_list} FROM {staging}{on_conflict}")
+                inserted = cur.rowcount
+                if mode == 'sync':
+                    # Drop rows no longer in the dataset, and rows loaded before fingerprints existed
+                    cur.execute(f"DELETE FROM {target} t WHERE t.{fingerprint} IS NULL "
+                                f"OR NOT EXISTS (SELECT 1 FROM {staging} s WHERE s.{fingerprint} = t.{fingerprint})")
+                    logger.info(f"Deleted {cur.rowcount} stale rows from {table}")
+    finally:
+        conn.close()
+
+    logger.info(f"✓ Loaded {inserted} rows into {table} ({mode})")
+    return inserted
+
+
+def replace_table_rows(conn_string, tables):
+    """
+    Replace the contents of small tables in a single transaction.
+
+    Args:
+        conn_string (str): Postgres connection string (direct, not pooled)
+        tables (dict): table name -> list of row dicts (all with the same keys)
+    """
+    import psycopg2
+
+    conn = psycopg2.connect(conn_string)
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                for table, rows in tables.items():
+                    target = _quote_ident(table)
+                    cur.execute(f"DELETE FROM {target}")
+                    if not rows:
+                        continue
+                    df = pd.DataFrame(rows)
+                    columns = list(df.columns)
+                    column_list = ', '.join(_quote_ident(col) for col in columns)
+                    copy_sql = (f"COPY {target} ({column_list}) FROM STDIN "
+                                f"WITH (FORMAT csv, NULL '{COPY_NULL}')")
+                    for chunk in iter_copy_chunks(df, columns):
+                        cur.copy_expert(copy_sql, io.StringIO(chunk))
+                    logger.info(f"Replaced {table} with {len(rows)} rows")
+    finally:
+        conn.close()
+
+
+def upsert_table_rows(conn_string, tables, key='id'):
+    """
+    Insert or update rows of small tables by key in a single transaction; rows
+    missing from `tables` are kept (they may still be referenced).
+
+    Args:
+        conn_string (str): Postgres connection string (direct, not pooled)
+        tables (dict): table name -> list of row dicts (all with the same keys)
+        key (str): Primary key column of every table
+    """
+    import psycopg2
+
+    conn = psycopg2.connect(conn_string)
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                for table, rows in tables.items():
+                    if not rows:
+                        continue
+                    target = _quote_ident(table)
+                    staging = _quote_ident(f'{table}_staging')
+                    df = pd.DataFrame(rows)
+                    columns = list(df.columns)
+                    column_list = ', '.join(_quote_ident(col) for col in columns)
+                    updates = ', '.join(f"{_quote_ident(col)} = EXCLUDED.{_quote_ident(col)}"
+                                        for col in columns if col != key)
+                    cur.execute(f"CREATE TEMP TABLE {staging} (LIKE {target} INCLUDING DEFAULTS) ON COMMIT DROP")
+                    copy_sql = (f"COPY {staging} ({column_list}) FROM STDIN "
+                                f"WITH (FORMAT csv, NULL '{COPY_NULL}')")
+                    for chunk in iter_copy_chunks(df, columns):
+                        cur.copy_expert(copy_sql, io.StringIO(chunk))
+                    cur.execute(f"INSERT INTO {target} ({column_list}) SELECT {column_list} FROM {staging} "
+                                f"ON CONFLICT ({_quote_ident(key)}) DO UPDATE SET {updates}")
+                    logger.info(f"Upserted {len(rows)} rows into {table}")
+    finally:
+        conn.close()
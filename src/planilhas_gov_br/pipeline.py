@@ -0,0 +1,330 @@
+"""
+In-process ETL pipeline: extract -> normalize -> consolidate -> load.
+
+The stages pass frames in memory instead of talking through
+consolidated_data.csv: each workbook is read once, its columns are resolved
+directly to the autorizacoes_uniao names and types, and the consolidated frame
+goes straight to COPY or the REST uploader.
+
+    from planilhas_gov_br import pipeline
+
+    sheets = pipeline.extract(paths, workers=4)
+    frames = pipeline.normalize(sheets)
+    df = pipeline.resolve_entities(pipeline.consolidate(frames))
+    pipeline.load_copy(df, conn_string, summaries=summary.compute_summaries(df),
+                       dimensions=entities.registry.dimension_rows())
+
+or, for the whole run, `pipeline.run(...)` / `python -m planilhas_gov_br.pipeline`.
+"""
+
+import argparse
+import logging
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+import pandas as pd
+
+from planilhas_gov_br import canonical, dedupe, entities, instrumentation, layouts, pgload, readers, records, summary
+from planilhas_gov_br.extract import (
+    dedupe_columns,
+    map_column_headers,
+    normalize_data_values,
+    read_excel_data,
+)
+from planilhas_gov_br.manifest import PIPELINE_VERSION
+from planilhas_gov_br.schema import (
+    FINGERPRINT_COLUMN,
+    align_categories,
+    coerce_to_schema,
+    compact_frame,
+    normalize_column_names,
+    row_fingerprints,
+)
+from planilhas_gov_br.uploader import BatchUploader, postgrest_upsert, upload_dimensions, upload_summaries
+
+logger = logging.getLogger(__name__)
+
+TABLE = 'autorizacoes_uniao'
+
+# One workbook after extraction. `frame` is None for empty or failed files and
+# `error` holds the error message of a failed file.
+Sheet = namedtuple('Sheet', ['source', 'frame', 'header_row', 'layout_key', 'error'])
+
+# Outcome of run(): the consolidated frame, its dashboard summaries, the
+# (source, error) pairs of failed files, the number of rows loaded (or None)
+# and the dedupe.DuplicateIndex of the run (or None)
+PipelineResult = namedtuple('PipelineResult', ['frame', 'summaries', 'errors', 'loaded', 'duplicates'])
+
+
+def extract_file(excel_file, engine=None):
+    """Read one workbook from its header row. Errors are returned in the Sheet."""
+    excel_file = Path(excel_file)
+    try:
+        with instrumentation.recorder.span('read', file=excel_file.name) as span:
+            df, header_row, layout_key = read_excel_data(excel_file, engine=engine)
+            span.rows_out = 0 if df is None else len(df)
+    except Exception as e:
+        logger.error(f"Error reading {excel_file.name}: {e}")
+        return Sheet(excel_file.name, None, None, None, str(e))
+    if df is not None and df.empty:
+        df = None
+    return Sheet(excel_file.name, df, header_row, layout_key, None)
+
+
+def _init_extract_worker(layout_entries, version):
+    layouts.registry = layouts.LayoutRegistry(layout_entries, version=version)
+
+
+def _extract_file_in_worker(excel_file, engine=None):
+    return extract_file(excel_file, engine), instrumentation.recorder.pop_spans()
+
+
+def extract(excel_files, workers=1, engine=None):
+    """
+    Yield a Sheet per workbook, in the order of excel_files.
+
+    With workers > 1 the workbooks are parsed in a process pool that shares
+    this process' layout registry; header mapping and normalization happen in
+    the normalize stage. `engine` is the Excel engine tried first (see
+    planilhas_gov_br.readers).
+    """
+    excel_files = list(excel_files)
+    if workers <= 1 or len(excel_files) <= 1:
+        for excel_file in excel_files:
+            yield extract_file(excel_file, engine)
+        return
+
+    registry = layouts.registry
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_extract_worker,
+                             initargs=(registry.entries, registry.version)) as executor:
+        for sheet, spans in executor.map(_extract_file_in_worker, excel_files, repeat(engine)):
+            instrumentation.recorder.extend(spans)
+            yield sheet
+
+
+def normalize_sheet(sheet):
+    """
+    Map a sheet's columns to the autorizacoes_uniao names and types in one pass:
+    header mapping (reusing registered layouts), value normalization, then the
+    database column names and types, held with the compact dtypes of
+    schema.COMPACT_DTYPES. Columns outside the table are dropped.
+    """
+    with instrumentation.recorder.span('normalize', file=sheet.source, rows_in=len(sheet.frame)) as span:
+        df = map_column_headers(sheet.frame, sheet.layout_key, sheet.header_row, source=sheet.source)
+        try:
+            df = normalize_data_values(df)
+        except Exception as e:
+            logger.warning(f"Could not normalize data for {sheet.source}: {e}. Using original data.")
+        df = compact_frame(coerce_to_schema(normalize_column_names(dedupe_columns(df, sheet.source))))
+        span.rows_out = len(df)
+    return df
+
+
+def normalize(sheets, errors=None, duplicates=None):
+    """
+    Yield the typed frame of each extracted sheet. Empty sheets are skipped;
+    failed ones are appended to `errors` as (source, error) when given. With a
+    dedupe.DuplicateIndex in `duplicates`, rows seen in an earlier sheet are dropped.
+    """
+    for sheet in sheets:
+        if sheet.error is not None:
+            if errors is not None:
+                errors.append((sheet.source, sheet.error))
+            continue
+        if sheet.frame is None:
+            logger.info(f"Skipping {sheet.source} - no data")
+            continue
+        df = normalize_sheet(sheet)
+        if duplicates is not None:
+            with instrumentation.recorder.span('dedupe', file=sheet.source, rows_in=len(df)) as span:
+                df = duplicates.filter(df, sheet.source)
+                span.rows_out = len(df)
+        yield df
+
+
+def consolidate(frames):
+    """
+    Concatenate typed frames and add row fingerprints. All frames share the
+    table schema, so no column alignment is needed.
+    """
+    frames = list(frames)
+    with instrumentation.recorder.span('consolidate', rows_in=sum(len(df) for df in frames)) as span:
+        if frames:
+            df = pd.concat(align_categories(frames), ignore_index=True)
+        else:
+            df = coerce_to_schema(pd.DataFrame())
+        df[FINGERPRINT_COLUMN] = row_fingerprints(df)
+        span.rows_out = len(df)
+    return df
+
+
+def resolve_entities(df):
+    """Add the orgao_id and cargo_id columns from the process-wide entities.registry."""
+    with instrumentation.recorder.span('resolve_entities', rows_in=len(df)) as span:
+        entities.registry.assign_ids(df)
+        span.rows_out = len(df)
+    return df
+
+
+def load_copy(df, conn_string, mode='replace', summaries=None, table=TABLE, dimensions=None):
+    """
+    Load the consolidated frame with COPY (see pgload.copy_load) and replace
+    the dashboard summary tables. `dimensions` (see
+    entities.EntityRegistry.dimension_rows) are upserted before the fact rows.
+
+    Returns:
+        int: Number of rows loaded
+    """
+    if dimensions is not None:
+        with instrumentation.recorder.span('upload_dimensions', method='copy'):
+            pgload.upsert_table_rows(conn_string, dimensions)
+    with instrumentation.recorder.span('upload', method='copy', rows_in=len(df)) as span:
+        loaded = pgload.copy_load(df, conn_string, table=table, mode=mode)
+        span.rows_out = loaded
+    if summaries is not None:
+        with instrumentation.recorder.span('upload_summaries', method='copy'):
+            pgload.replace_table_rows(conn_string, {name: summaries.get(name, []) for name in summary.SUMMARY_TABLES})
+    return loaded
+
+
+def load_rest(df, supabase, workers=4, batch_size=1000, summaries=None, table=TABLE, dimensions=None):
+    """
+    Upsert the consolidated frame through PostgREST in concurrent batches (see
+    uploader.BatchUploader) and replace the dashboard summary tables.
+    `dimensions` are upserted before the fact rows.
+
+    Returns:
+        UploadResult
+    """
+    if dimensions is not None:
+        with instrumentation.recorder.span('upload_dimensions', method='rest'):
+            upload_dimensions(supabase, dimensions)
+    uploader = BatchUploader(postgrest_upsert(supabase, table), max_workers=workers, batch_size=batch_size)
+    with instrumentation.recorder.span('upload', method='rest', rows_in=len(df)) as span:
+        result = uploader.upload(records.JSONRecords(df))
+        span.rows_out = result.uploaded
+    if result.failed:
+        logger.warning(f"Failed to upload {result.failed} rows")
+    if summaries is not None:
+        with instrumentation.recorder.span('upload_summaries', method='rest'):
+            upload_summaries(supabase, summaries)
+    return result
+
+
+def run(excel_files, workers=1, load=None, conn_string=None, supabase=None, mode='replace',
+        upload_workers=4, batch_size=1000, state_dir=None, dedupe_rows=True, excel_engine=None):
+    """
+    Run extract -> normalize -> consolidate -> load in memory.
+
+    Args:
+        excel_files: Workbook paths, consolidated in this order
+        workers (int): Worker processes for parsing the workbooks
+        load (str): None to skip loading, 'copy' (needs conn_string) or
+                    'rest' (needs a Supabase client)
+        conn_string (str): Direct Postgres connection string for 'copy'
+        supabase: Supabase client for 'rest'
+        mode (str): COPY load mode (see pgload.LOAD_MODES)
+        upload_workers (int): REST batches kept in flight at once
+        batch_size (int): Initial REST batch size
+        state_dir (Path): Directory holding the canonical memo, layout registry
+                          and entity registry; they are loaded from and saved to it
+        dedupe_rows (bool): Drop rows repeated across workbooks (see planilhas_gov_br.dedupe)
+        excel_engine (str): Excel engine tried first for each workbook (see planilhas_gov_br.readers)
+
+    Returns:
+        PipelineResult
+    """
+    if state_dir is not None:
+        state_dir = Path(state_dir)
+        canonical.load_memo(state_dir / canonical.MEMO_FILENAME)
+        layouts.load_registry(state_dir / layouts.REGISTRY_FILENAME, PIPELINE_VERSION)
+        entities.load_registry(state_dir / entities.REGISTRY_FILENAME)
+
+    errors = []
+    duplicates = dedupe.DuplicateIndex() if dedupe_rows else None
+    df = resolve_entities(consolidate(normalize(extract(excel_files, workers, excel_engine), errors, duplicates)))
+    with instrumentation.recorder.span('summarize', rows_in=len(df)):
+        summaries = summary.compute_summaries(df, orgao_names=entities.registry.names('orgaos'))
+
+    if state_dir is not None:
+        canonical.memo.save(state_dir / canonical.MEMO_FILENAME)
+        layouts.registry.save(state_dir / layouts.REGISTRY_FILENAME)
+        entities.registry.save(state_dir / entities.REGISTRY_FILENAME)
+
+    dimensions = entities.registry.dimension_rows()
+    loaded = None
+    if load == 'copy':
+        loaded = load_copy(df, conn_string, mode=mode, summaries=summaries, dimensions=dimensions)
+    elif load == 'rest':
+        loaded = load_rest(df, supabase, workers=upload_workers, batch_size=batch_size, summaries=summaries,
+                           dimensions=dimensions).uploaded
+    elif load is not None:
+        raise ValueError(f"Unknown load method {load!r}; expected 'copy' or 'rest'")
+
+    return PipelineResult(df, summaries, errors, loaded, duplicates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract, normalize and load the DOU spreadsheets in one process")
+    parser.add_argument('--root', default='.', help="Project root holding data/raw and data/processed (default: .)")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes for parsing workbooks")
+    parser.add_argument('--load', choices=['copy', 'rest'],
+                        help="Load with COPY over POSTGRES_URL_NON_POOLING or through the Supabase REST API "
+                             "(default: consolidate only)")
+    parser.add_argument('--copy-mode', choices=pgload.LOAD_MODES, default='replace')
+    parser.add_argument('--upload-workers', type=int, default=4, help="REST batches kept in flight at once")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Initial REST batch size")
+    parser.add_argument('--keep-duplicates', action='store_true',
+                        help="Keep rows repeated across overlapping workbooks")
+    parser.add_argument('--excel-engine', choices=('auto',) + readers.ENGINES, default='auto',
+                        help="Excel engine tried first; the others are fallbacks (default: fastest installed)")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    root = Path(args.root)
+    raw_dir = root / 'data' / 'raw'
+    processed_dir = root / 'data' / 'processed'
+    processed_dir.mkdir(parents=True, exist_ok=True)
+    excel_files = list(raw_dir.glob('*.xls')) + list(raw_dir.glob('*.xlsx'))
+
+    conn_string = supabase = None
+    if args.load == 'copy':
+        conn_string = os.environ.get("POSTGRES_URL_NON_POOLING")
+        if not conn_string:
+            parser.error("Missing POSTGRES_URL_NON_POOLING in environment variables")
+    elif args.load == 'rest':
+        url = os.environ.get("SUPABASE_URL")
+        key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+        if not url or not key:
+            parser.error("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY in environment variables")
+        from supabase import create_client
+
+        supabase = create_client(url, key)
+
+    instrumentation.recorder.reset()
+    result = run(excel_files, workers=args.workers, load=args.load, conn_string=conn_string,
+                 supabase=supabase, mode=args.copy_mode, upload_workers=args.upload_workers,
+                 batch_size=args.batch_size, state_dir=processed_dir, dedupe_rows=not args.keep_duplicates,
+                 excel_engine=args.excel_engine)
+
+    for source, error in result.errors:
+        logger.error(f"{source}: {error}")
+    removed = result.duplicates.removed if result.duplicates is not None else None
+    logger.info(f"Consolidated {len(result.frame)} rows from {len(excel_files)} file(s)"
+                + (f", {removed} duplicate(s) removed" if removed else "")
+                + (f"; loaded {result.loaded}" if result.loaded is not None else ""))
+    instrumentation.save_report(instrumentation.recorder.report('pipeline', load=args.load, files_total=len(excel_files),
+                                                                files_failed=len(result.errors),
+                                                                duplicates_removed=removed),
+                                processed_dir / 'pipeline_run_report.json')
+
+
+if __name__ == '__main__':
+    main()
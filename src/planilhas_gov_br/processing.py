@@ -0,0 +1,524 @@
+"""
+File-based processing of data/raw into data/processed.
+
+Each new or modified workbook (see planilhas_gov_br.manifest) is extracted,
+normalized, written as CSV and cached; the cached frames are then consolidated
+into CSV, JSON/NDJSON, Parquet and the dashboard summaries, in memory or one
+file at a time (streaming). Frames are held with the compact dtypes of
+schema.COMPACT_DTYPES (categories, pyarrow strings, small nullable integers).
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import repeat
+from pathlib import Path
+
+import pandas as pd
+
+from planilhas_gov_br import canonical, columnar, dedupe, entities, instrumentation, layouts, ndjson, summary
+from planilhas_gov_br.extract import (
+    dedupe_columns,
+    map_column_headers,
+    normalize_data_values,
+    read_excel_data,
+)
+from planilhas_gov_br.manifest import (
+    MANIFEST_FILENAME,
+    PIPELINE_VERSION,
+    file_sha256,
+    is_unchanged,
+    load_manifest,
+    save_manifest,
+)
+from planilhas_gov_br.schema import align_categories, compact_frame, normalize_column_names
+
+
+def process_excel_file(excel_file, output_dir, engine=None):
+    """
+    Extract, normalize and save a single Excel file as CSV.
+
+    Args:
+        excel_file (Path): Path to the Excel file
+        output_dir (Path): Directory where the converted CSV is written
+        engine (str): Excel engine tried first (see planilhas_gov_br.readers)
+
+    Returns:
+        tuple: (dataframe, error) where dataframe is None for skipped or failed
+               files and error is a dict for the error log or None
+    """
+    print(f"Processing {excel_file.name}...")
+    recorder = instrumentation.recorder
+
+    try:
+        # Detect the header row from the top of the sheet and parse it once
+        with recorder.span('read', file=excel_file.name) as span:
+            df, data_start_row, layout_key = read_excel_data(excel_file, engine=engine)
+            span.rows_out = 0 if df is None else len(df)
+
+        if df is None:
+            print(f"Skipping {excel_file.name} - empty file")
+            return None, None
+
+        # Check again after reading with headers
+        if df.empty:
+            print(f"Skipping {excel_file.name} - no meaningful data after reading headers")
+            return None, None
+
+        # Skip rows that are just for formatting or information
+        if data_start_row > 0:
+            # We already used the header row, so we don't need to skip any rows
+            pass
+
+        with recorder.span('normalize', file=excel_file.name, rows_in=len(df)) as span:
+            # Normalize the column headers to standardize them (known layouts reuse their mapping)
+            df = map_column_headers(df, layout_key, data_start_row, source=excel_file.name)
+
+            # Apply data normalization following best practices, but with error handling
+            try:
+                df = normalize_data_values(df)
+            except Exception as e:
+                print(f"Warning: Could not normalize data for {excel_file.name}: {str(e)}. Using original data.")
+                # Continue with original (non-normalized) dataframe
+
+            # Categories, pyarrow strings and small integers instead of Python objects
+            df = compact_frame(df)
+            span.rows_out = len(df)
+
+        # Create a CSV filename based on the original Excel file (a.xls and a.xlsx stay apart)
+        csv_filename = output_dir / f"{excel_file.name}.csv"
+
+        # Save the dataframe to CSV with 100% data fidelity
+        with recorder.span('write', file=excel_file.name, output='csv', rows_in=len(df)) as span:
+            df.to_csv(csv_filename, index=False, encoding='utf-8')
+            span.rows_out = len(df)
+        print(f"Saved: {csv_filename}")
+
+        return df, None
+
+    except Exception as e:
+        print(f"Error processing {excel_file.name}: {str(e)}")
+        return None, {
+            'filename': excel_file.name,
+            'error': str(e)
+        }
+
+
+def _init_worker(memo_path, registry_path):
+    """Load the persisted canonical memo and layout registry in a pool worker."""
+    canonical.load_memo(memo_path)
+    if registry_path is not None:
+        layouts.load_registry(registry_path, PIPELINE_VERSION)
+
+
+def _process_excel_file_in_worker(excel_file, output_dir, engine=None):
+    """Run process_excel_file and hand back the memo entries, layouts and spans it added."""
+    df, error = process_excel_file(excel_file, output_dir, engine)
+    return (df, error, canonical.memo.pop_new_entries(), layouts.registry.pop_new_entries(),
+            instrumentation.recorder.pop_spans())
+
+
+def iter_processed_files(excel_files, output_dir, workers=1, memo_path=None, registry_path=None, engine=None):
+    """
+    Yield (dataframe, error) for each Excel file, in the order of excel_files.
+
+    With workers > 1 the files are processed in a process pool; results are
+    still yielded in input order so the consolidated output matches a serial run.
+    Canonical values and layouts resolved by the workers are merged into this
+    process' memo and layout registry, and their instrumentation spans into this
+    process' recorder.
+    """
+    if workers <= 1 or len(excel_files) <= 1:
+        for excel_file in excel_files:
+            yield process_excel_file(excel_file, output_dir, engine)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(memo_path, registry_path)) as executor:
+        # executor.map preserves input order while workers run ahead
+        results = executor.map(_process_excel_file_in_worker, excel_files, repeat(output_dir), repeat(engine))
+        for df, error, new_entries, new_layouts, spans in results:
+            canonical.memo.merge(new_entries)
+            layouts.registry.merge(new_layouts)
+            instrumentation.recorder.extend(spans)
+            yield df, error
+
+
+def cache_head(df, head_path):
+    """Cache the first row of a frame: its columns and dtypes, without the data."""
+    df.iloc[:1].to_pickle(head_path)
+
+
+def union_schema(heads):
+    """
+    Settle the consolidated columns and dtypes from per-file heads.
+
+    The heads are one-row frames that keep the categories of their file, so
+    this is the column order and dtypes an outer pd.concat of the full frames
+    (after align_categories) would produce, at the cost of one row per file.
+
+    Returns:
+        pd.Series: column -> dtype, in consolidated column order
+    """
+    return pd.concat(align_categories(heads), ignore_index=True, sort=False, join='outer').dtypes
+
+
+def conform_to_schema(df, dtypes):
+    """Reindex a frame to the union columns and cast it to the union dtypes."""
+    df = df.reindex(columns=dtypes.index)
+    for col, dtype in dtypes.items():
+        if df[col].dtype != dtype:
+            try:
+                df[col] = df[col].astype(dtype)
+            except (TypeError, ValueError):
+                df[col] = df[col].astype(object)
+    return df
+
+
+def consolidate_streaming(cache_paths, head_paths, processed_dir, json_format='json', gzip_json=False,
+                          sources=None, duplicates=None):
+    """
+    Write the consolidated outputs one cached frame at a time.
+
+    The union schema is settled first from the cached heads; each frame is then
+    conformed to it and appended to the CSV, JSON/NDJSON and Parquet outputs and
+    to the dashboard aggregates, so peak memory is about one workbook. The
+    outputs match the in-memory consolidation.
+
+    `sources` names the workbook of each cache path; it labels the spans (like
+    the per-file stages) and, with a dedupe.DuplicateIndex in `duplicates`,
+    rows already written from an earlier workbook are dropped.
+
+    Returns:
+        int: Number of consolidated rows
+    """
+    recorder = instrumentation.recorder
+    heads = [dedupe_columns(pd.read_pickle(path), i) for i, path in enumerate(head_paths)]
+    dtypes = union_schema(heads)
+
+    consolidated_csv_path = processed_dir / 'consolidated_data.csv'
+    if json_format == 'ndjson':
+        consolidated_json_path = processed_dir / (ndjson.NDJSON_FILENAME + ('.gz' if gzip_json else ''))
+        json_writer = ndjson.NDJSONWriter(consolidated_json_path)
+    else:
+        consolidated_json_path = processed_dir / 'consolidated_data.json'
+        json_writer = ndjson.JSONArrayWriter(consolidated_json_path)
+    consolidated_parquet_path = processed_dir / columnar.PARQUET_FILENAME
+    parquet_writer = columnar.ParquetAppender(consolidated_parquet_path) if columnar.is_available() else None
+    accumulator = summary.SummaryAccumulator()
+
+    total_rows = 0
+    with ExitStack() as stack:
+        csv_file = stack.enter_context(open(consolidated_csv_path, 'w', encoding='utf-8', newline=''))
+        stack.enter_context(json_writer)
+        if parquet_writer is not None:
+            stack.enter_context(parquet_writer)
+
+        for i, path in enumerate(cache_paths):
+            source = sources[i] if sources is not None else path.name
+            with recorder.span('consolidate', file=source) as span:
+                df = conform_to_schema(dedupe_columns(pd.read_pickle(path), i), dtypes)
+                span.rows_in = span.rows_out = len(df)
+
+            if duplicates is not None:
+                with recorder.span('dedupe', file=source, rows_in=len(df)) as span:
+                    df = duplicates.filter(df, source)
+                    span.rows_out = len(df)
+
+            with recorder.span('write', file=source, output='consolidated', rows_in=len(df)) as span:
+                df.to_csv(csv_file, index=False, header=(i == 0))
+                json_writer.write(df)
+                db_df = normalize_column_names(df.copy())
+                if parquet_writer is not None:
+                    parquet_writer.write(db_df)
+                span.rows_out = len(df)
+
+            with recorder.span('resolve_entities', file=source, rows_in=len(df)):
+                entities.registry.assign_ids(db_df)
+
+            with recorder.span('summarize', file=source, rows_in=len(df)):
+                accumulator.add(db_df)
+            total_rows += len(df)
+            del df, db_df
+            recorder.check_memory_budget(f"consolidating {source}")
+
+    print(f"Consolidated CSV saved: {consolidated_csv_path}")
+    print(f"Consolidated JSON saved: {consolidated_json_path}")
+    if parquet_writer is not None:
+        print(f"Consolidated Parquet saved: {consolidated_parquet_path}")
+    else:
+        print("pyarrow not installed - skipping consolidated Parquet output")
+
+    summaries_path = processed_dir / summary.SUMMARY_FILENAME
+    accumulator.orgao_names = entities.registry.names('orgaos')
+    summary.save_summaries(accumulator.result(), summaries_path)
+    print(f"Dashboard summaries saved: {summaries_path}")
+    return total_rows
+
+
+def estimate_consolidation_bytes(cache_paths):
+    """
+    Rough peak memory of the in-memory consolidation: the per-file frames, the
+    concatenated frame and its copy with database column names, each about
+    the size of the cached pickles.
+    """
+    return 3 * sum(path.stat().st_size for path in cache_paths)
+
+
+def process_spreadsheets(directory_path, workers=1, full=False, json_format='json', gzip_json=False,
+                         metrics_file=None, streaming=False, dedupe_rows=True, memory_budget=None,
+                         excel_engine=None):
+    """
+    Process all Excel files in the given directory, convert each to CSV,
+    and create consolidated CSV and JSON files.
+
+    Args:
+        directory_path (str): Path to directory containing Excel files
+        workers (int): Number of worker processes (1 processes files serially)
+        full (bool): Ignore the manifest and reprocess every file
+        json_format (str): 'json' for an indented JSON document or 'ndjson' to
+                           stream newline-delimited records in chunks
+        gzip_json (bool): Gzip the NDJSON output (consolidated_data.ndjson.gz)
+        metrics_file (str): Optional Prometheus textfile with the run's stage metrics
+        streaming (bool): Consolidate one file at a time (bounded memory) instead
+                          of concatenating every file in memory
+        dedupe_rows (bool): Drop rows repeated across files (see planilhas_gov_br.dedupe)
+                            and write their provenance
+        memory_budget (int): Peak RSS budget in bytes. The consolidation switches to
+                             streaming when the in-memory one would not fit, and the
+                             run fails with instrumentation.MemoryBudgetExceeded once
+                             the peak goes over it
+        excel_engine (str): Excel engine tried first for each workbook ('calamine',
+                            'openpyxl' or 'xlrd'; default: fastest installed), with the
+                            other engines as fallbacks (see planilhas_gov_br.readers)
+    """
+    recorder = instrumentation.recorder
+    recorder.reset(memory_budget=memory_budget)
+
+    # Define directory path (project root)
+    project_root = Path(directory_path)
+
+    # Find all Excel files in data/raw directory
+    raw_data_dir = project_root / 'data' / 'raw'
+    excel_files = list(raw_data_dir.glob('*.xls')) + list(raw_data_dir.glob('*.xlsx'))
+
+    # Create output directory for individual CSVs
+    processed_dir = project_root / 'data' / 'processed'
+    output_dir = processed_dir / 'converted_csvs'
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Raw -> canonical values persisted across runs and shared with the upload scripts
+    memo_path = processed_dir / canonical.MEMO_FILENAME
+    canonical.load_memo(memo_path)
+
+    # Header row and column mapping of known spreadsheet templates
+    registry_path = processed_dir / layouts.REGISTRY_FILENAME
+    layouts.load_registry(registry_path, PIPELINE_VERSION)
+
+    # Canonical IDs of órgãos and cargos (dimension tables), stable across runs
+    entities_path = processed_dir / entities.REGISTRY_FILENAME
+    entities.load_registry(entities_path)
+
+    # Per-file normalized frames are cached so unchanged files are not re-extracted
+    cache_dir = processed_dir / 'cache'
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = processed_dir / MANIFEST_FILENAME
+    manifest = {'pipeline_version': PIPELINE_VERSION, 'files': {}} if full else load_manifest(manifest_path)
+    previous_entries = manifest['files']
+
+    # Decide which files need to be (re)processed
+    entries = {}
+    changed_files = []
+    for excel_file in excel_files:
+        entry = previous_entries.get(excel_file.name)
+        unchanged, stat, sha256 = is_unchanged(excel_file, entry, cache_dir)
+        if unchanged:
+            entries[excel_file.name] = dict(entry, size=stat.st_size, mtime=stat.st_mtime)
+        else:
+            entries[excel_file.name] = {
+                'sha256': sha256 or file_sha256(excel_file),
+                'size': stat.st_size,
+                'mtime': stat.st_mtime,
+            }
+            changed_files.append(excel_file)
+
+    print(f"{len(changed_files)} of {len(excel_files)} file(s) new or modified")
+
+    # Process each new or modified Excel file and cache the result
+    processed = iter_processed_files(changed_files, output_dir, workers, memo_path, registry_path, excel_engine)
+    for excel_file, (df, error) in zip(changed_files, processed):
+        entry = entries[excel_file.name]
+        if error is not None:
+            entry.update(status='error', error=error['error'])
+        elif df is None:
+            entry.update(status='skipped')
+        else:
+            cache_name = f"{excel_file.name}.pkl"
+            head_name = f"{excel_file.name}.head.pkl"
+            df.to_pickle(cache_dir / cache_name)
+            cache_head(df, cache_dir / head_name)
+            entry.update(status='ok', cache=cache_name, head=head_name, csv=f"{excel_file.name}.csv", rows=len(df))
+        del df
+        recorder.check_memory_budget(f"processing {excel_file.name}")
+
+    # Entries cached before heads were recorded
+    for excel_file in excel_files:
+        entry = entries[excel_file.name]
+        if entry.get('status') == 'ok' and not (cache_dir / entry.get('head', '')).is_file():
+            entry['head'] = f"{excel_file.name}.head.pkl"
+            cache_head(pd.read_pickle(cache_dir / entry['cache']), cache_dir / entry['head'])
+
+    # Drop cached frames no entry points to (files no longer in data/raw, older cache names)
+    referenced = {entry[key] for entry in entries.values() for key in ('cache', 'head') if entry.get(key)}
+    for path in cache_dir.glob('*.pkl'):
+        if path.name not in referenced:
+            path.unlink(missing_ok=True)
+
+    canonical.memo.save(memo_path)
+    layouts.registry.save(registry_path)
+
+    manifest = {'pipeline_version': PIPELINE_VERSION, 'files': entries}
+    save_manifest(manifest, manifest_path)
+
+    # Cached frames to consolidate, in file order
+    cache_paths = []
+    head_paths = []
+    sources = []
+    error_log = []
+
+    for excel_file in excel_files:
+        entry = entries[excel_file.name]
+        if entry.get('status') == 'error':
+            error_log.append({
+                'filename': excel_file.name,
+                'error': entry['error']
+            })
+        elif entry.get('status') == 'ok':
+            cache_paths.append(cache_dir / entry['cache'])
+            head_paths.append(cache_dir / entry['head'])
+            sources.append(excel_file.name)
+
+    # Rows repeated across overlapping workbooks (yearly and cumulative files)
+    duplicates = dedupe.DuplicateIndex() if dedupe_rows else None
+
+    if cache_paths and not streaming and memory_budget is not None:
+        estimate = (instrumentation.peak_rss_bytes() or 0) + estimate_consolidation_bytes(cache_paths)
+        if estimate > memory_budget:
+            print(f"In-memory consolidation needs about {instrumentation.format_size(estimate)}, over the "
+                  f"memory budget of {instrumentation.format_size(memory_budget)} - consolidating in streaming mode")
+            streaming = True
+
+    if cache_paths and streaming:
+        # Append each file to the outputs as it is loaded; only one frame in memory
+        consolidate_streaming(cache_paths, head_paths, processed_dir, json_format, gzip_json, sources, duplicates)
+
+    # Create consolidated CSV and JSON if there are valid dataframes
+    elif cache_paths:
+        # Ensure columns are uniquely named across dataframes to avoid reindexing errors
+        dataframes = [dedupe_columns(pd.read_pickle(path), i) for i, path in enumerate(cache_paths)]
+        # Same categories everywhere, so the concatenated columns stay categorical
+        align_categories(dataframes)
+
+        if duplicates is not None:
+            with recorder.span('dedupe', rows_in=sum(len(df) for df in dataframes)) as span:
+                dataframes = [duplicates.filter(df, source) for df, source in zip(dataframes, sources)]
+                span.rows_out = sum(len(df) for df in dataframes)
+
+        # Combine all dataframes, aligning columns
+        with recorder.span('consolidate', rows_in=sum(len(df) for df in dataframes)) as span:
+            combined_df = pd.concat(dataframes, ignore_index=True, sort=False, join='outer')
+            span.rows_out = len(combined_df)
+        del dataframes
+        recorder.check_memory_budget("consolidating")
+        total_rows = len(combined_df)
+
+        # Save consolidated CSV
+        consolidated_csv_path = processed_dir / 'consolidated_data.csv'
+        with recorder.span('write', output='consolidated_csv', rows_in=total_rows) as span:
+            combined_df.to_csv(consolidated_csv_path, index=False, encoding='utf-8')
+            span.rows_out = total_rows
+        print(f"Consolidated CSV saved: {consolidated_csv_path}")
+
+        # Save consolidated JSON
+        with recorder.span('write', output=f'consolidated_{json_format}', rows_in=total_rows) as span:
+            if json_format == 'ndjson':
+                # Stream records in chunks instead of building the whole document in memory
+                consolidated_json_path = processed_dir / (ndjson.NDJSON_FILENAME + ('.gz' if gzip_json else ''))
+                ndjson.write_ndjson(combined_df, consolidated_json_path)
+            else:
+                consolidated_json_path = processed_dir / 'consolidated_data.json'
+                combined_df.to_json(consolidated_json_path, orient='records', date_format='iso', indent=2, force_ascii=False)
+            span.rows_out = total_rows
+        print(f"Consolidated JSON saved: {consolidated_json_path}")
+
+        # Database column names for the typed and aggregated outputs
+        db_df = normalize_column_names(combined_df.copy())
+
+        # Save typed columnar copy with the autorizacoes_uniao schema for the upload scripts
+        if columnar.is_available():
+            consolidated_parquet_path = processed_dir / columnar.PARQUET_FILENAME
+            with recorder.span('write', output='consolidated_parquet', rows_in=total_rows) as span:
+                columnar.write_parquet(db_df, consolidated_parquet_path)
+                span.rows_out = total_rows
+            print(f"Consolidated Parquet saved: {consolidated_parquet_path}")
+        else:
+            print("pyarrow not installed - skipping consolidated Parquet output")
+
+        # Órgão and cargo IDs, so the aggregates group spelling variants together
+        with recorder.span('resolve_entities', rows_in=total_rows):
+            entities.registry.assign_ids(db_df)
+
+        # Save dashboard aggregates, loaded into the summary tables by the upload script
+        summaries_path = processed_dir / summary.SUMMARY_FILENAME
+        with recorder.span('summarize', rows_in=total_rows):
+            summary.save_summaries(summary.compute_summaries(db_df, orgao_names=entities.registry.names('orgaos')),
+                                   summaries_path)
+        print(f"Dashboard summaries saved: {summaries_path}")
+        recorder.check_memory_budget("summarizing")
+
+    if cache_paths:
+        entities.registry.save(entities_path)
+
+    if duplicates is not None and cache_paths:
+        dedupe_report = duplicates.report()
+        print(f"Removed {dedupe_report['removed']} duplicate row(s) "
+              f"({dedupe_report['removed_exact']} exact, {dedupe_report['removed_normalized']} after normalization)")
+        dedupe_report_path = processed_dir / dedupe.REPORT_FILENAME
+        instrumentation.save_report(dedupe_report, dedupe_report_path)
+        print(f"Deduplication report saved: {dedupe_report_path}")
+        provenance_path = processed_dir / dedupe.PROVENANCE_FILENAME
+        duplicates.save_provenance(provenance_path)
+        print(f"Row provenance saved: {provenance_path}")
+
+    # Log error for corrupted files
+    if error_log:
+        error_log_path = processed_dir / 'error_log.txt'
+        with open(error_log_path, 'w', encoding='utf-8') as f:
+            f.write("Error Log for Corrupted Files:\n")
+            f.write("="*40 + "\n")
+            for err in error_log:
+                f.write(f"File: {err['filename']}\n")
+                f.write(f"Error: {err['error']}\n")
+                f.write("-"*40 + "\n")
+        print(f"Error log saved: {error_log_path}")
+
+    # Machine-readable run report: per-stage totals, slowest workbooks and every span
+    if memory_budget is not None:
+        peak = recorder.run_peak_rss_bytes()
+        if peak is not None:
+            print(f"Peak RSS {instrumentation.format_size(peak)}{' (with the pool workers)' if workers > 1 else ''} "
+                  f"(memory budget {instrumentation.format_size(memory_budget)})")
+
+    report = recorder.report('process', files_total=len(excel_files), files_processed=len(changed_files),
+                             files_failed=len(error_log), workers=workers, streaming=streaming,
+                             duplicates_removed=duplicates.removed if duplicates is not None else None)
+    if report['excel_engines']:
+        print("Excel engines: " + ', '.join(f"{engine} ({count} file(s))"
+                                            for engine, count in report['excel_engines'].items()))
+    report_path = processed_dir / instrumentation.REPORT_FILENAME
+    instrumentation.save_report(report, report_path)
+    print(f"Run report saved: {report_path}")
+    if metrics_file:
+        instrumentation.write_prometheus_textfile(report, metrics_file)
+        print(f"Metrics saved: {metrics_file}")
+
+    print("Processing complete!")
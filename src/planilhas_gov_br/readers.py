@@ -0,0 +1,94 @@
+"""
+Excel reader backends.
+
+Workbooks are parsed with one of the pandas engines below, chosen per file
+from its extension and the installed packages:
+
+    calamine   .xlsx/.xlsm/.xlsb/.xls/.ods, Rust parser (`pip install planilhas_gov_br[calamine]`,
+               pandas >= 2.2); several times faster than the Python parsers
+    openpyxl   .xlsx/.xlsm, opened read-only by pandas so rows are streamed from the sheet XML
+    xlrd       .xls
+
+When an engine fails to parse a file the next one is tried (see
+extract.read_excel_data); the engine that read each file is recorded in the
+run report.
+"""
+
+import importlib.util
+import logging
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Engine -> module that has to be importable
+ENGINE_MODULES = {
+    'calamine': 'python_calamine',
+    'openpyxl': 'openpyxl',
+    'xlrd': 'xlrd',
+}
+
+ENGINES = tuple(ENGINE_MODULES)
+
+# Extension -> engines able to read it, fastest first
+EXTENSION_ENGINES = {
+    '.xlsx': ('calamine', 'openpyxl'),
+    '.xlsm': ('calamine', 'openpyxl'),
+    '.xlsb': ('calamine',),
+    '.xls': ('calamine', 'xlrd'),
+    '.ods': ('calamine',),
+}
+
+
+class WorkbookReadError(Exception):
+    """No engine could parse a workbook; the message lists each engine's error."""
+
+
+@lru_cache(maxsize=None)
+def _warn_unsupported(engine, suffix):
+    """Warn once per engine and extension that a requested engine is ignored."""
+    logger.warning(f"Excel engine {engine!r} cannot read {suffix} files; "
+                   f"using {', '.join(EXTENSION_ENGINES[suffix])} instead")
+
+
+@lru_cache(maxsize=None)
+def is_available(engine):
+    """Return True when `engine` is installed (and supported by this pandas for calamine)."""
+    if engine == 'calamine' and tuple(int(part) for part in pd.__version__.split('.')[:2]) < (2, 2):
+        return False
+    return importlib.util.find_spec(ENGINE_MODULES[engine]) is not None
+
+
+def available_engines():
+    return [engine for engine in ENGINES if is_available(engine)]
+
+
+def engines_for(path, engine=None):
+    """
+    Engines to try for a workbook, in order.
+
+    Args:
+        path: Workbook path; its extension selects the engines able to read it
+        engine (str): Engine tried first ('auto' or None for the default order);
+                      the other engines of the extension remain as fallbacks.
+                      An engine unable to read the extension is ignored with a
+                      warning
+
+    Returns:
+        list: Engine names, or [None] (pandas' own choice) for an extension
+              without a known engine
+    """
+    if engine not in (None, 'auto') and engine not in ENGINE_MODULES:
+        raise ValueError(f"Unknown Excel engine {engine!r} (expected one of {', '.join(ENGINES)})")
+    suffix = Path(path).suffix.lower()
+    candidates = EXTENSION_ENGINES.get(suffix)
+    if candidates is None:
+        return [None]
+    if engine in candidates:
+        candidates = (engine,) + tuple(name for name in candidates if name != engine)
+    elif engine not in (None, 'auto'):
+        _warn_unsupported(engine, suffix)
+    return [name for name in candidates if is_available(name)] or [None]
+
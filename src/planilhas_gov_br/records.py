@@ -0,0 +1,72 @@
+"""
+JSON-ready record batches built column-wise from a DataFrame, plus a fast JSON
+encoder for request bodies.
+
+Nulls (None, NaN, pd.NA) and non-finite floats are converted to None once per
+column with vectorized masks, instead of checking every value of every record.
+orjson is used for encoding when installed (`pip install planilhas_gov_br[fast]`).
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def column_to_json_values(series):
+    """
+    Convert a column to a list of JSON-serializable Python values, with None
+    for nulls and for NaN/inf floats.
+    """
+    if ptypes.is_float_dtype(series.dtype):
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        result = values.astype(object)
+        result[~np.isfinite(values)] = None
+        return result.tolist()
+
+    if ptypes.is_integer_dtype(series.dtype) or ptypes.is_bool_dtype(series.dtype):
+        # Nullable Int64/boolean as well as plain NumPy columns
+        return series.to_numpy(dtype=object, na_value=None).tolist()
+
+    result = series.to_numpy(dtype=object, copy=True)
+    result[pd.isna(result)] = None
+    if ptypes.infer_dtype(result, skipna=True) in ('floating', 'mixed-integer-float', 'mixed'):
+        # Object column holding floats: inf is not valid JSON either
+        for i, value in enumerate(result):
+            if isinstance(value, float) and not np.isfinite(value):
+                result[i] = None
+    return result.tolist()
+
+
+class JSONRecords:
+    """
+    Sequence of JSON-ready records for a DataFrame. Columns are converted once;
+    slicing builds the record dicts for that range only.
+    """
+
+    def __init__(self, df):
+        self.columns = [str(col) for col in df.columns]
+        self.values = [column_to_json_values(df.iloc[:, i]) for i in range(df.shape[1])]
+        self.length = len(df)
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            raise TypeError("JSONRecords only supports slicing")
+        columns = self.columns
+        return [dict(zip(columns, row)) for row in zip(*(values[index] for values in self.values))]
+
+
+def dumps(obj):
+    """Encode `obj` as compact UTF-8 JSON bytes, with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
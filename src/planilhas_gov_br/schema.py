@@ -0,0 +1,268 @@
+"""
+Column schema of the autorizacoes_uniao table, the mapping from the
+consolidated spreadsheet columns to it, the in-memory dtype policy and stable
+row fingerprints.
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+# Data columns of autorizacoes_uniao (see migrations/), in table order.
+# Kinds: 'string' -> TEXT, 'int' -> INTEGER, 'float' -> DOUBLE PRECISION
+AUTORIZACOES_UNIAO_COLUMNS = [
+    ('orgao_entidade', 'string'),
+    ('vinculo_orgao_entidade', 'string'),
+    ('setor', 'string'),
+    ('cargos', 'string'),
+    ('escolaridade', 'string'),
+    ('vagas', 'int'),
+    ('ato_oficial', 'string'),
+    ('tipo_autorizacao', 'string'),
+    ('data_provimento', 'string'),
+    ('dou_link', 'string'),
+    ('dou_publicacao_ano', 'float'),
+    ('dou_concurso_portaria', 'string'),
+    ('dou_concurso_link', 'string'),
+    ('link_publicacao_dou', 'string'),
+    ('area_atuacao_governamental', 'string'),
+    ('observacoes', 'string'),
+]
+
+# Uniquely indexed column holding row_fingerprints() (migration 004)
+FINGERPRINT_COLUMN = 'row_fingerprint'
+
+# In-memory dtype of each column (see compact_frame): 'category' for the few
+# distinct órgãos, cargos and classifications repeated on every row, 'text' for
+# free text that is mostly unique (pyarrow-backed strings), and the smallest
+# nullable integer holding the numbers.
+COMPACT_DTYPES = {
+    'orgao_entidade': 'category',
+    'vinculo_orgao_entidade': 'category',
+    'setor': 'category',
+    'cargos': 'category',
+    'escolaridade': 'category',
+    'vagas': 'Int32',
+    'ato_oficial': 'text',
+    'tipo_autorizacao': 'category',
+    'data_provimento': 'text',
+    'dou_link': 'text',
+    'dou_publicacao_ano': 'Int16',
+    'dou_concurso_portaria': 'text',
+    'dou_concurso_link': 'text',
+    'link_publicacao_dou': 'text',
+    'area_atuacao_governamental': 'category',
+    'observacoes': 'text',
+}
+
+# Columns outside the schema become categorical when at most this fraction of
+# their values is distinct, and text otherwise
+CATEGORY_MAX_DISTINCT_RATIO = 0.5
+
+# Spreadsheet columns merged into one database column (first non-null value wins)
+MERGED_COLUMNS = {
+    'escolaridade': ['ESC_', 'Escolaridade'],
+    'dou_link': ['D_O_U', 'DOU'],
+    'dou_concurso_link': ['DOU_(Port__Do_Concurso)', 'DOU_1']
+}
+
+# Spreadsheet column -> database column
+COLUMN_NAMES = {
+    'Orgao_Entidade': 'orgao_entidade',
+    'Vinculo_Orgao_Entidade': 'vinculo_orgao_entidade',
+    'Setor': 'setor',
+    'Cargos': 'cargos',
+    'Vagas': 'vagas',
+    'Ato_Oficial': 'ato_oficial',
+    'ANO_DA_PUBLICAÇÃO': 'dou_publicacao_ano',
+    'Tipo_Autorizacao': 'tipo_autorizacao',
+    'PORT__DO_CONCURSO': 'dou_concurso_portaria',
+    'LINK_DA_PUBLICAÇÃO_NO_D_O_U_': 'link_publicacao_dou',
+    'ÁREA_DE_ATUAÇÃO_GOVERNAMENTAL': 'area_atuacao_governamental',
+    'OBS_': 'observacoes',
+    'Data_Provimento': 'data_provimento'
+}
+
+
+def normalize_column_names(df):
+    """
+    Map old column names to improved normalized names, handling duplicates by merging
+    """
+    # First, drop unnamed columns
+    unnamed_cols = [col for col in df.columns if 'Unnamed' in str(col) or col == 'Unnamed:_12']
+    if unnamed_cols:
+        df = df.drop(columns=unnamed_cols)
+
+    # Merge columns that map to the same target
+    for target_col, source_cols in MERGED_COLUMNS.items():
+        available_sources = [col for col in source_cols if col in df.columns]
+        if len(available_sources) > 1:
+            # Categorical sources have different categories; merge the values, then re-encode
+            categorical = any(isinstance(df[col].dtype, pd.CategoricalDtype) for col in available_sources)
+            # Merge: take first non-null value across the columns
+            merged = df[available_sources[0]].astype(object) if categorical else df[available_sources[0]]
+            for col in available_sources[1:]:
+                merged = merged.fillna(df[col].astype(object) if categorical else df[col])
+            df[target_col] = merged.astype('category') if categorical else merged
+            # Drop the original columns
+            df = df.drop(columns=available_sources)
+        elif len(available_sources) == 1:
+            # Just rename if only one exists
+            df = df.rename(columns={available_sources[0]: target_col})
+
+    # Now handle simple 1-to-1 mappings
+    df = df.rename(columns={k: v for k, v in COLUMN_NAMES.items() if k in df.columns})
+
+    return df
+
+
+def coerce_to_schema(df):
+    """
+    Return a frame with exactly the autorizacoes_uniao columns and types:
+    nullable Int64 for integers, float64 for floats and nullable strings for
+    text. Missing columns are added as nulls; extra columns are dropped.
+    """
+    coerced = {}
+    for col, kind in AUTORIZACOES_UNIAO_COLUMNS:
+        if col not in df.columns:
+            values = pd.Series(pd.NA, index=df.index, dtype='object')
+        else:
+            values = df[col]
+
+        if kind == 'int':
+            coerced[col] = pd.to_numeric(values, errors='coerce').astype('Int64')
+        elif kind == 'float':
+            numeric = pd.to_numeric(values, errors='coerce').astype('float64')
+            coerced[col] = numeric.where(~numeric.isin([float('inf'), float('-inf')]))
+        else:
+            coerced[col] = values.astype('string')
+
+    return pd.DataFrame(coerced, index=df.index)
+
+
+def text_dtype():
+    """pyarrow-backed string dtype, or object when pyarrow is not installed."""
+    try:
+        return pd.StringDtype('pyarrow')
+    except ImportError:  # pragma: no cover - depends on the environment
+        return object
+
+
+def database_column_name(col):
+    """autorizacoes_uniao column a spreadsheet (or database) column maps to, or None."""
+    if col in COMPACT_DTYPES:
+        return col
+    if col in COLUMN_NAMES:
+        return COLUMN_NAMES[col]
+    for target_col, source_cols in MERGED_COLUMNS.items():
+        if col in source_cols:
+            return target_col
+    return None
+
+
+def _compact_column(values, kind):
+    """Column cast to `kind`, or unchanged when the cast would alter its values."""
+    if kind == 'category':
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            return values
+        if ptypes.infer_dtype(values, skipna=True) in ('string', 'empty'):
+            return values.astype('category')
+        return values
+
+    if kind == 'text':
+        dtype = text_dtype()
+        if values.dtype == dtype or dtype is object:
+            return values
+        if ptypes.infer_dtype(values, skipna=True) in ('string', 'empty'):
+            return values.astype(dtype)
+        return values
+
+    # Nullable integer: only when every value is a whole number in range
+    if isinstance(values.dtype, pd.CategoricalDtype) or not (
+            ptypes.is_numeric_dtype(values.dtype)
+            or ptypes.infer_dtype(values, skipna=True) in ('integer', 'floating', 'mixed-integer-float', 'empty')):
+        return values
+    numeric = pd.to_numeric(values, errors='coerce')
+    if values.dtype == kind or (numeric.isna() != values.isna()).any():
+        return values
+    present = numeric.dropna()
+    bounds = np.iinfo(kind.lower())
+    if ((present % 1) != 0).any() or (present < bounds.min).any() or (present > bounds.max).any():
+        return values
+    return numeric.astype(kind)
+
+
+def compact_frame(df):
+    """
+    Cast the columns of a frame with spreadsheet or database column names to
+    the compact dtypes of COMPACT_DTYPES, in place. Columns outside the schema
+    holding text become categorical or text by their share of distinct values.
+    A column is only cast when its values survive the cast unchanged (e.g.
+    vagas written as "10 (dez)" stays as it is).
+
+    Returns:
+        DataFrame: df
+    """
+    for i, col in enumerate(df.columns):
+        values = df.iloc[:, i]
+        kind = COMPACT_DTYPES.get(database_column_name(col))
+        if kind is None:
+            if values.dtype != object:
+                continue
+            distinct = values.nunique()
+            kind = 'category' if distinct <= CATEGORY_MAX_DISTINCT_RATIO * len(values) else 'text'
+        compacted = _compact_column(values, kind)
+        if compacted is not values:
+            df.isetitem(i, compacted)
+    return df
+
+
+def align_categories(frames):
+    """
+    Give each categorical column the union of its categories in every frame,
+    so pd.concat keeps it categorical instead of falling back to object.
+    Columns that are not categorical in every frame holding them are left as
+    they are. Frames are updated in place.
+    """
+    categories = {}
+    mixed = set()
+    for df in frames:
+        for col, dtype in df.dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype):
+                categories.setdefault(col, []).append(dtype.categories)
+            else:
+                mixed.add(col)
+
+    for col, indexes in categories.items():
+        if col in mixed:
+            continue
+        dtype = pd.CategoricalDtype(indexes[0].append(indexes[1:]).unique())
+        for df in frames:
+            if col in df.columns and df[col].dtype != dtype:
+                df[col] = df[col].cat.set_categories(dtype.categories)
+    return frames
+
+
+def row_fingerprints(df):
+    """
+    Stable fingerprint of each row's business columns (AUTORIZACOES_UNIAO_COLUMNS).
+
+    Values are coerced to the table types and serialized with explicit null
+    markers before hashing, so the fingerprint does not depend on how the frame
+    was read (CSV, Parquet) or on its column order. Identical rows get an
+    occurrence number, keeping repeated rows distinct under a unique index.
+
+    Returns:
+        pd.Series: 32-character hex digests aligned with df.index
+    """
+    coerced = coerce_to_schema(df)
+    # Serialize each column; '\x00' marks nulls so they differ from empty strings
+    parts = [coerced[col].astype('string').fillna('\x00') for col, _ in AUTORIZACOES_UNIAO_COLUMNS]
+    keys = parts[0].str.cat(parts[1:], sep='\x1f')
+    occurrence = keys.groupby(keys, sort=False).cumcount().astype(str)
+    keys = keys.str.cat(occurrence, sep='\x1e')
+    return pd.Series(
+        [hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest() for key in keys],
+        index=df.index, name=FINGERPRINT_COLUMN, dtype=object)
@@ -0,0 +1,402 @@
+"""
+Local read-only query service for the dashboard.
+
+The data only changes when the ETL runs, so instead of sending every KPI, chart
+and explorer query to Supabase the dashboard can read from this service: the
+consolidated snapshot (data/processed) is loaded once into memory, prepared as
+for the upload (database names, canonical values, órgão/cargo IDs), sorted in
+explorer order and indexed by year, órgão and tipo de autorização.
+
+    planilhas-gov-br serve --port 8765
+
+Endpoints (JSON, shaped like the dashboard queries):
+
+    GET /kpis                    getKPIStats
+    GET /vagas-por-ano           getVagasPorAno
+    GET /top-orgaos?limit=10     getTopOrgaos
+    GET /distribuicao-tipo       getDistribuicaoTipo
+    GET /anos                    getAvailableYears
+    GET /autorizacoes?ano_de=&ano_ate=&orgao=&orgao_id=&tipo=&busca_orgao=&busca_cargo=&page=1&page_size=50
+    GET /health
+
+Encoded responses are kept in an LRU cache. The snapshot files are checked at
+most every `reload_interval` seconds; when they change the snapshot is reloaded
+and the cache cleared.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from planilhas_gov_br import canonical, columnar, entities, records, summary
+from planilhas_gov_br.schema import (
+    FINGERPRINT_COLUMN,
+    coerce_to_schema,
+    compact_frame,
+    normalize_column_names,
+    row_fingerprints,
+    text_dtype,
+)
+from planilhas_gov_br.upload import canonicalize_categories, clean_data
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+
+DEFAULT_CACHE_SIZE = 1024
+
+DEFAULT_PAGE_SIZE = 50
+
+MAX_PAGE_SIZE = 1000
+
+MAX_TOP_LIMIT = 100
+
+# Explorer filters accepted by Snapshot.query
+QUERY_PARAMS = ('ano_de', 'ano_ate', 'orgao', 'orgao_id', 'tipo', 'busca_orgao', 'busca_cargo', 'page', 'page_size')
+
+
+class QueryError(ValueError):
+    """Invalid query parameters (answered with HTTP 400)."""
+
+
+def snapshot_files(processed_dir):
+    """The consolidated file a snapshot is loaded from and the files it depends on."""
+    processed_dir = Path(processed_dir)
+    parquet_file = processed_dir / columnar.PARQUET_FILENAME
+    data_file = parquet_file if parquet_file.exists() and columnar.is_available() else \
+        processed_dir / 'consolidated_data.csv'
+    return [data_file, processed_dir / canonical.MEMO_FILENAME, processed_dir / entities.REGISTRY_FILENAME]
+
+
+def snapshot_version(processed_dir):
+    """(name, size, mtime) of the snapshot files; changes whenever the ETL writes a new snapshot."""
+    version = []
+    for path in snapshot_files(processed_dir):
+        try:
+            stat = path.stat()
+        except OSError:
+            version.append((path.name, None, None))
+        else:
+            version.append((path.name, stat.st_size, stat.st_mtime_ns))
+    return tuple(version)
+
+
+def load_frame(processed_dir, registry):
+    """
+    Read the consolidated data as upload.load_consolidated_data prepares it,
+    with the IDs of an entities.EntityRegistry, without writing back the memo
+    or the registry.
+
+    Returns:
+        DataFrame: Table columns, row_fingerprint, orgao_id and cargo_id
+    """
+    processed_dir = Path(processed_dir)
+    data_file = snapshot_files(processed_dir)[0]
+    if data_file.suffix == '.parquet':
+        df = columnar.read_parquet(data_file, arrow_strings=True)
+    else:
+        df = pd.read_csv(data_file, dtype=text_dtype())
+
+    df = normalize_column_names(df)
+    df = canonicalize_categories(df, canonical.CanonicalMemo.load(processed_dir / canonical.MEMO_FILENAME))
+    df = coerce_to_schema(clean_data(df))
+    df[FINGERPRINT_COLUMN] = row_fingerprints(df)
+    registry.assign_ids(df)
+    return compact_frame(df)
+
+
+def _positions(groups):
+    """Group key -> sorted row positions, from DataFrameGroupBy.indices."""
+    return {key: np.sort(np.asarray(rows)) for key, rows in groups.items()}
+
+
+class Snapshot:
+    """
+    One consolidated dataset in explorer order (dou_publicacao_ano descending,
+    nulls first as in Postgres, ties in file order), with sorted row positions
+    per year, órgão and tipo so filters are index intersections instead of scans.
+    """
+
+    def __init__(self, df, orgao_names=None, version=None):
+        years = pd.to_numeric(df['dou_publicacao_ano'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        order = np.lexsort((np.arange(len(df)), -np.nan_to_num(years, nan=np.inf)))
+        self.frame = df.iloc[order].reset_index(drop=True)
+        self.version = version
+        self.loaded_at = time.time()
+
+        years = pd.to_numeric(self.frame['dou_publicacao_ano'], errors='coerce').round()
+        self.by_year = _positions(self.frame.groupby(years, observed=True).indices)
+        self.by_orgao = _positions(self.frame.groupby('orgao_entidade', observed=True).indices)
+        self.by_orgao_id = _positions(self.frame.groupby('orgao_id', observed=True).indices)
+        self.by_tipo = _positions(self.frame.groupby('tipo_autorizacao', observed=True).indices)
+        self.years = sorted(int(year) for year in self.by_year)
+        self.summaries = summary.compute_summaries(self.frame, orgao_names=orgao_names)
+
+    @classmethod
+    def load(cls, processed_dir):
+        version = snapshot_version(processed_dir)
+        registry = entities.EntityRegistry.load(Path(processed_dir) / entities.REGISTRY_FILENAME)
+        df = load_frame(processed_dir, registry)
+        return cls(df, orgao_names=registry.names('orgaos'), version=version)
+
+    def kpis(self):
+        return self.summaries['dashboard_kpis'][0]
+
+    def vagas_por_ano(self):
+        return self.summaries['dashboard_vagas_por_ano']
+
+    def top_orgaos(self, limit=10):
+        if not 1 <= limit <= MAX_TOP_LIMIT:
+            raise QueryError(f"limit must be between 1 and {MAX_TOP_LIMIT}")
+        return self.summaries['dashboard_vagas_por_orgao'][:limit]
+
+    def distribuicao_tipo(self):
+        return self.summaries['dashboard_distribuicao_tipo']
+
+    def _search(self, col, text):
+        """Positions whose `col` contains `text`, case-insensitively (ILIKE '%text%')."""
+        values = self.frame[col]
+        needle = text.casefold()
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Match each distinct value once, then select rows by category code
+            matches = [code for code, value in enumerate(values.cat.categories) if needle in str(value).casefold()]
+            return np.flatnonzero(np.isin(values.cat.codes.to_numpy(), matches))
+        mask = values.astype('string').str.casefold().str.contains(needle, regex=False)
+        return np.flatnonzero(mask.fillna(False).to_numpy(dtype=bool))
+
+    def query(self, ano_de=None, ano_ate=None, orgao=None, orgao_id=None, tipo=None, busca_orgao=None,
+              busca_cargo=None, page=1, page_size=DEFAULT_PAGE_SIZE):
+        """
+        One explorer page of rows matching every given filter.
+
+        Returns:
+            dict: {'data': rows, 'count': matching rows, 'page', 'page_size'}
+        """
+        if page < 1 or not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise QueryError(f"page must be >= 1 and page_size between 1 and {MAX_PAGE_SIZE}")
+
+        selections = []
+        if ano_de is not None or ano_ate is not None:
+            low = -np.inf if ano_de is None else ano_de
+            high = np.inf if ano_ate is None else ano_ate
+            in_range = [rows for year, rows in self.by_year.items() if low <= year <= high]
+            selections.append(np.sort(np.concatenate(in_range)) if in_range else np.empty(0, dtype=np.intp))
+        if orgao is not None:
+            selections.append(self.by_orgao.get(orgao, np.empty(0, dtype=np.intp)))
+        if orgao_id is not None:
+            selections.append(self.by_orgao_id.get(orgao_id, np.empty(0, dtype=np.intp)))
+        if tipo is not None:
+            selections.append(self.by_tipo.get(tipo, np.empty(0, dtype=np.intp)))
+        if busca_orgao:
+            selections.append(self._search('orgao_entidade', busca_orgao))
+        if busca_cargo:
+            selections.append(self._search('cargos', busca_cargo))
+
+        if selections:
+            # Smallest selection first keeps the intersections cheap
+            selections.sort(key=len)
+            positions = selections[0]
+            for other in selections[1:]:
+                positions = np.intersect1d(positions, other, assume_unique=True)
+            count = len(positions)
+            start = (page - 1) * page_size
+            page_rows = self.frame.iloc[positions[start:start + page_size]]
+        else:
+            count = len(self.frame)
+            start = (page - 1) * page_size
+            page_rows = self.frame.iloc[start:start + page_size]
+
+        json_rows = records.JSONRecords(page_rows)
+        return {'data': json_rows[0:len(json_rows)], 'count': count, 'page': page, 'page_size': page_size}
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of encoded responses."""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _int_param(params, name, default=None):
+    value = params.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise QueryError(f"{name} must be an integer, got {value!r}")
+
+
+class QueryService:
+    """
+    Snapshot of a data/processed directory plus the response cache.
+    handle() answers a request path with (status, JSON bytes).
+    """
+
+    def __init__(self, processed_dir, cache_size=DEFAULT_CACHE_SIZE, reload_interval=5.0):
+        self.processed_dir = Path(processed_dir)
+        self.cache = ResponseCache(cache_size)
+        self.reload_interval = reload_interval
+        self.snapshot = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self._reloading = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        """Load the current snapshot and clear the cache."""
+        snapshot = Snapshot.load(self.processed_dir)
+        with self._lock:
+            self.snapshot = snapshot
+            self._checked = time.monotonic()
+            self.cache.clear()
+        logger.info(f"Loaded snapshot of {len(snapshot.frame)} rows from {self.processed_dir}")
+        return snapshot
+
+    def current(self):
+        """The snapshot, reloaded first when the ETL wrote a new one since the last check."""
+        now = time.monotonic()
+        # One thread checks and reloads; the others keep answering from the current snapshot
+        if now - self._checked >= self.reload_interval and self._reloading.acquire(blocking=False):
+            try:
+                self._checked = now
+                if snapshot_version(self.processed_dir) != self.snapshot.version:
+                    self.reload()
+            except Exception as e:
+                # Partially written files: keep serving the previous snapshot
+                logger.warning(f"Could not reload the snapshot: {e}")
+            finally:
+                self._reloading.release()
+        return self.snapshot
+
+    def _answer(self, snapshot, route, params):
+        if route == '/kpis':
+            return snapshot.kpis()
+        if route == '/vagas-por-ano':
+            return snapshot.vagas_por_ano()
+        if route == '/top-orgaos':
+            return snapshot.top_orgaos(_int_param(params, 'limit', 10))
+        if route == '/distribuicao-tipo':
+            return snapshot.distribuicao_tipo()
+        if route == '/anos':
+            return snapshot.years
+        if route == '/autorizacoes':
+            unknown = set(params) - set(QUERY_PARAMS)
+            if unknown:
+                raise QueryError(f"Unknown parameter(s): {', '.join(sorted(unknown))}")
+            return snapshot.query(
+                ano_de=_int_param(params, 'ano_de'), ano_ate=_int_param(params, 'ano_ate'),
+                orgao=params.get('orgao') or None, orgao_id=_int_param(params, 'orgao_id'),
+                tipo=params.get('tipo') or None, busca_orgao=params.get('busca_orgao'),
+                busca_cargo=params.get('busca_cargo'), page=_int_param(params, 'page', 1),
+                page_size=_int_param(params, 'page_size', DEFAULT_PAGE_SIZE))
+        return None
+
+    def handle(self, path):
+        """
+        Answer a GET request path.
+
+        Returns:
+            tuple: (HTTP status, JSON body bytes)
+        """
+        url = urlsplit(path)
+        route = url.path.rstrip('/') or '/'
+        snapshot = self.current()
+
+        if route == '/health':
+            return 200, records.dumps({
+                'rows': len(snapshot.frame), 'loaded_at': snapshot.loaded_at, 'cache_entries': len(self.cache),
+                'cache_hits': self.cache.hits, 'cache_misses': self.cache.misses})
+
+        params = dict(parse_qsl(url.query))
+        key = (route, tuple(sorted(params.items())))
+        body = self.cache.get(key)
+        if body is not None:
+            return 200, body
+
+        try:
+            result = self._answer(snapshot, route, params)
+        except QueryError as e:
+            return 400, records.dumps({'error': str(e)})
+        if result is None:
+            return 404, records.dumps({'error': f"Unknown endpoint {route}"})
+
+        body = records.dumps(result)
+        # Only cache answers computed from the snapshot still being served
+        if snapshot is self.snapshot:
+            self.cache.put(key, body)
+        return 200, body
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end of a QueryService (set as the `service` class attribute)."""
+
+    service = None
+
+    def do_GET(self):
+        status, body = self.service.handle(self.path)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        # The Next.js server components call the service from another origin in development
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+def make_server(processed_dir, host='127.0.0.1', port=DEFAULT_PORT, cache_size=DEFAULT_CACHE_SIZE,
+                reload_interval=5.0):
+    """ThreadingHTTPServer answering with a QueryService over `processed_dir`."""
+    service = QueryService(processed_dir, cache_size=cache_size, reload_interval=reload_interval)
+    handler = type('BoundQueryRequestHandler', (QueryRequestHandler,), {'service': service})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(processed_dir, host='127.0.0.1', port=DEFAULT_PORT, cache_size=DEFAULT_CACHE_SIZE, reload_interval=5.0):
+    """Serve the dashboard queries until interrupted."""
+    server = make_server(processed_dir, host, port, cache_size, reload_interval)
+    logger.info(f"Serving dashboard queries on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
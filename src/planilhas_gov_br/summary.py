@@ -0,0 +1,139 @@
+"""
+Pre-aggregated dashboard summaries computed by the ETL.
+
+The dashboard home page shows KPIs, vagas per year, top órgãos and the tipo de
+autorização distribution. Instead of aggregating over autorizacoes_uniao on
+every request, the pipeline accumulates these figures while consolidating and
+loads them into small summary tables (migration 005).
+"""
+
+import json
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+SUMMARY_FILENAME = 'dashboard_summaries.json'
+
+# Summary table -> primary key column (see migrations/005_create_dashboard_summary_tables.sql)
+SUMMARY_TABLES = {
+    'dashboard_kpis': 'id',
+    'dashboard_vagas_por_ano': 'ano',
+    'dashboard_vagas_por_orgao': 'orgao_entidade',
+    'dashboard_distribuicao_tipo': 'tipo_autorizacao',
+}
+
+
+def _group(df, key):
+    """Sum of vagas and row count per non-null value of `key`."""
+    if key not in df.columns:
+        return pd.DataFrame(columns=['total_vagas', 'total_registros'], dtype='int64')
+    vagas = pd.to_numeric(df['vagas'], errors='coerce') if 'vagas' in df.columns else pd.Series(0, index=df.index)
+    grouped = pd.DataFrame({'key': df[key], 'vagas': vagas.fillna(0)}).dropna(subset=['key'])
+    # observed=True: categorical keys would otherwise list unused categories with zero rows
+    return grouped.groupby('key', observed=True).agg(total_vagas=('vagas', 'sum'),
+                                                     total_registros=('vagas', 'size'))
+
+
+class SummaryAccumulator:
+    """
+    Accumulate dashboard aggregates over frames with database column names.
+    Frames can be added one at a time (e.g. one per workbook), so the full
+    dataset never has to be in memory.
+
+    Frames with an orgao_id column (see planilhas_gov_br.entities) are grouped
+    by órgão ID, so spelling variants of an órgão count together; `orgao_names`
+    maps the IDs to the names shown in the summaries.
+    """
+
+    def __init__(self, ano_atual=None, orgao_names=None):
+        self.ano_atual = ano_atual or date.today().year
+        self.orgao_names = orgao_names
+        self.total_registros = 0
+        self.total_vagas = 0
+        self.por_ano = None
+        self.por_orgao = None
+        self.por_tipo = None
+
+    @staticmethod
+    def _merge(current, partial):
+        if current is None:
+            return partial
+        return current.add(partial, fill_value=0)
+
+    def add(self, df):
+        """Add the rows of `df` to the aggregates."""
+        self.total_registros += len(df)
+        if 'vagas' in df.columns:
+            self.total_vagas += int(pd.to_numeric(df['vagas'], errors='coerce').sum())
+
+        if 'dou_publicacao_ano' in df.columns:
+            df = df.assign(dou_publicacao_ano=pd.to_numeric(df['dou_publicacao_ano'], errors='coerce').round())
+
+        self.por_ano = self._merge(self.por_ano, _group(df, 'dou_publicacao_ano'))
+        orgao_key = 'orgao_id' if 'orgao_id' in df.columns else 'orgao_entidade'
+        self.por_orgao = self._merge(self.por_orgao, _group(df, orgao_key))
+        self.por_tipo = self._merge(self.por_tipo, _group(df, 'tipo_autorizacao'))
+
+    def result(self):
+        """
+        Return the summaries as JSON-ready rows per summary table, shaped like
+        the dashboard queries (getKPIStats, getVagasPorAno, getTopOrgaos,
+        getDistribuicaoTipo).
+        """
+        empty = pd.DataFrame(columns=['total_vagas', 'total_registros'], dtype='int64')
+        por_ano = (self.por_ano if self.por_ano is not None else empty).astype('int64').sort_index()
+        por_orgao = (self.por_orgao if self.por_orgao is not None else empty).astype('int64')
+        por_tipo = (self.por_tipo if self.por_tipo is not None else empty).astype('int64')
+
+        if self.orgao_names is not None and len(por_orgao):
+            # Ties keep the name order of the text grouping
+            por_orgao = por_orgao.rename(index=self.orgao_names).sort_index()
+        por_orgao = por_orgao.sort_values(['total_vagas', 'total_registros'], ascending=False, kind='stable')
+
+        return {
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'dashboard_kpis': [{
+                'id': 1,
+                'total_vagas': int(self.total_vagas),
+                'vagas_ano_atual': int(por_ano['total_vagas'].get(self.ano_atual, 0)),
+                'ano_atual': int(self.ano_atual),
+                'total_orgaos': int(len(por_orgao)),
+                'total_registros': int(self.total_registros),
+            }],
+            'dashboard_vagas_por_ano': [
+                {'ano': int(ano), 'total_vagas': int(row.total_vagas), 'total_registros': int(row.total_registros)}
+                for ano, row in por_ano.iterrows()
+            ],
+            'dashboard_vagas_por_orgao': [
+                {'orgao_entidade': orgao, 'rank': rank, 'total_vagas': int(row.total_vagas),
+                 'total_autorizacoes': int(row.total_registros)}
+                for rank, (orgao, row) in enumerate(por_orgao.iterrows(), 1)
+            ],
+            'dashboard_distribuicao_tipo': [
+                {'tipo_autorizacao': tipo, 'quantidade': int(row.total_registros), 'total_vagas': int(row.total_vagas)}
+                for tipo, row in por_tipo.sort_values('total_registros', ascending=False, kind='stable').iterrows()
+            ],
+        }
+
+
+def compute_summaries(df, ano_atual=None, orgao_names=None):
+    """Compute the dashboard summaries of a whole frame at once."""
+    accumulator = SummaryAccumulator(ano_atual, orgao_names)
+    accumulator.add(df)
+    return accumulator.result()
+
+
+def save_summaries(summaries, path):
+    """Write summaries as JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summaries, f, indent=2, ensure_ascii=False)
+
+
+def load_summaries(path):
+    """Read summaries written by save_summaries, or None if the file is missing."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
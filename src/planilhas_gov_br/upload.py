@@ -0,0 +1,342 @@
+"""
+Loading the consolidated data into Supabase.
+
+Reads the Parquet (or CSV) written by processing, maps it to the
+autorizacoes_uniao schema with row fingerprints and órgão/cargo IDs, and loads
+it through the REST API in concurrent batches or with COPY over the direct
+Postgres connection, after the orgaos and cargos dimension tables and followed
+by the dashboard summary tables. REST uploads journal their committed batches
+so an interrupted load can be resumed.
+"""
+
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from planilhas_gov_br import canonical, columnar, entities, instrumentation, pgload, records, summary
+from planilhas_gov_br.journal import UploadJournal, journal_path, range_digest, snapshot_key
+from planilhas_gov_br.schema import (
+    FINGERPRINT_COLUMN,
+    compact_frame,
+    normalize_column_names,
+    row_fingerprints,
+    text_dtype,
+)
+from planilhas_gov_br.uploader import BatchUploader, postgrest_upsert, upload_dimensions, upload_summaries
+
+logger = logging.getLogger(__name__)
+
+# Run report written next to the processed data (see instrumentation.REPORT_FILENAME)
+UPLOAD_REPORT_FILENAME = 'upload_run_report.json'
+
+
+def canonicalize_categories(df, memo):
+    """
+    Map tipo_autorizacao and escolaridade to their canonical values using the
+    raw -> canonical memo shared with process_spreadsheets.py
+    """
+    for col in ['tipo_autorizacao', 'escolaridade']:
+        if col not in df.columns:
+            continue
+        # Resolve each distinct string once, then map back
+        mapping = {value: memo.canonicalize(col, value)
+                   for value in df[col].dropna().unique() if isinstance(value, str)}
+        mapped = df[col].map(mapping)
+        df[col] = mapped.where(mapped.notna(), df[col])
+
+    return df
+
+
+def clean_data(df):
+    """
+    Clean and convert data types to match database schema
+    """
+    # Convert vagas to Int64 (nullable integer type)
+    if 'vagas' in df.columns:
+        df['vagas'] = pd.to_numeric(df['vagas'], errors='coerce')
+        df['vagas'] = df['vagas'].astype('Int64')  # Use nullable Int64 type
+
+    # Convert dou_publicacao_ano to float, handling NaN and inf
+    if 'dou_publicacao_ano' in df.columns:
+        df['dou_publicacao_ano'] = pd.to_numeric(df['dou_publicacao_ano'], errors='coerce')
+        # Replace inf and -inf with NaN (sent as NULL)
+        df['dou_publicacao_ano'] = df['dou_publicacao_ano'].where(np.isfinite(df['dou_publicacao_ano']))
+
+    # Remaining NaN/NA/inf values become None column-wise when the batches are
+    # built (see planilhas_gov_br.records.JSONRecords)
+
+    return df
+
+
+def load_consolidated_data(processed_dir):
+    """
+    Read the consolidated data and prepare it for loading: database column
+    names, canonical categorical values and database types, held with the
+    compact dtypes of schema.COMPACT_DTYPES
+    """
+    recorder = instrumentation.recorder
+
+    # Read the consolidated data
+    logger.info("Reading consolidated data...")
+    parquet_file = processed_dir / columnar.PARQUET_FILENAME
+    with recorder.span('read') as span:
+        if parquet_file.exists() and columnar.is_available():
+            # Typed intermediate: no CSV parse or type inference needed
+            data_file = parquet_file
+            df = columnar.read_parquet(data_file, arrow_strings=True)
+        else:
+            data_file = processed_dir / 'consolidated_data.csv'
+            # Text as pyarrow strings rather than Python objects; clean_data types the numbers
+            df = pd.read_csv(data_file, dtype=text_dtype())
+        span.labels['file'] = data_file.name
+        span.rows_out = len(df)
+    logger.info(f"Loaded {len(df)} records from {data_file}")
+
+    with recorder.span('normalize', rows_in=len(df)) as span:
+        # Normalize column names
+        logger.info("Normalizing column names...")
+        df = normalize_column_names(df)
+        logger.info(f"Normalized columns: {list(df.columns)}")
+
+        # Canonicalize categorical values with the persisted memo
+        memo_path = processed_dir / canonical.MEMO_FILENAME
+        memo = canonical.CanonicalMemo.load(memo_path)
+        df = canonicalize_categories(df, memo)
+        memo.save(memo_path)
+
+        # Clean and convert data types
+        logger.info("Cleaning and converting data types...")
+        df = clean_data(df)
+
+        # Stable per-row fingerprint used for idempotent upserts and delta sync
+        df[FINGERPRINT_COLUMN] = row_fingerprints(df)
+
+        # Categories, pyarrow strings and small integers for the rest of the run
+        df = compact_frame(df)
+        span.rows_out = len(df)
+    recorder.check_memory_budget("reading the consolidated data")
+
+    # Órgão and cargo IDs from the registry built during processing
+    with recorder.span('resolve_entities', rows_in=len(df)):
+        entities_path = processed_dir / entities.REGISTRY_FILENAME
+        entities.load_registry(entities_path)
+        entities.registry.assign_ids(df)
+        entities.registry.save(entities_path)
+
+    return df
+
+
+def save_run_report(processed_dir, metrics_file=None, **extra):
+    """Write the upload run report (and optionally a Prometheus textfile)"""
+    report = instrumentation.recorder.report('upload', **extra)
+    if report['memory_budget_bytes'] is not None and report['peak_rss_bytes'] is not None:
+        logger.info(f"Peak RSS {instrumentation.format_size(report['peak_rss_bytes'])} "
+                    f"(memory budget {instrumentation.format_size(report['memory_budget_bytes'])})")
+    report_path = processed_dir / UPLOAD_REPORT_FILENAME
+    instrumentation.save_report(report, report_path)
+    logger.info(f"Run report saved: {report_path}")
+    if metrics_file:
+        instrumentation.write_prometheus_textfile(report, metrics_file)
+        logger.info(f"Metrics saved: {metrics_file}")
+
+
+def bulk_load_government_data(project_root, mode='replace', metrics_file=None, memory_budget=None):
+    """
+    Load consolidated government data with COPY over the direct Postgres
+    connection (POSTGRES_URL_NON_POOLING), staging the rows and swapping or
+    appending them in one transaction
+
+    Args:
+        project_root (Path): Project root holding data/processed
+        mode (str): 'replace' the table contents or 'append' to them
+        metrics_file (str): Optional Prometheus textfile with the run's stage metrics
+        memory_budget (int): Peak RSS budget in bytes; the run fails with
+                             instrumentation.MemoryBudgetExceeded once the peak goes over it
+    """
+    instrumentation.recorder.reset(memory_budget=memory_budget)
+    conn_string = os.environ.get("POSTGRES_URL_NON_POOLING")
+
+    if not conn_string:
+        logger.error("Missing POSTGRES_URL_NON_POOLING in environment variables")
+        return
+
+    processed_dir = Path(project_root) / 'data' / 'processed'
+    df = load_consolidated_data(processed_dir)
+
+    # Dimension rows first: the fact rows reference them
+    with instrumentation.recorder.span('upload_dimensions', method='copy'):
+        pgload.upsert_table_rows(conn_string, entities.registry.dimension_rows())
+
+    logger.info(f"Bulk loading {len(df)} records with COPY ({mode})...")
+    with instrumentation.recorder.span('upload', method='copy', rows_in=len(df)) as span:
+        loaded = pgload.copy_load(df, conn_string, table='autorizacoes_uniao', mode=mode)
+        span.rows_out = loaded
+    logger.info(f"Successfully loaded: {loaded} records")
+
+    # Refresh the pre-aggregated dashboard tables
+    summaries = summary.load_summaries(processed_dir / summary.SUMMARY_FILENAME)
+    if summaries is not None:
+        with instrumentation.recorder.span('upload_summaries', method='copy'):
+            pgload.replace_table_rows(conn_string, {table: summaries.get(table, []) for table in summary.SUMMARY_TABLES})
+
+    save_run_report(processed_dir, metrics_file, method='copy', mode=mode)
+
+
+def fetch_remote_fingerprints(supabase, page_size=1000):
+    """
+    Fetch (id, row_fingerprint) of every row in autorizacoes_uniao, paging
+    through PostgREST's row limit
+
+    Returns:
+        tuple: (dict of row_fingerprint -> id, list of ids of rows without a fingerprint)
+    """
+    fingerprints = {}
+    unfingerprinted = []
+    start = 0
+    while True:
+        response = (supabase.table('autorizacoes_uniao')
+                    .select(f'id,{FINGERPRINT_COLUMN}')
+                    .order('id')
+                    .range(start, start + page_size - 1)
+                    .execute())
+        rows = response.data
+        for row in rows:
+            if row[FINGERPRINT_COLUMN] is None:
+                unfingerprinted.append(row['id'])
+            else:
+                fingerprints[row[FINGERPRINT_COLUMN]] = row['id']
+        if len(rows) < page_size:
+            return fingerprints, unfingerprinted
+        start += page_size
+
+
+def delete_remote_rows(supabase, ids, chunk_size=500):
+    """Delete rows of autorizacoes_uniao by id, in chunks"""
+    for i in range(0, len(ids), chunk_size):
+        supabase.table('autorizacoes_uniao').delete().in_('id', ids[i:i + chunk_size]).execute()
+
+
+def upload_government_data_to_supabase(project_root, workers=4, batch_size=1000, sync=False, metrics_file=None,
+                                        memory_budget=None, resume=False):
+    """
+    Upload consolidated government data to Supabase with normalized column names
+
+    Rows are upserted on row_fingerprint, so re-runs do not duplicate rows.
+    Every committed batch is recorded in data/processed/upload_journal (see
+    journal.py), so an interrupted upload can continue with `resume`.
+
+    Args:
+        project_root (Path): Project root holding data/processed
+        workers (int): Batches kept in flight at once
+        batch_size (int): Initial batch size (adapted to the observed latency)
+        sync (bool): Only send rows missing remotely and delete remote rows
+                     that are no longer in the consolidated data
+        metrics_file (str): Optional Prometheus textfile with the run's stage metrics
+        memory_budget (int): Peak RSS budget in bytes; the run fails with
+                             instrumentation.MemoryBudgetExceeded once the peak goes over it
+        resume (bool): Skip the batches the journal of a previous run of the same
+                       rows recorded as committed
+    """
+    recorder = instrumentation.recorder
+    recorder.reset(memory_budget=memory_budget)
+
+    # Initialize Supabase client
+    url = os.environ.get("SUPABASE_URL")
+    key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+
+    if not url or not key:
+        logger.error("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY in environment variables")
+        return
+
+    from supabase import create_client
+
+    supabase = create_client(url, key)
+
+    processed_dir = Path(project_root) / 'data' / 'processed'
+    df = load_consolidated_data(processed_dir)
+
+    stale_ids = []
+    if sync:
+        logger.info("Fetching remote fingerprints...")
+        with recorder.span('sync_diff', rows_in=len(df)) as span:
+            remote, unfingerprinted = fetch_remote_fingerprints(supabase)
+            local = set(df[FINGERPRINT_COLUMN])
+            stale_ids = [row_id for fp, row_id in remote.items() if fp not in local] + unfingerprinted
+            df = df[~df[FINGERPRINT_COLUMN].isin(remote.keys())].reset_index(drop=True)
+            span.rows_out = len(df)
+        logger.info(f"Delta: {len(df)} rows to insert, {len(stale_ids)} rows to delete")
+
+    fingerprints = df[FINGERPRINT_COLUMN].tolist()
+
+    def on_batch(start, stop, elapsed):
+        progress = upload_journal.commit(start, stop, range_digest(fingerprints[start:stop]))
+        logger.info(f"✓ Uploaded rows {start} to {stop} in {elapsed:.2f}s — {progress}")
+
+    # Upload data in concurrent batches with retries; rejected rows are isolated
+    uploader = BatchUploader(
+        postgrest_upsert(supabase, 'autorizacoes_uniao'),
+        max_workers=workers,
+        batch_size=batch_size,
+        on_batch=on_batch,
+    )
+
+    # The journal is keyed by the rows sent, in order: a sync delta taken after
+    # an interrupted sync run no longer holds the rows that landed, so it starts afresh
+    upload_journal = UploadJournal.open(
+        journal_path(processed_dir, 'autorizacoes_uniao'),
+        snapshot_key('autorizacoes_uniao', fingerprints),
+        total=len(fingerprints),
+        resume=resume,
+        digest=lambda start, stop: range_digest(fingerprints[start:stop]),
+    )
+
+    try:
+        # Dimension rows first: the fact rows reference them
+        with recorder.span('upload_dimensions', method='rest'):
+            upload_dimensions(supabase, entities.registry.dimension_rows())
+
+        with recorder.span('upload', method='rest', rows_in=len(df)) as span:
+            result = uploader.upload(records.JSONRecords(df), ranges=upload_journal.pending_ranges())
+            span.rows_out = result.uploaded
+
+        # Delete stale rows only once every new one landed: a partly failed sync
+        # would otherwise lose remote rows that were not replaced
+        pending_rows = sum(stop - start for start, stop in upload_journal.pending_ranges())
+        if stale_ids and (result.failed > 0 or pending_rows > 0):
+            logger.warning(f"Skipped deleting {len(stale_ids)} stale records: {pending_rows} row(s) "
+                           f"were not uploaded; rerun the sync once they are")
+        elif stale_ids:
+            with recorder.span('delete_stale', rows_in=len(stale_ids)):
+                delete_remote_rows(supabase, stale_ids)
+            logger.info(f"Deleted {len(stale_ids)} stale records")
+
+        # Refresh the pre-aggregated dashboard tables
+        summaries = summary.load_summaries(processed_dir / summary.SUMMARY_FILENAME)
+        if summaries is not None:
+            with recorder.span('upload_summaries', method='rest'):
+                upload_summaries(supabase, summaries)
+
+        logger.info(f"\n{'='*60}")
+        logger.info(f"Upload Complete!")
+        logger.info(f"Successfully uploaded: {result.uploaded} records in {result.elapsed:.1f}s "
+                    f"({result.batches} batches, {result.retries} retries)")
+        if result.failed > 0:
+            failed_rows_path = processed_dir / 'upload_failed_rows.csv'
+            failed = df.iloc[[row for row, _ in result.failed_rows]].copy()
+            failed['error'] = [error for _, error in result.failed_rows]
+            failed.to_csv(failed_rows_path, index_label='row')
+            logger.warning(f"Failed to upload: {result.failed} records (saved to {failed_rows_path})")
+        logger.info(f"{'='*60}\n")
+
+        save_run_report(processed_dir, metrics_file, method='rest', sync=sync, workers=workers,
+                        batches=result.batches, retries=result.retries, failed_rows=result.failed)
+
+    except Exception as e:
+        logger.error(f"Fatal error during upload: {str(e)}")
+        logger.error(f"{upload_journal.committed_rows} row(s) committed; rerun with --resume to continue")
+        raise
+    finally:
+        upload_journal.close()
@@ -0,0 +1,360 @@
+"""
+Concurrent batch uploader with retry, backoff and adaptive batch size.
+
+The uploader keeps several batches in flight on a thread pool, retries
+transient failures with jittered exponential backoff, splits a batch rejected
+for its data in half until the bad rows are isolated, aborts on errors about
+the request itself (credentials, missing table or column), and tunes the batch size to the latency
+it observes. It is transport-agnostic: `insert` is any callable that sends a
+list of records and raises on failure, e.g.
+
+    BatchUploader(lambda batch: supabase.table('autorizacoes_uniao').insert(batch).execute())
+
+postgrest_upsert builds such a callable that upserts on row_fingerprint.
+"""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from planilhas_gov_br import records, summary
+from planilhas_gov_br.schema import FINGERPRINT_COLUMN
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying
+TRANSIENT_HTTP_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+# Postgres / PostgREST error codes worth retrying
+TRANSIENT_ERROR_CODES = {
+    '40001',  # serialization_failure
+    '40P01',  # deadlock_detected
+    '53300',  # too_many_connections
+    '57014',  # query_canceled (statement timeout)
+    '57P01',  # admin_shutdown
+    'PGRST000', 'PGRST001', 'PGRST002', 'PGRST003',  # PostgREST connection/pool errors
+}
+
+# Postgres error classes caused by the rows of a batch: splitting it isolates them
+ROW_ERROR_CLASSES = (
+    '22',  # data_exception (bad value, out of range, invalid text representation)
+    '23',  # integrity_constraint_violation (not null, foreign key, check, unique)
+)
+
+
+class UploadAborted(RuntimeError):
+    """
+    The server rejected a batch for a reason no retry or split can fix (bad
+    credentials, missing table or column): the upload stops at the first one.
+    `result` holds what was uploaded before.
+    """
+
+    def __init__(self, error, result=None):
+        super().__init__(f"Upload aborted: {error}")
+        self.error = error
+        self.result = result
+
+
+class PostgrestError(Exception):
+    """
+    An error response of PostgREST. `code` is the Postgres (e.g. 23505) or
+    PostgREST (PGRSTxxx) code of its JSON body, None when it has none.
+    """
+
+    def __init__(self, status_code, code=None, message=None, details=None):
+        super().__init__(f"HTTP {status_code}" + (f" {code}" if code else '') + (f": {message}" if message else ''))
+        self.status_code = status_code
+        self.code = code
+        self.message = message
+        self.details = details
+
+    @classmethod
+    def from_response(cls, response):
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        if not isinstance(body, dict):
+            return cls(response.status_code, message=response.text[:200] or None)
+        return cls(response.status_code, body.get('code'), body.get('message'), body.get('details'))
+
+
+def _status_code(exc):
+    status = getattr(exc, 'status_code', None)
+    if status is None:
+        response = getattr(exc, 'response', None)
+        status = getattr(response, 'status_code', None)
+    try:
+        return int(status)
+    except (TypeError, ValueError):
+        return None
+
+
+def _error_code(exc):
+    """Postgres/PostgREST code of an error, from its `code` or the JSON body of its response."""
+    code = getattr(exc, 'code', None)
+    if code is None:
+        try:
+            body = exc.response.json()
+        except (AttributeError, ValueError):
+            return ''
+        code = body.get('code') if isinstance(body, dict) else None
+    return str(code or '')
+
+
+def is_transient_error(exc):
+    """
+    Return True for errors that may succeed on retry: network failures,
+    timeouts, throttling, 5xx responses and transient Postgres errors.
+    """
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    # httpx network/timeout errors, without importing httpx
+    for cls in type(exc).__mro__:
+        if cls.__module__.startswith('httpx') and cls.__name__ in ('TransportError', 'TimeoutException'):
+            return True
+    if _status_code(exc) in TRANSIENT_HTTP_STATUSES:
+        return True
+    return _error_code(exc) in TRANSIENT_ERROR_CODES
+
+
+def is_row_error(exc):
+    """
+    Return True for errors caused by the rows sent (Postgres classes 22 and
+    23), as opposed to the request itself: 401/403, 404, PGRST1xx/2xx and
+    42xxx (undefined table or column) fail the same way for every batch.
+    """
+    code = _error_code(exc)
+    return len(code) == 5 and code[:2] in ROW_ERROR_CLASSES
+
+
+class UploadResult:
+    """Outcome of an upload: rows inserted and rows that could not be inserted."""
+
+    def __init__(self):
+        self.uploaded = 0
+        self.failed_rows = []  # (row index, error message)
+        self.batches = 0
+        self.retries = 0
+        self.elapsed = 0.0
+
+    @property
+    def failed(self):
+        return len(self.failed_rows)
+
+    def __repr__(self):
+        return (f"UploadResult(uploaded={self.uploaded}, failed={self.failed}, "
+                f"batches={self.batches}, retries={self.retries}, elapsed={self.elapsed:.2f}s)")
+
+
+class BatchUploader:
+    """
+    Upload records in concurrent batches.
+
+    Args:
+        insert: Callable taking a list of records; raises on failure
+        max_workers (int): Batches kept in flight at once
+        batch_size (int): Initial batch size
+        min_batch_size (int): Lower bound for the adaptive batch size
+        max_batch_size (int): Upper bound for the adaptive batch size
+        target_latency (float): Seconds per request the batch size is tuned towards
+        max_retries (int): Retries of a transient failure before giving up on a batch
+        backoff_base (float): Base delay in seconds for exponential backoff
+        backoff_cap (float): Maximum backoff delay in seconds
+        is_transient: Predicate deciding whether an exception is retried
+        is_row_error: Predicate deciding whether a rejected batch is split to isolate
+                      its bad rows; other errors abort the upload with UploadAborted
+        on_batch: Optional callback(start, stop, elapsed) for each committed batch
+    """
+
+    def __init__(self, insert, max_workers=4, batch_size=1000, min_batch_size=50,
+                 max_batch_size=5000, target_latency=2.0, max_retries=5,
+                 backoff_base=0.5, backoff_cap=30.0, is_transient=is_transient_error,
+                 is_row_error=is_row_error, on_batch=None):
+        self.insert = insert
+        self.max_workers = max(1, max_workers)
+        self.batch_size = batch_size
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.is_transient = is_transient
+        self.is_row_error = is_row_error
+        self.on_batch = on_batch
+        self._lock = threading.Lock()
+
+    def upload(self, records, start=0, ranges=None):
+        """
+        Upload `records` (any sequence supporting len() and slicing) beginning
+        at index `start`, or only the (start, stop) `ranges` given, e.g. the
+        ones an UploadJournal has not committed yet.
+
+        Returns:
+            UploadResult
+
+        Raises:
+            UploadAborted: on an error that is neither transient nor caused by the rows
+        """
+        result = UploadResult()
+        started = time.perf_counter()
+        if ranges is None:
+            ranges = [(start, len(records))]
+        # Stack of the rows still to submit, first range on top
+        pending = [(range_start, range_stop) for range_start, range_stop in reversed(ranges)
+                   if range_start < range_stop]
+        in_flight = set()
+        aborted = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or in_flight:
+                # Keep the pool saturated with batches sized by the current estimate
+                while pending and len(in_flight) < self.max_workers:
+                    position, range_stop = pending.pop()
+                    stop = min(position + self.batch_size, range_stop)
+                    if stop < range_stop:
+                        pending.append((stop, range_stop))
+                    in_flight.add(executor.submit(self._upload_range, records, position, stop, result))
+
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        future.result()
+                    except UploadAborted as exc:
+                        # Submit nothing more; let the batches in flight finish
+                        aborted = aborted or exc
+                        pending.clear()
+
+        result.elapsed = time.perf_counter() - started
+        if aborted is not None:
+            aborted.result = result
+            raise aborted
+        return result
+
+    def _upload_range(self, records, start, stop, result):
+        batch = list(records[start:stop])
+        error = self._send(batch, start, stop, result)
+        if error is None:
+            return
+
+        if not self.is_transient(error) and not self.is_row_error(error):
+            # Not about these rows: every other batch would fail the same way
+            logger.error(f"✗ Rows {start} to {stop} failed: {error}; aborting the upload")
+            raise UploadAborted(error)
+
+        if stop - start == 1 or self.is_transient(error):
+            # A single bad row, or retries exhausted: give up on these rows
+            logger.error(f"✗ Rows {start} to {stop} failed: {error}")
+            with self._lock:
+                result.failed_rows.extend((row, str(error)) for row in range(start, stop))
+            return
+
+        # Split the batch to isolate the rows the server rejects
+        middle = (start + stop) // 2
+        logger.warning(f"Batch {start} to {stop} rejected ({error}); splitting")
+        self._upload_range(records, start, middle, result)
+        self._upload_range(records, middle, stop, result)
+
+    def _send(self, batch, start, stop, result):
+        """Insert one batch with retries. Returns None on success or the last error."""
+        for attempt in range(self.max_retries + 1):
+            sent = time.perf_counter()
+            try:
+                self.insert(batch)
+            except Exception as exc:
+                if not self.is_transient(exc) or attempt == self.max_retries:
+                    return exc
+                delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+                logger.warning(f"Transient error ({exc}); retrying in {delay:.1f}s")
+                with self._lock:
+                    result.retries += 1
+                    self._shrink()
+                time.sleep(delay)
+                continue
+
+            elapsed = time.perf_counter() - sent
+            with self._lock:
+                result.uploaded += len(batch)
+                result.batches += 1
+                self._adapt(len(batch), elapsed)
+            if self.on_batch is not None:
+                self.on_batch(start, stop, elapsed)
+            return None
+
+    def _adapt(self, size, elapsed):
+        """Grow the batch size while requests are fast, shrink it when slow."""
+        if size < self.batch_size:
+            # Tail or split batch: says little about the current size
+            return
+        if elapsed < self.target_latency / 2:
+            self.batch_size = min(self.max_batch_size, int(self.batch_size * 1.5))
+        elif elapsed > self.target_latency:
+            self._shrink()
+
+    def _shrink(self):
+        self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+
+
+def postgrest_upsert(supabase, table):
+    """
+    Return a callable that upserts a batch into `table` on row_fingerprint.
+
+    The body is encoded once with records.dumps (orjson when installed) and
+    posted on the PostgREST session with return=minimal; falls back to the
+    query builder if the client does not expose its session. Error responses
+    raise PostgrestError, whose code tells rows rejected for their data apart
+    from a bad request.
+    """
+    session = getattr(supabase.postgrest, 'session', None)
+
+    if session is None:
+        return lambda batch: (supabase.table(table)
+                              .upsert(batch, on_conflict=FINGERPRINT_COLUMN, ignore_duplicates=True)
+                              .execute())
+
+    def upsert(batch):
+        response = session.post(
+            f"/{table}",
+            content=records.dumps(batch),
+            params={'on_conflict': FINGERPRINT_COLUMN},
+            headers={
+                'Content-Type': 'application/json',
+                'Prefer': 'resolution=ignore-duplicates,return=minimal',
+            },
+        )
+        if response.is_error:
+            raise PostgrestError.from_response(response)
+
+    return upsert
+
+
+def upload_summaries(supabase, summaries):
+    """
+    Replace the dashboard summary tables (migration 005) with the aggregates
+    computed during consolidation: upsert the new rows, then delete stale keys.
+    """
+    for table, key in summary.SUMMARY_TABLES.items():
+        rows = summaries.get(table, [])
+        if rows:
+            supabase.table(table).upsert(rows, on_conflict=key).execute()
+
+        new_keys = {row[key] for row in rows}
+        existing = supabase.table(table).select(key).execute().data
+        for row in existing:
+            if row[key] not in new_keys:
+                supabase.table(table).delete().eq(key, row[key]).execute()
+        logger.info(f"✓ Updated {table} ({len(rows)} rows)")
+
+
+def upload_dimensions(supabase, dimensions, chunk_size=1000):
+    """
+    Upsert the orgaos and cargos dimension tables (migration 007) by id. Run
+    before the fact rows, which reference them.
+    """
+    for table, rows in dimensions.items():
+        for start in range(0, len(rows), chunk_size):
+            supabase.table(table).upsert(rows[start:start + chunk_size], on_conflict='id').execute()
+        logger.info(f"✓ Updated {table} ({len(rows)} rows)")
@@ -0,0 +1,65 @@
+"""
+`planilhas-gov-br --help` and `status` stay fast: pandas and the Supabase
+client are only imported by the subcommands that use them. The budget is
+generous; benchmarks/bench_cli_startup.py reports the actual times.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+
+# Seconds a command may take over a bare interpreter (best of REPEAT runs)
+STARTUP_BUDGET = 1.0
+
+REPEAT = 3
+
+
+def run(args, **kwargs):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(SRC_DIR), os.environ.get('PYTHONPATH')])))
+    return subprocess.run([sys.executable] + args, env=env, capture_output=True, text=True, check=True, **kwargs)
+
+
+def best_time(args):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        run(args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def imported_modules(args):
+    """Top-level names of the modules imported by a command, from -X importtime."""
+    stderr = run(['-X', 'importtime'] + args).stderr
+    return {line.rsplit('|', 1)[1].strip().split('.')[0] for line in stderr.splitlines()
+            if line.startswith('import time:') and '|' in line}
+
+
+@pytest.fixture
+def commands(tmp_path):
+    return {
+        '--help': ['-m', 'planilhas_gov_br', '--help'],
+        'status': ['-m', 'planilhas_gov_br', '--root', str(tmp_path), 'status'],
+    }
+
+
+@pytest.mark.parametrize('command', ['--help', 'status'])
+def test_does_not_import_pandas(commands, command):
+    modules = imported_modules(commands[command])
+    assert 'planilhas_gov_br' in modules
+    assert not modules & {'pandas', 'numpy', 'supabase'}
+
+
+@pytest.mark.parametrize('command', ['--help', 'status'])
+def test_startup_within_budget(commands, command):
+    interpreter = best_time(['-c', 'pass'])
+    seconds = best_time(commands[command])
+    assert seconds - interpreter < STARTUP_BUDGET, (
+        f"{command} took {seconds:.3f}s, {seconds - interpreter:.3f}s over the interpreter")
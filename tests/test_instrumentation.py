@@ -0,0 +1,48 @@
+"""
+Prometheus text rendering of run reports: label values are escaped once,
+as the exposition format expects.
+"""
+
+import pytest
+
+from planilhas_gov_br.instrumentation import RunRecorder, prometheus_text
+
+
+def unescape_label(text):
+    """Label value of the exposition format, unescaped."""
+    out, i = [], 0
+    while i < len(text):
+        if text[i] == '\\':
+            out.append({'\\': '\\', '"': '"', 'n': '\n'}[text[i + 1]])
+            i += 2
+        else:
+            out.append(text[i])
+            i += 1
+    return ''.join(out)
+
+
+def label_values(text, label):
+    """Values of `label` in the samples of a Prometheus text."""
+    values = set()
+    for line in text.splitlines():
+        if line.startswith('#') or f'{label}="' not in line:
+            continue
+        start = line.index(f'{label}="') + len(label) + 2
+        end = start
+        while line[end] != '"':
+            end += 2 if line[end] == '\\' else 1
+        values.add(unescape_label(line[start:end]))
+    return values
+
+
+@pytest.mark.parametrize('pipeline', ['process', 'back\\slash', 'say "hi"', 'two\nlines'])
+def test_labels_are_escaped_once(pipeline):
+    recorder = RunRecorder()
+    with recorder.span('read', file='a "b".xlsx'):
+        pass
+    with recorder.span('stage\\x'):
+        pass
+    text = prometheus_text(recorder.report(pipeline))
+
+    assert label_values(text, 'pipeline') == {pipeline}
+    assert label_values(text, 'stage') == {'read', 'stage\\x'}
@@ -0,0 +1,65 @@
+"""
+Streaming JSON writers: JSONArrayWriter produces the document
+df.to_json(orient='records', indent=2) would (a compact [] without records),
+and NDJSON reads back in chunks.
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from planilhas_gov_br import ndjson
+
+
+def make_frame(rows):
+    return pd.DataFrame({
+        'Orgao_Entidade': [f"Ministério {i}" for i in range(rows)],
+        'Vagas': pd.array([i if i % 3 else None for i in range(rows)], dtype='Int64'),
+        'Observação': ['Retificação, "urgente"' if i % 2 else None for i in range(rows)],
+    })
+
+
+def expected_document(df):
+    return df.to_json(orient='records', date_format='iso', indent=2, force_ascii=False)
+
+
+def write_array(path, frames, chunksize=ndjson.DEFAULT_CHUNKSIZE):
+    with ndjson.JSONArrayWriter(path, chunksize=chunksize) as writer:
+        for df in frames:
+            writer.write(df)
+    return path.read_text(encoding='utf-8')
+
+
+def test_array_without_records(tmp_path):
+    text = write_array(tmp_path / 'data.json', [])
+    assert text == '[]'
+    assert json.loads(text) == []
+
+
+def test_array_of_empty_frames(tmp_path):
+    text = write_array(tmp_path / 'data.json', [make_frame(0), make_frame(0)])
+    assert text == '[]'
+
+
+def test_array_with_one_record(tmp_path):
+    df = make_frame(1)
+    text = write_array(tmp_path / 'data.json', [df])
+    assert text == expected_document(df)
+    assert json.loads(text) == [{'Orgao_Entidade': 'Ministério 0', 'Vagas': None, 'Observação': None}]
+
+
+@pytest.mark.parametrize('chunksize', [1, 2, 7, 100])
+def test_array_of_several_frames(tmp_path, chunksize):
+    frames = [make_frame(5), make_frame(0), make_frame(3)]
+    text = write_array(tmp_path / 'data.json', frames, chunksize)
+    assert text == expected_document(pd.concat(frames, ignore_index=True))
+
+
+@pytest.mark.parametrize('name', ['data.ndjson', 'data.ndjson.gz'])
+def test_ndjson_round_trip(tmp_path, name):
+    df = make_frame(25)
+    assert ndjson.write_ndjson(df, tmp_path / name, chunksize=10) == 25
+    chunks = list(ndjson.iter_ndjson(tmp_path / name, chunksize=10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert pd.concat(chunks, ignore_index=True)['Orgao_Entidade'].tolist() == df['Orgao_Entidade'].tolist()
@@ -0,0 +1,115 @@
+"""
+normalize_data_values maps each distinct string once (map_unique_strings);
+its output must match the per-cell apply lambdas it replaced.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from planilhas_gov_br.extract import (
+    map_unique_strings,
+    normalize_data_values,
+    normalize_escolaridade,
+    normalize_tipo_autorizacao,
+)
+
+
+def normalize_per_cell(df):
+    """normalize_data_values as it was written before map_unique_strings: one apply per cell and step."""
+    for col in df.columns:
+        if df[col].dtype == 'object':
+            df[col] = df[col].apply(lambda x: x.strip() if isinstance(x, str) else x)
+
+            if col in ['Orgao_Entidade', 'Cargos', 'Vinculo_Orgao_Entidade']:
+                df[col] = df[col].apply(lambda x: x.title() if isinstance(x, str) else x)
+            elif col == 'Escolaridade':
+                df[col] = df[col].apply(lambda x: normalize_escolaridade(x)
+                                        if not pd.isna(x) and isinstance(x, (str, int, float)) else x)
+            elif col == 'Tipo_Autorizacao':
+                df[col] = df[col].apply(lambda x: normalize_tipo_autorizacao(x)
+                                        if not pd.isna(x) and isinstance(x, (str, int, float)) else x)
+
+        if col == 'Vagas':
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    return df
+
+
+def assert_same_as_per_cell(df):
+    expected = normalize_per_cell(df.copy())
+    result = normalize_data_values(df.copy())
+    pd.testing.assert_frame_equal(result, expected)
+
+
+STRINGS = {
+    'Orgao_Entidade': ['  ministério da saúde', 'MINISTÉRIO DA SAÚDE ', 'Instituto Federal', 'inss'],
+    'Vinculo_Orgao_Entidade': ['ministério da economia', ' MEC', 'presidência'],
+    'Cargos': ['analista ', 'TÉCNICO', 'auditor fiscal'],
+    'Escolaridade': ['NS', ' ni ', 'Nível Superior', 'nivel intermediario', 'fundamental'],
+    'Tipo_Autorizacao': ['Concurso Público', 'concurso publico ', 'PROVIMENTO ORIGINÁRIO',
+                         'contratacao temporaria', 'outro tipo'],
+    'Ato_Oficial': ['Portaria nº 1 ', ' Portaria nº 2', 'Decreto 3'],
+    'Vagas': ['10', ' 5', 'dez'],
+}
+
+# Non-string cells found in object columns of real sheets
+OTHER_CELLS = [None, np.nan, 3, 2.5, pd.Timestamp('2020-01-01')]
+
+
+def random_frame(rng, rows):
+    data = {}
+    for col, strings in STRINGS.items():
+        pool = np.array(strings + OTHER_CELLS, dtype=object)
+        data[col] = pd.Series(pool[rng.integers(0, len(pool), rows)], dtype=object)
+    return pd.DataFrame(data)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_frames_match_per_cell(seed):
+    rng = np.random.default_rng(seed)
+    assert_same_as_per_cell(random_frame(rng, int(rng.integers(1, 200))))
+
+
+def test_missing_values_are_kept():
+    df = pd.DataFrame({col: pd.Series([None, np.nan, ' x '], dtype=object) for col in STRINGS})
+    assert_same_as_per_cell(df)
+
+
+def test_non_string_cells_in_object_columns():
+    df = pd.DataFrame({
+        'Orgao_Entidade': pd.Series(['  saúde', 7, 1.5, None], dtype=object),
+        'Escolaridade': pd.Series([1, 'NS', 2.0, pd.Timestamp('2021-05-01')], dtype=object),
+        'Tipo_Autorizacao': pd.Series([True, 'concurso publico', 0, None], dtype=object),
+        'Setor': pd.Series([' a ', 3, None, 'b '], dtype=object),
+    })
+    assert_same_as_per_cell(df)
+
+
+def test_repeated_values():
+    df = pd.DataFrame({
+        'Cargos': pd.Series([' analista'] * 50 + ['TÉCNICO'] * 50, dtype=object),
+        'Escolaridade': pd.Series(['ns'] * 99 + [None], dtype=object),
+    })
+    assert_same_as_per_cell(df)
+
+
+@pytest.mark.parametrize('values', [
+    [1, 2, 3],
+    [1, None, 3],
+    [1.5, np.nan, 2.0],
+    [None, None, None],
+    [pd.Timestamp('2020-01-01'), None, pd.Timestamp('2021-01-01')],
+])
+def test_all_non_string_columns(values):
+    df = pd.DataFrame({col: pd.Series(values, dtype=object)
+                       for col in ['Orgao_Entidade', 'Escolaridade', 'Tipo_Autorizacao', 'Setor']})
+    assert_same_as_per_cell(df)
+
+
+def test_map_unique_strings_calls_func_once_per_distinct_string():
+    calls = []
+    series = pd.Series(['a ', 'b', 'a ', None, 5, 'b'], dtype=object)
+    result = map_unique_strings(series, lambda x: calls.append(x) or x.strip())
+    assert sorted(calls) == ['a ', 'b']
+    assert result.tolist() == ['a', 'b', 'a', None, 5, 'b']
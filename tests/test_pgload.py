@@ -0,0 +1,137 @@
+"""
+COPY buffers written by pgload decode, with Postgres' CSV rules, to the rows
+of the frame: NULLs stay distinct from empty strings and text with commas,
+quotes or newlines survives. The load itself runs against a live database
+only when PGLOAD_TEST_URL points at one.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from planilhas_gov_br import pgload
+from planilhas_gov_br.schema import AUTORIZACOES_UNIAO_COLUMNS, FINGERPRINT_COLUMN, coerce_to_schema, row_fingerprints
+
+COLUMNS = [col for col, _ in AUTORIZACOES_UNIAO_COLUMNS]
+
+
+def parse_copy_csv(text, null=pgload.COPY_NULL):
+    """
+    Rows of a COPY ... (FORMAT csv, NULL '\\N') stream as Postgres reads them:
+    an unquoted field equal to `null` is NULL, a quoted one is always text.
+    """
+    rows, row, field, quoted, in_quotes = [], [], [], False, False
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if in_quotes:
+            if char == '"' and text[i + 1:i + 2] == '"':
+                field.append('"')
+                i += 1
+            elif char == '"':
+                in_quotes = False
+            else:
+                field.append(char)
+        elif char == '"':
+            in_quotes = quoted = True
+        elif char == '\r':
+            raise AssertionError("unquoted carriage return ends the row for Postgres")
+        elif char in ',\n':
+            value = ''.join(field)
+            row.append(None if not quoted and value == null else value)
+            field, quoted = [], False
+            if char == '\n':
+                rows.append(row)
+                row = []
+        else:
+            field.append(char)
+        i += 1
+    assert not field and not row, "stream does not end with a newline"
+    return rows
+
+
+def expected_rows(df, columns):
+    """Rows of df[columns] as text, as Postgres would store them before casting."""
+    rows = []
+    for record in df[columns].astype(object).itertuples(index=False):
+        rows.append([None if pd.isna(value) else str(value) for value in record])
+    return rows
+
+
+def make_frame():
+    return coerce_to_schema(pd.DataFrame({
+        'orgao_entidade': ['Ministério da Saúde', 'Instituto "Federal"', '', None, 'Órgão, com vírgula'],
+        'cargos': ['Analista\nde Sistemas', 'Técnico', None, 'Auditor', 'Médico'],
+        'vagas': pd.array([10, None, 0, 3, 1500], dtype='Int64'),
+        'dou_publicacao_ano': [2019.0, np.nan, 2020.0, np.inf, 2021.0],
+        'observacoes': ['', None, ' espaços ', 'linha 1\r\nlinha 2', 'N/A'],
+    }))
+
+
+def test_copy_chunks_decode_to_the_frame_rows():
+    df = make_frame()
+    text = ''.join(pgload.iter_copy_chunks(df, COLUMNS))
+    assert parse_copy_csv(text) == expected_rows(df, COLUMNS)
+
+
+def test_nulls_and_empty_strings_differ():
+    df = make_frame()
+    rows = parse_copy_csv(''.join(pgload.iter_copy_chunks(df, COLUMNS)))
+    orgao = COLUMNS.index('orgao_entidade')
+    assert rows[2][orgao] == ''
+    assert rows[3][orgao] is None
+    # Infinite years are not valid numbers for Postgres: coerced to NULL
+    assert rows[3][COLUMNS.index('dou_publicacao_ano')] is None
+    assert rows[1][COLUMNS.index('vagas')] is None
+    assert rows[0][COLUMNS.index('vagas')] == '10'
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 2, 4, 5, 100])
+def test_chunks_split_on_row_boundaries(chunk_rows):
+    df = make_frame()
+    chunks = list(pgload.iter_copy_chunks(df, COLUMNS, chunk_rows))
+    assert len(chunks) == -(-len(df) // chunk_rows)
+    rows = []
+    for chunk in chunks:
+        rows += parse_copy_csv(chunk)
+    assert rows == expected_rows(df, COLUMNS)
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        pgload.copy_load(make_frame(), 'postgresql://unused', mode='upsert')
+
+
+@pytest.mark.skipif(not os.environ.get('PGLOAD_TEST_URL'), reason="PGLOAD_TEST_URL not set (live Postgres)")
+def test_copy_load_live():
+    psycopg2 = pytest.importorskip('psycopg2')
+    conn_string = os.environ['PGLOAD_TEST_URL']
+    table = 'pgload_test_autorizacoes'
+    types = {'string': 'text', 'int': 'integer', 'float': 'double precision'}
+    columns_sql = ', '.join(f'"{col}" {types[kind]}' for col, kind in AUTORIZACOES_UNIAO_COLUMNS)
+
+    conn = psycopg2.connect(conn_string)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f'DROP TABLE IF EXISTS "{table}"')
+            cur.execute(f'CREATE TABLE "{table}" ({columns_sql}, "{FINGERPRINT_COLUMN}" text UNIQUE)')
+
+        df = make_frame()
+        df[FINGERPRINT_COLUMN] = row_fingerprints(df)
+        assert pgload.copy_load(df, conn_string, table=table, mode='replace', chunk_rows=2) == len(df)
+        # Re-running the same rows is a no-op; dropping one deletes it
+        assert pgload.copy_load(df, conn_string, table=table, mode='append') == 0
+        assert pgload.copy_load(df.iloc[1:], conn_string, table=table, mode='sync') == 0
+
+        with conn.cursor() as cur:
+            cur.execute(f'SELECT {", ".join(COLUMNS)} FROM "{table}" ORDER BY "{FINGERPRINT_COLUMN}"')
+            loaded = [[None if value is None else str(value) for value in row] for row in cur.fetchall()]
+        expected = df.iloc[1:].sort_values(FINGERPRINT_COLUMN)
+        assert loaded == expected_rows(expected, COLUMNS)
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f'DROP TABLE IF EXISTS "{table}"')
+        conn.close()
@@ -0,0 +1,64 @@
+"""
+scripts/upload_to_supabase.py sends the same government_data records whether
+or not consolidated_data.parquet (and pyarrow) is there: the consolidated CSV,
+with the spreadsheet header names and every column.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from planilhas_gov_br import columnar, records
+from planilhas_gov_br.schema import normalize_column_names
+
+pytest.importorskip('supabase')
+pytest.importorskip('dotenv')
+
+SCRIPT = Path(__file__).resolve().parent.parent / 'scripts' / 'upload_to_supabase.py'
+
+
+@pytest.fixture(scope='module')
+def script():
+    spec = importlib.util.spec_from_file_location('upload_to_supabase', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def consolidated_frame():
+    """Consolidated data as processing leaves it, with a column outside the autorizacoes_uniao schema."""
+    return pd.DataFrame({
+        'Orgao_Entidade': ['Ministério Do Turismo', 'Instituto Agricultura', None],
+        'Vinculo_Orgao_Entidade': ['Ministério Da Justiça', None, 'Ministério Da Defesa'],
+        'Cargos': ['Analista', 'Economista', 'Técnico'],
+        'Escolaridade': ['Nível Superior', 'Nível Superior', None],
+        'Vagas': [50, 1, None],
+        'Ato_Oficial': ['Portaria nº 1688, de 2010', 'Portaria nº 408, de 2010', None],
+        'Tipo_Autorizacao': ['Provimento Originário', 'Contratação Temporária', None],
+        'DOU': ['https://www.in.gov.br/web/dou/-/portaria-3176558', None, None],
+        'Cargos_1': [None, 'Economista', None],
+    })
+
+
+def government_data_records(script, processed_dir):
+    _, df = script.read_consolidated_data(processed_dir)
+    return records.JSONRecords(df)[:]
+
+
+def test_same_records_with_or_without_parquet(script, tmp_path, monkeypatch):
+    df = consolidated_frame()
+    df.to_csv(tmp_path / 'consolidated_data.csv', index=False, encoding='utf-8')
+    csv_only = government_data_records(script, tmp_path)
+
+    if columnar.is_available():
+        columnar.write_parquet(normalize_column_names(df.copy()), tmp_path / columnar.PARQUET_FILENAME)
+    with_parquet = government_data_records(script, tmp_path)
+    monkeypatch.setattr(columnar, 'is_available', lambda: False)
+    without_pyarrow = government_data_records(script, tmp_path)
+
+    assert with_parquet == csv_only
+    assert without_pyarrow == csv_only
+    assert list(csv_only[0]) == list(df.columns)
+    assert csv_only[2]['Vagas'] is None
@@ -0,0 +1,217 @@
+"""
+BatchUploader against a local HTTP stand-in for PostgREST: rows rejected for
+their data are isolated by splitting, transient responses are retried and
+errors about the request abort the upload.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from planilhas_gov_br.journal import UploadJournal, range_digest
+from planilhas_gov_br.uploader import (
+    BatchUploader,
+    PostgrestError,
+    UploadAborted,
+    is_row_error,
+    is_transient_error,
+    postgrest_upsert,
+)
+
+httpx = pytest.importorskip('httpx')
+
+
+class StandIn:
+    """
+    PostgREST stand-in: accepts POST /<table> with a JSON list of records.
+
+    Args:
+        bad_ids: Record ids rejected with `row_status` and a 23505 body, as a
+                 unique violation is
+        row_status (int): Status of those rejections (PostgREST answers 409; 400 for other data errors)
+        fail_first (int): Requests answered with `fail_status` before any is accepted
+        fail_status (int): Status of those failures
+        fail_body (dict): JSON body of those failures (None for a plain text body)
+    """
+
+    def __init__(self, bad_ids=(), row_status=409, fail_first=0, fail_status=503, fail_body=None):
+        self.bad_ids = set(bad_ids)
+        self.row_status = row_status
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.fail_body = fail_body
+        self.requests = []
+        self.inserted = []
+        self._lock = threading.Lock()
+
+    def respond(self, batch):
+        """(status, body) answered to a batch."""
+        with self._lock:
+            self.requests.append(batch)
+            if len(self.requests) <= self.fail_first:
+                body = json.dumps(self.fail_body) if self.fail_body is not None else 'Service Unavailable'
+                return self.fail_status, body
+            if any(record['id'] in self.bad_ids for record in batch):
+                return self.row_status, json.dumps({
+                    'code': '23505',
+                    'message': 'duplicate key value violates unique constraint "autorizacoes_uniao_pkey"',
+                    'details': None,
+                    'hint': None,
+                })
+            self.inserted.extend(record['id'] for record in batch)
+            return 201, ''
+
+
+@pytest.fixture
+def stand_in():
+    """Serve a StandIn on localhost; yields a function configuring it and returning a postgrest_upsert callable."""
+    state = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            batch = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            status, body = state['server'].respond(batch)
+            body = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    client = httpx.Client(base_url=f"http://127.0.0.1:{httpd.server_address[1]}")
+    supabase = SimpleNamespace(postgrest=SimpleNamespace(session=client))
+
+    def configure(**kwargs):
+        state['server'] = StandIn(**kwargs)
+        return state['server'], postgrest_upsert(supabase, 'autorizacoes_uniao')
+
+    yield configure
+    client.close()
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def make_records(count):
+    return [{'id': i, 'orgao_entidade': f"Órgão {i}", 'vagas': i} for i in range(count)]
+
+
+def uploader(insert, **kwargs):
+    kwargs.setdefault('backoff_base', 0.0)
+    return BatchUploader(insert, **kwargs)
+
+
+@pytest.mark.parametrize('row_status', [409, 400])
+def test_row_error_is_split_down_to_the_bad_row(stand_in, row_status):
+    server, insert = stand_in(bad_ids={13}, row_status=row_status)
+    result = uploader(insert, max_workers=2, batch_size=8).upload(make_records(20))
+
+    assert [row for row, _ in result.failed_rows] == [13]
+    assert '23505' in result.failed_rows[0][1]
+    assert result.uploaded == 19
+    assert sorted(server.inserted) == [i for i in range(20) if i != 13]
+
+
+@pytest.mark.parametrize('status', [500, 503])
+def test_server_errors_are_retried(stand_in, status):
+    server, insert = stand_in(fail_first=2, fail_status=status)
+    result = uploader(insert, max_workers=1, batch_size=10).upload(make_records(10))
+
+    assert result.uploaded == 10
+    assert result.failed == 0
+    assert result.retries == 2
+    assert len(server.requests) == 3
+
+
+def test_transient_postgres_code_is_retried(stand_in):
+    server, insert = stand_in(fail_first=1, fail_status=500, fail_body={'code': '40001', 'message': 'could not serialize'})
+    result = uploader(insert, max_workers=1, batch_size=10).upload(make_records(10))
+
+    assert result.uploaded == 10
+    assert result.retries == 1
+
+
+def test_retries_are_exhausted(stand_in):
+    server, insert = stand_in(fail_first=100, fail_status=503)
+    result = uploader(insert, max_workers=1, batch_size=10, max_retries=2).upload(make_records(10))
+
+    assert result.uploaded == 0
+    assert result.failed == 10
+    assert len(server.requests) == 3
+
+
+@pytest.mark.parametrize('status, body', [
+    (401, {'code': 'PGRST301', 'message': 'JWT expired'}),
+    (404, {'code': '42P01', 'message': 'relation "public.autorizacoes_uniao" does not exist'}),
+    (400, {'code': '42703', 'message': 'column "vagas" does not exist'}),
+])
+def test_request_errors_abort_the_upload(stand_in, status, body):
+    server, insert = stand_in(fail_first=100, fail_status=status, fail_body=body)
+    with pytest.raises(UploadAborted) as excinfo:
+        uploader(insert, max_workers=2, batch_size=10).upload(make_records(100))
+
+    assert isinstance(excinfo.value.error, PostgrestError)
+    assert excinfo.value.error.code == body['code']
+    assert excinfo.value.result.uploaded == 0
+    # The batches in flight when the first error came back, not one per row
+    assert len(server.requests) <= 4
+
+
+def test_error_codes_are_read_from_the_response_body():
+    request = httpx.Request('POST', 'http://localhost/autorizacoes_uniao')
+    response = httpx.Response(409, json={'code': '23505'}, request=request)
+    error = httpx.HTTPStatusError('conflict', request=request, response=response)
+    assert is_row_error(error)
+    assert not is_transient_error(error)
+
+    response = httpx.Response(503, text='Service Unavailable', request=request)
+    error = httpx.HTTPStatusError('unavailable', request=request, response=response)
+    assert is_transient_error(error)
+    assert not is_row_error(error)
+
+
+def test_batch_size_adapts_to_latency():
+    fast = uploader(lambda batch: None, max_workers=1, batch_size=100, max_batch_size=1000)
+    fast.upload(make_records(5000))
+    assert fast.batch_size == 1000
+
+    slow = uploader(lambda batch: time.sleep(0.01), max_workers=1, batch_size=100,
+                    min_batch_size=25, target_latency=0.001)
+    slow.upload(make_records(300))
+    assert slow.batch_size == 25
+
+
+def test_resume_uploads_only_the_rows_not_journaled(tmp_path):
+    rows = make_records(30)
+    digest = lambda start, stop: range_digest(row['id'] for row in rows[start:stop])  # noqa: E731
+    path = tmp_path / 'autorizacoes_uniao.jsonl'
+
+    def run(insert, resume):
+        with UploadJournal.open(path, 'snapshot', total=len(rows), resume=resume, digest=digest) as journal:
+            on_batch = lambda start, stop, elapsed: journal.commit(start, stop, digest(start, stop))  # noqa: E731
+            result = uploader(insert, max_workers=1, batch_size=10, max_retries=0,
+                              on_batch=on_batch).upload(rows, ranges=journal.pending_ranges())
+            return result, journal.pending_ranges()
+
+    def interrupted(batch):
+        if batch[0]['id'] >= 10:
+            raise ConnectionError('connection reset')
+
+    result, pending = run(interrupted, resume=False)
+    assert result.uploaded == 10
+    assert pending == [(10, 30)]
+
+    sent = []
+    result, pending = run(lambda batch: sent.extend(row['id'] for row in batch), resume=True)
+    assert sent == list(range(10, 30))
+    assert result.uploaded == 20
+    assert pending == []